@@ -0,0 +1,75 @@
+"""
+ASGI entry point: the task, list and stats API as async handlers
+(routes/async_api.py) over SQLAlchemy's asyncio engine, and the
+/api/events Server-Sent Events stream (utils/events.py).
+
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --port 5000
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+Every other route is served by the Flask app, mounted behind the async ones
+through a2wsgi's thread pool, so its writes reach this process's event
+subscribers too. Uses the same Config, database and schema as app:app (run
+`flask init-db` first). The async handlers run under the Flask routes' rate
+limits and are counted in /api/metrics; they skip the response cache and
+replica routing.
+
+Events are fanned out within one process, so /api/events streams only when
+the server runs a single worker (GUNICORN_WORKERS=1 or uvicorn without
+--workers); with several it answers 501 and clients poll /api/tasks/changes.
+"""
+import contextlib
+from config import Config
+
+
+def load_config(config_class=Config):
+    return {key: getattr(config_class, key) for key in dir(config_class) if key.isupper()}
+
+
+def create_asgi_app(config_class=Config):
+    from a2wsgi import WSGIMiddleware
+    from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.middleware.cors import CORSMiddleware
+    from starlette.routing import Mount
+    from app import create_app
+    from routes.async_api import routes
+    from utils.async_db import create_async_db
+    from utils.events import broker, worker_count
+
+    config = load_config(config_class)
+    flask_app = create_app(config_class)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        engine, sessionmaker = create_async_db(config)
+        app.state.config = config
+        app.state.flask_app = flask_app
+        app.state.engine = engine
+        app.state.sessionmaker = sessionmaker
+        workers = worker_count()
+        if workers > 1:
+            flask_app.logger.warning(
+                "/api/events is off: %d workers would each miss the others' events", workers)
+        broker.configure(config.get('EVENTS_REPLAY_SIZE', 1024), enabled=workers == 1)
+        yield
+        await engine.dispose()
+
+    return Starlette(
+        routes=routes + [Mount('/', app=WSGIMiddleware(flask_app))],
+        lifespan=lifespan,
+        middleware=[Middleware(
+            CORSMiddleware,
+            allow_origins=[config.get('FRONTEND_URL', 'http://localhost:5173')],
+            allow_methods=['*'],
+            allow_headers=['*'],
+        )],
+    )
+
+
+def __getattr__(name):
+    # Built on first access, like app.app
+    if name == 'app':
+        app = globals()['app'] = create_asgi_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
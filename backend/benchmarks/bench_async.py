@@ -0,0 +1,141 @@
+"""
+WSGI versus ASGI benchmark: the same read endpoints served by gunicorn's
+sync workers (app:app) and by its uvicorn workers (asgi:app), with the same
+number of worker processes, against one seeded SQLite database.
+
+    python benchmarks/bench_async.py --tasks 5000 --workers 2 --concurrency 1,16,64
+
+Each concurrency level runs --requests requests per endpoint from that many
+client threads over keep-alive connections, and reports throughput and
+latency percentiles per server. Rate limiting and the response cache are
+turned off so both servers do the same database work per request.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import BACKEND_DIR, create_bench_app, seed_tasks, percentile, free_port, wait_until_up
+
+ENDPOINTS = [
+    "/api/tasks?limit=20",
+    "/api/tasks?cursor=&limit=20",
+    "/api/lists",
+    "/api/stats",
+]
+
+
+def server_command(kind, port, workers):
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+               '--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+    if kind == 'wsgi':
+        return command + ['app:app']
+    return command + ['-k', 'uvicorn.workers.UvicornWorker', 'asgi:app']
+
+
+def drive(port, path, total, concurrency):
+    """Runs total GETs from concurrency threads; returns (seconds, latencies, errors)"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    remaining = [total]
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine, failed = [], 0
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            mine.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, sum(errors)
+
+
+def run(tasks, workers, concurrency_levels, requests):
+    fd, db_path = tempfile.mkstemp(prefix='taskflow-bench-', suffix='.db')
+    os.close(fd)
+    app = create_bench_app(db_path)
+    seed_tasks(app, tasks)
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        RATELIMIT_ENABLED='false',
+        RESPONSE_CACHE_ENABLED='false',
+        INSTRUMENTATION_ENABLED='false',
+    )
+    results = []
+    for kind in ('wsgi', 'asgi'):
+        port = free_port()
+        server = subprocess.Popen(
+            server_command(kind, port, workers), cwd=BACKEND_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_up(port)
+            for path in ENDPOINTS:
+                drive(port, path, min(requests, 50), 1)  # warm the workers' pools
+                for concurrency in concurrency_levels:
+                    seconds, latencies, errors = drive(port, path, requests, concurrency)
+                    row = {
+                        "server": kind,
+                        "endpoint": path,
+                        "concurrency": concurrency,
+                        "requests": requests,
+                        "errors": errors,
+                        "rps": round(requests / seconds, 1),
+                        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                    }
+                    results.append(row)
+                    print(f"{kind:<5} {path:<30} c={concurrency:<4} {row['rps']:>8.1f} req/s  "
+                          f"p50={row['p50_ms']:.2f}ms  p95={row['p95_ms']:.2f}ms  errors={errors}")
+        finally:
+            server.terminate()
+            server.wait()
+    os.unlink(db_path)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=2, help="Worker processes for both servers")
+    parser.add_argument('--concurrency', default='1,16,64', help="Comma-separated client thread counts")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint and concurrency level")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    results = run(args.tasks, args.workers, levels, args.requests)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,164 @@
+"""
+Batch API benchmark: one frontend action (create a task, rename two others,
+refetch lists and stats) sent as five sequential requests versus one
+POST /api/batch, atomic and best-effort, against gunicorn sync workers on a
+seeded SQLite database.
+
+    python benchmarks/bench_batch.py --tasks 5000 --workers 2 --concurrency 1,8
+
+Each concurrency level runs --actions actions per mode from that many client
+threads over keep-alive connections, and reports actions per second and
+per-action latency percentiles. Rate limiting and the response cache are
+turned off so every mode does the same database work.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import BACKEND_DIR, create_bench_app, seed_tasks, percentile, free_port, wait_until_up
+
+MODES = ('sequential', 'batch', 'batch-best-effort')
+
+
+def action_operations(rng, task_ids, list_ids):
+    first, second = rng.sample(task_ids, 2)
+    return [
+        {"method": "POST", "path": "/api/tasks",
+         "body": {"title": f"Batch bench {rng.random():.6f}", "list_id": rng.choice(list_ids)}},
+        {"method": "PUT", "path": f"/api/tasks/{first}", "body": {"title": f"Renamed {rng.random():.6f}"}},
+        {"method": "PUT", "path": f"/api/tasks/{second}", "body": {"title": f"Renamed {rng.random():.6f}"}},
+        {"method": "GET", "path": "/api/lists"},
+        {"method": "GET", "path": "/api/stats"},
+    ]
+
+
+def send(conn, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def perform(conn, mode, operations):
+    """Runs one action; returns True if every request succeeded"""
+    if mode == 'sequential':
+        return all(send(conn, op['method'], op['path'], op.get('body')) < 400 for op in operations)
+    payload = {"atomic": mode == 'batch', "operations": operations}
+    return send(conn, 'POST', '/api/batch', payload) == 200
+
+
+def drive(port, mode, total, concurrency, task_ids, list_ids, seed):
+    """Runs total actions from concurrency threads; returns (seconds, latencies, errors)"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    remaining = [total]
+
+    def client(index):
+        rng = random.Random(seed + index)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine, failed = [], 0
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            operations = action_operations(rng, task_ids, list_ids)
+            start = time.perf_counter()
+            try:
+                if not perform(conn, mode, operations):
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            mine.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, sum(errors)
+
+
+def run(tasks, workers, concurrency_levels, actions, seed):
+    from extensions import db
+    from models import Task, TaskList
+
+    fd, db_path = tempfile.mkstemp(prefix='taskflow-bench-', suffix='.db')
+    os.close(fd)
+    app = create_bench_app(db_path)
+    seed_tasks(app, tasks)
+    with app.app_context():
+        db.session.execute(db.text('PRAGMA journal_mode=WAL'))
+        task_ids = [row[0] for row in db.session.query(Task.id)]
+        list_ids = [row[0] for row in db.session.query(TaskList.id)]
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        RATELIMIT_ENABLED='false',
+        RESPONSE_CACHE_ENABLED='false',
+        INSTRUMENTATION_ENABLED='false',
+    )
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    results = []
+    try:
+        wait_until_up(port)
+        for mode in MODES:
+            drive(port, mode, min(actions, 20), 1, task_ids, list_ids, seed)  # warm the workers' pools
+            for concurrency in concurrency_levels:
+                seconds, latencies, errors = drive(port, mode, actions, concurrency, task_ids, list_ids, seed)
+                row = {
+                    "mode": mode,
+                    "concurrency": concurrency,
+                    "actions": actions,
+                    "errors": errors,
+                    "actions_per_s": round(actions / seconds, 1),
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                    "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                }
+                results.append(row)
+                print(f"{mode:<18} c={concurrency:<4} {row['actions_per_s']:>8.1f} actions/s  "
+                      f"p50={row['p50_ms']:.2f}ms  p95={row['p95_ms']:.2f}ms  errors={errors}")
+    finally:
+        server.terminate()
+        server.wait()
+    os.unlink(db_path)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', default='1,8', help="Comma-separated client thread counts")
+    parser.add_argument('--actions', type=int, default=500, help="Actions per mode and concurrency level")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    results = run(args.tasks, args.workers, levels, args.actions, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,68 @@
+"""
+Task creation throughput: POST /api/tasks in a loop versus POST /api/tasks/bulk.
+
+    python benchmarks/bench_bulk_create.py --tasks 2000 --batch-sizes 100 1000 5000
+
+Reports tasks/second for each mode; rate limiting is disabled for the run.
+"""
+import argparse
+import json
+import time
+
+from common import create_bench_app, PRIORITIES
+
+
+def make_payload(count, tag_pool=50):
+    return [
+        {
+            "title": f"Imported task {i}",
+            "description": "Created by the bulk benchmark",
+            "priority": PRIORITIES[i % 3],
+            "list_id": 1 + i % 3,
+            "tags": [{"name": f"import-{i % tag_pool}"}, {"name": "imported"}]
+        }
+        for i in range(count)
+    ]
+
+
+def run(total, batch_sizes, single_limit):
+    app = create_bench_app()
+    client = app.test_client()
+    results = []
+
+    single = make_payload(min(total, single_limit))
+    start = time.perf_counter()
+    for task in single:
+        assert client.post('/api/tasks', json=task).status_code == 201
+    elapsed = time.perf_counter() - start
+    results.append({"mode": "single", "tasks": len(single), "seconds": round(elapsed, 3),
+                    "tasks_per_second": round(len(single) / elapsed, 1)})
+
+    for batch_size in batch_sizes:
+        payload = make_payload(total)
+        start = time.perf_counter()
+        for offset in range(0, total, batch_size):
+            response = client.post('/api/tasks/bulk', json={"tasks": payload[offset:offset + batch_size]})
+            assert response.status_code == 201 and response.json["failed"] == 0, response.data
+        elapsed = time.perf_counter() - start
+        results.append({"mode": f"bulk[{batch_size}]", "tasks": total, "seconds": round(elapsed, 3),
+                        "tasks_per_second": round(total / elapsed, 1)})
+
+    for row in results:
+        print(f"{row['mode']:<12} {row['tasks']:>7} tasks  {row['tasks_per_second']:>10.1f} tasks/s")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--single-limit', type=int, default=500,
+                        help="Cap on tasks created one request at a time")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.tasks, args.batch_sizes, args.single_limit)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
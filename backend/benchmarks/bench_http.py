@@ -0,0 +1,361 @@
+"""
+HTTP benchmark and load test for every API route. Builds the app with
+create_app() on a throwaway SQLite file, seeds lists/tasks/tags, then drives
+each route of the tasks, lists, stats and health blueprints through Flask
+test clients at one or more concurrency levels.
+
+    python benchmarks/bench_http.py --tasks 10000 --concurrency 1 8 --output http.json
+    python benchmarks/bench_http.py --baseline http.json --output http-new.json
+
+Per route and concurrency level it reports throughput, p50/p95/p99 latency
+and the SQL statements each request executed. Statements are counted inside
+the worker thread, so streamed responses (export) include the queries run
+while the body is generated. Results are written as JSON together with the
+git commit they were measured on; --baseline compares against an earlier run
+and exits non-zero when p95 latency grows beyond --tolerance or a route starts
+issuing more queries.
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from importlib.metadata import version
+
+import structlog
+
+from common import BACKEND_DIR, PRIORITIES, create_bench_app, percentile, seed_tasks
+
+# request(rng) returns (path, client kwargs); expect lists the status codes that count as success
+Scenario = namedtuple('Scenario', 'name blueprint method request expect')
+
+BLUEPRINTS = ('health', 'tasks', 'lists', 'stats')
+# Routes of those blueprints deliberately left out, with the reason
+UNBENCHMARKED = {
+    'GET /api/events': "an open stream under asgi:app, a 501 under this app",
+}
+
+_local = threading.local()
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, 'queries', None) is not None:
+        _local.queries += 1
+
+
+def git_revision():
+    """Returns (commit, dirty) for the checkout the benchmark runs from"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def prepare_data(app, args, pool_size):
+    """Seeds the database and reserves the rows the destructive routes consume"""
+    from extensions import db
+    from models import Task, TaskList, Tag, TaskTemplate
+    from sqlalchemy import insert, func
+
+    vocabulary = seed_tasks(app, args.tasks, lists=args.lists, tags=args.tags, seed=args.seed)
+    with app.app_context():
+        db.session.execute(db.text('PRAGMA journal_mode=WAL'))
+        task_ids = [row[0] for row in db.session.query(Task.id).order_by(Task.id)]
+        list_ids = [row[0] for row in db.session.query(TaskList.id).order_by(TaskList.id)]
+        tag_names = [row[0] for row in db.session.query(Tag.name)]
+
+        # Lists created only to be deleted, each holding a few tasks
+        first = (db.session.query(func.max(TaskList.id)).scalar() or 0) + 1
+        doomed_lists = list(range(first, first + pool_size))
+        db.session.execute(insert(TaskList), [
+            {"id": list_id, "name": f"Doomed list {list_id}", "color": "#6b7280", "task_count": 3}
+            for list_id in doomed_lists
+        ])
+        now = datetime.utcnow()
+        db.session.execute(insert(Task), [
+            {"title": f"Doomed task {i}", "priority": "low", "list_id": list_id,
+             "completed": False, "created_at": now, "updated_at": now}
+            for list_id in doomed_lists for i in range(3)
+        ])
+        templates = [TaskTemplate(title=f"Template {list_id}", list_id=list_id) for list_id in list_ids]
+        db.session.add_all(templates)
+        db.session.commit()
+        template_ids = [template.id for template in templates]
+        from utils.stats_calculator import rebuild_stats_aggregates
+        rebuild_stats_aggregates()
+
+    # The newest seeded tasks are deleted; the rest are read and updated
+    return {
+        "vocabulary": vocabulary,
+        "task_ids": task_ids[:-pool_size] if len(task_ids) > pool_size else task_ids,
+        "doomed_tasks": deque(task_ids[-pool_size:]),
+        "doomed_lists": deque(doomed_lists),
+        "list_ids": list_ids,
+        "tag_names": tag_names,
+        "template_ids": template_ids,
+    }
+
+
+def build_scenarios(data, batch):
+    vocabulary = data["vocabulary"]
+    task_ids = data["task_ids"]
+    list_ids = data["list_ids"]
+    tag_names = data["tag_names"]
+    template_ids = data["template_ids"]
+
+    def new_task(rng):
+        return {
+            "title": ' '.join(rng.sample(vocabulary, 3)),
+            "description": ' '.join(rng.sample(vocabulary, 6)),
+            "priority": rng.choice(PRIORITIES),
+            "due_date": (date.today() + timedelta(days=rng.randint(-5, 20))).isoformat(),
+            "list_id": rng.choice(list_ids),
+            "tags": [{"name": name} for name in rng.sample(tag_names, min(2, len(tag_names)))],
+        }
+
+    def import_body(rng):
+        return ''.join(json.dumps(new_task(rng)) + '\n' for _ in range(batch))
+
+    return [
+        Scenario('GET /api/health', 'health', 'GET', lambda rng: ('/api/health', {}), {200}),
+        Scenario('GET /api/health/cache', 'health', 'GET', lambda rng: ('/api/health/cache', {}), {200}),
+        Scenario('GET /api/health/pool', 'health', 'GET', lambda rng: ('/api/health/pool', {}), {200}),
+        Scenario('GET /api/metrics', 'health', 'GET', lambda rng: ('/api/metrics', {}), {200}),
+
+        Scenario('GET /api/tasks', 'tasks', 'GET',
+                 lambda rng: (f'/api/tasks?page={rng.randint(1, 5)}', {}), {200}),
+        Scenario('GET /api/tasks?list_id&priority', 'tasks', 'GET',
+                 lambda rng: (f'/api/tasks?list_id={rng.choice(list_ids)}&priority={rng.choice(PRIORITIES)}', {}), {200}),
+        Scenario('GET /api/tasks?search', 'tasks', 'GET',
+                 lambda rng: (f'/api/tasks?search={rng.choice(vocabulary)}', {}), {200}),
+        Scenario('GET /api/tasks?cursor', 'tasks', 'GET',
+                 lambda rng: ('/api/tasks?cursor=&limit=50', {}), {200}),
+        Scenario('GET /api/tasks?tag', 'tasks', 'GET',
+                 lambda rng: (f'/api/tasks?cursor=&limit=50&tag={rng.choice(tag_names)}', {}), {200}),
+        Scenario('GET /api/tasks/due', 'tasks', 'GET',
+                 lambda rng: (f"/api/tasks/due?view={rng.choice(['overdue', 'today', 'upcoming'])}&days=7", {}), {200}),
+        Scenario('GET /api/tasks/export', 'tasks', 'GET',
+                 lambda rng: (f'/api/tasks/export?format=ndjson&list_id={rng.choice(list_ids)}', {}), {200}),
+        Scenario('GET /api/tasks/changes', 'tasks', 'GET',
+                 lambda rng: ('/api/tasks/changes?limit=100', {}), {200}),
+        Scenario('GET /api/tasks/templates', 'tasks', 'GET',
+                 lambda rng: ('/api/tasks/templates', {}), {200}),
+        Scenario('POST /api/tasks/templates', 'tasks', 'POST',
+                 lambda rng: ('/api/tasks/templates', {"json": {
+                     "title": ' '.join(rng.sample(vocabulary, 3)), "list_id": rng.choice(list_ids), "due_offset_days": 2
+                 }}), {201}),
+        Scenario('POST /api/tasks/templates/<id>/instantiate', 'tasks', 'POST',
+                 lambda rng: (f'/api/tasks/templates/{rng.choice(template_ids)}/instantiate', {"json": {}}), {201}),
+        Scenario('POST /api/tasks/templates/instantiate', 'tasks', 'POST',
+                 lambda rng: ('/api/tasks/templates/instantiate', {"json": {"templates": [
+                     {"template_id": rng.choice(template_ids), "list_id": rng.choice(list_ids)} for _ in range(batch)
+                 ]}}), {201}),
+        Scenario('POST /api/tasks', 'tasks', 'POST',
+                 lambda rng: ('/api/tasks', {"json": new_task(rng)}), {201}),
+        Scenario('POST /api/tasks/bulk', 'tasks', 'POST',
+                 lambda rng: ('/api/tasks/bulk', {"json": [new_task(rng) for _ in range(batch)]}), {201}),
+        Scenario('POST /api/tasks/import', 'tasks', 'POST',
+                 lambda rng: ('/api/tasks/import?format=ndjson',
+                              {"data": import_body(rng), "content_type": 'application/x-ndjson'}), {201}),
+        Scenario('PUT /api/tasks/<id>', 'tasks', 'PUT',
+                 lambda rng: (f'/api/tasks/{rng.choice(task_ids)}',
+                              {"json": {"completed": rng.random() < 0.5, "priority": rng.choice(PRIORITIES)}}), {200}),
+        Scenario('POST /api/tasks/bulk-complete', 'tasks', 'POST',
+                 lambda rng: ('/api/tasks/bulk-complete', {"json": {"ids": rng.sample(task_ids, min(batch, len(task_ids)))}}), {200}),
+        Scenario('DELETE /api/tasks/<id>', 'tasks', 'DELETE',
+                 lambda rng: (f'/api/tasks/{data["doomed_tasks"].popleft()}', {}), {200}),
+
+        Scenario('GET /api/lists', 'lists', 'GET', lambda rng: ('/api/lists', {}), {200}),
+        Scenario('POST /api/lists', 'lists', 'POST',
+                 lambda rng: ('/api/lists', {"json": {"name": f"List {rng.random():.6f}"}}), {201}),
+        Scenario('PUT /api/lists/<id>', 'lists', 'PUT',
+                 lambda rng: (f'/api/lists/{rng.choice(list_ids)}', {"json": {"color": "#10b981"}}), {200}),
+        Scenario('DELETE /api/lists/<id>', 'lists', 'DELETE',
+                 lambda rng: (f'/api/lists/{data["doomed_lists"].popleft()}', {}), {200}),
+
+        Scenario('GET /api/stats', 'stats', 'GET', lambda rng: ('/api/stats', {}), {200}),
+        Scenario('POST /api/stats/reset-streak', 'stats', 'POST',
+                 lambda rng: ('/api/stats/reset-streak', {}), {200}),
+    ]
+
+
+def run_worker(app, scenario, count, seed):
+    client = app.test_client()
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        path, kwargs = scenario.request(rng)
+        _local.queries = 0
+        start = time.perf_counter()
+        response = client.open(path, method=scenario.method, **kwargs)
+        response.get_data()
+        elapsed = (time.perf_counter() - start) * 1000
+        response.close()
+        samples.append((elapsed, _local.queries, response.status_code))
+        _local.queries = None
+    return samples
+
+
+def run_scenario(app, scenario, requests, concurrency, seed):
+    """Spreads requests over concurrency threads and summarises the samples"""
+    shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(run_worker, app, scenario, share, seed * 1000 + i)
+            for i, share in enumerate(shares) if share
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    wall = time.perf_counter() - start
+
+    latencies = [elapsed for elapsed, _, _ in samples]
+    queries = [count for _, count, _ in samples]
+    statuses = Counter(status for _, _, status in samples)
+    return {
+        "route": scenario.name,
+        "blueprint": scenario.blueprint,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(n for status, n in statuses.items() if status not in scenario.expect),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "throughput_rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3),
+        },
+        "queries": {
+            "median": percentile(queries, 50),
+            "max": max(queries),
+        },
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints per-route deltas against a previous run; returns the regressed routes"""
+    previous = {(row["route"], row["concurrency"]): row for row in baseline["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for row in results:
+        before = previous.get((row["route"], row["concurrency"]))
+        if before is None:
+            continue
+        p95, old_p95 = row["latency_ms"]["p95"], before["latency_ms"]["p95"]
+        change = (p95 - old_p95) / old_p95 if old_p95 else 0.0
+        more_queries = row["queries"]["median"] > before["queries"]["median"]
+        flag = ''
+        if change > tolerance or more_queries:
+            regressions.append(row["route"])
+            flag = '  REGRESSION'
+        print(f"  {row['route']:<44} c={row['concurrency']:<3} p95 {old_p95:>8.2f} -> {p95:>8.2f}ms ({change:+.0%})  "
+              f"queries {before['queries']['median']} -> {row['queries']['median']}{flag}")
+    return regressions
+
+
+def run(args):
+    # Per-chunk import progress lines would drown the report
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    engine_options = {"connect_args": {"timeout": 30, "check_same_thread": False}}
+    app = create_bench_app(
+        args.db,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options,
+        RESPONSE_CACHE_ENABLED=not args.no_cache,
+    )
+
+    levels = len(args.concurrency)
+    pool_size = (args.requests + args.warmup) * levels
+    data = prepare_data(app, args, pool_size)
+    scenarios = [
+        scenario for scenario in build_scenarios(data, args.batch)
+        if scenario.blueprint in args.blueprints
+    ]
+
+    from extensions import db
+    from sqlalchemy import event
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_statement)
+
+    results = []
+    for concurrency in args.concurrency:
+        for scenario in scenarios:
+            if args.warmup:
+                run_worker(app, scenario, args.warmup, args.seed)
+            row = run_scenario(app, scenario, args.requests, concurrency, args.seed)
+            results.append(row)
+            latency = row["latency_ms"]
+            print(f"{row['route']:<44} c={concurrency:<3} {row['throughput_rps']:>9.1f} req/s  "
+                  f"p50={latency['p50']:.2f}ms p95={latency['p95']:.2f}ms p99={latency['p99']:.2f}ms  "
+                  f"queries={row['queries']['median']}  errors={row['errors']}")
+
+    commit, dirty = git_revision()
+    meta = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "flask": version('flask'),
+        "sqlalchemy": version('sqlalchemy'),
+        "database": "sqlite",
+        "tasks": args.tasks,
+        "lists": args.lists,
+        "tags": args.tags,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "batch": args.batch,
+        "concurrency": args.concurrency,
+        "response_cache": not args.no_cache,
+        "seed": args.seed,
+    }
+    return {"meta": meta, "results": results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000, help="Seeded tasks")
+    parser.add_argument('--lists', type=int, default=10, help="Seeded lists")
+    parser.add_argument('--tags', type=int, default=20, help="Seeded tags")
+    parser.add_argument('--requests', type=int, default=200, help="Measured requests per route and concurrency level")
+    parser.add_argument('--warmup', type=int, default=10, help="Unmeasured requests per route before each run")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help="Client threads")
+    parser.add_argument('--batch', type=int, default=20, help="Tasks per bulk, import and bulk-complete request")
+    parser.add_argument('--blueprints', nargs='+', choices=BLUEPRINTS, default=list(BLUEPRINTS))
+    parser.add_argument('--no-cache', action='store_true', help="Disable the response cache")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--db', help="SQLite file to use instead of a temporary one (must not exist yet)")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="JSON from an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative p95 increase before flagging")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = sum(row["errors"] for row in report["results"])
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressed route(s)")
+            sys.exit(1)
+    if failed:
+        print(f"\n{failed} request(s) returned an unexpected status")
+        sys.exit(1)
@@ -0,0 +1,95 @@
+"""
+Rate limit storage benchmark: per-check overhead of memory:// versus the
+shared mmap:// storage (utils/rate_limit_storage.py), and a multi-process run
+showing whether workers share one limit.
+
+    python benchmarks/bench_ratelimit.py --checks 100000 --workers 4
+
+Checks go through the limits strategies exactly as Flask-Limiter calls them,
+rotating over --keys client keys.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from common import BACKEND_DIR  # noqa: F401  (puts the backend on sys.path)
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+import utils.rate_limit_storage  # noqa: F401  (registers mmap://)
+
+STRATEGIES = {"fixed-window": FixedWindowRateLimiter, "moving-window": MovingWindowRateLimiter}
+
+
+def per_check(uri, strategy, checks, keys):
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    item = parse("1000000 per minute")
+    identities = [f"10.0.{i // 256}.{i % 256}" for i in range(keys)]
+    for identity in identities:
+        limiter.hit(item, identity)
+    start = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(item, identities[i % keys])
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def _worker(uri, strategy, hits, limit, results):
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    item = parse(f"{limit} per minute")
+    results.put(sum(limiter.hit(item, "shared-client") for _ in range(hits)))
+
+
+def shared_limit(uri, strategy, workers, limit):
+    """Allowed hits in total when every worker hammers one client's limit"""
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(uri, strategy, limit, limit, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    allowed = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return allowed
+
+
+def run(checks, keys, workers, limit):
+    directory = tempfile.mkdtemp(prefix='taskflow-ratelimit-')
+    results = []
+    for strategy in STRATEGIES:
+        for name in ('memory', 'mmap'):
+            uri = 'memory://' if name == 'memory' else f"mmap://{os.path.join(directory, strategy)}.mmap?slots=65536"
+            row = {
+                "storage": name,
+                "strategy": strategy,
+                "us_per_check": round(per_check(uri, strategy, checks, keys), 2),
+            }
+            if name == 'mmap':
+                storage_from_string(uri).reset()
+            row["allowed_across_workers"] = shared_limit(uri, strategy, workers, limit)
+            row["limit"] = limit
+            results.append(row)
+            print(f"{name:<7} {strategy:<14} {row['us_per_check']:>7.2f}us/check  "
+                  f"{workers} workers allowed {row['allowed_across_workers']} of limit {limit}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=100000)
+    parser.add_argument('--keys', type=int, default=1000, help="Distinct client keys to rotate over")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--limit', type=int, default=100, help="Per-minute limit for the multi-process run")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.checks, args.keys, args.workers, args.limit)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,77 @@
+"""
+Search latency versus table size for each search backend.
+
+    python benchmarks/bench_search.py --sizes 1000 10000 100000 --queries 200
+
+Each query looks for a "needle" word planted in a fixed number of rows, so
+the result size is the same at every table size. Latency for the 'like'
+backend grows with the table; 'fts5' should stay flat.
+"""
+import argparse
+import json
+import random
+
+from common import create_bench_app, seed_tasks, make_vocabulary, percentile, timed
+
+NEEDLE_ROWS = 10
+
+
+def plant_needles(app, needles, rows_per_needle, seed=11):
+    """Appends each needle word to the titles of rows_per_needle random tasks"""
+    from extensions import db
+    from models import Task
+
+    rng = random.Random(seed)
+    with app.app_context():
+        ids = [row[0] for row in db.session.query(Task.id)]
+        for needle in needles:
+            for task in Task.query.filter(Task.id.in_(rng.sample(ids, rows_per_needle))):
+                task.title = f"{task.title} {needle}"
+        db.session.commit()
+
+
+def run(sizes, queries, backends):
+    app = create_bench_app()
+    client = app.test_client()
+    from utils.search import BACKENDS
+
+    results = []
+    seeded = 0
+    vocabulary = needles = None
+    for size in sizes:
+        vocabulary = seed_tasks(app, size - seeded, vocabulary=vocabulary)
+        if not seeded:
+            needles = [word + 'q' for word in make_vocabulary(50, seed=3)]
+            plant_needles(app, needles, min(NEEDLE_ROWS, size))
+        seeded = size
+        terms = random.Random(size).choices(needles, k=queries)
+        for name in backends:
+            app.extensions['task_search'] = BACKENDS[name]()
+            samples = []
+            for term in terms:
+                response, ms = timed(client.get, f"/api/tasks?search={term}&limit=20")
+                assert response.status_code == 200, response.data
+                samples.append(ms)
+            results.append({
+                "rows": size,
+                "backend": name,
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p95_ms": round(percentile(samples, 95), 3),
+                "mean_ms": round(sum(samples) / len(samples), 3),
+            })
+            print(f"{size:>9} rows  {name:<8} p50={results[-1]['p50_ms']:.2f}ms  p95={results[-1]['p95_ms']:.2f}ms")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--backends', nargs='+', default=['like', 'fts5'])
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(sorted(args.sizes), args.queries, args.backends)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
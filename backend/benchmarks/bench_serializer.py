@@ -0,0 +1,85 @@
+"""
+Serialization micro-benchmark: marshmallow TaskSchema.dump + jsonify versus
+the compiled serializer + orjson in utils/serializers.py.
+
+    python benchmarks/bench_serializer.py --sizes 20 50 500 --repeat 200
+
+Both engines must produce identical bytes; the script fails otherwise.
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from common import create_bench_app, PRIORITIES
+
+
+def make_tasks(count):
+    from models import Task, Tag
+
+    tags = [Tag(id=i, name=f"tag-{i}", color="#6b7280") for i in range(1, 6)]
+    now = datetime(2024, 1, 1, 9, 30)
+    return [
+        Task(
+            id=i,
+            title=f"Task number {i}",
+            description="Some description text" if i % 2 else None,
+            completed=i % 4 == 0,
+            priority=PRIORITIES[i % 3],
+            due_date=date(2024, 1, 1) + timedelta(days=i % 20) if i % 3 else None,
+            list_id=1 + i % 3,
+            created_at=now + timedelta(minutes=i),
+            updated_at=now + timedelta(minutes=i, seconds=30),
+            tags=tags[:i % 4],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def render(app, engine, schema, tasks):
+    from flask import jsonify
+    from utils.serializers import dump, json_response
+
+    app.config['SERIALIZER'] = engine
+    if engine == 'marshmallow':
+        return jsonify({"data": schema.dump(tasks)}).get_data()
+    response, _ = json_response({"data": dump(schema, tasks)})
+    return response.get_data()
+
+
+def run(sizes, repeat):
+    app = create_bench_app()
+    from utils.validators import TaskSchema
+
+    schema = TaskSchema(many=True)
+    results = []
+    with app.test_request_context():
+        for size in sizes:
+            tasks = make_tasks(size)
+            reference = render(app, 'marshmallow', schema, tasks)
+            assert render(app, 'fast', schema, tasks) == reference, "fast serializer output differs"
+            row = {"tasks": size}
+            for engine in ('marshmallow', 'fast'):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    render(app, engine, schema, tasks)
+                elapsed = time.perf_counter() - start
+                row[f"{engine}_us_per_task"] = round(elapsed / (repeat * size) * 1e6, 2)
+            row["speedup"] = round(row["marshmallow_us_per_task"] / row["fast_us_per_task"], 2)
+            results.append(row)
+            print(f"{size:>6} tasks  marshmallow={row['marshmallow_us_per_task']:.2f}us/task  "
+                  f"fast={row['fast_us_per_task']:.2f}us/task  speedup={row['speedup']}x")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 50, 500])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
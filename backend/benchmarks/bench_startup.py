@@ -0,0 +1,90 @@
+"""
+Startup benchmark: how long a fresh interpreter takes to import app.py and
+build the app with create_app(), and whether that touches the database.
+
+    python benchmarks/bench_startup.py --runs 20 --output startup.json
+
+Each run is a separate process, as a gunicorn worker boot would be. The
+child counts pool connections and SQL statements during import and
+create_app(); both should stay at zero. The default config points at MySQL,
+which does not have to be reachable for the numbers to be valid.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, percentile
+
+CHILD = r'''
+import json, time
+start = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+counts = {"connects": 0, "statements": 0}
+event.listen(Pool, "connect", lambda *a: counts.__setitem__("connects", counts["connects"] + 1))
+event.listen(Engine, "before_cursor_execute", lambda *a: counts.__setitem__("statements", counts["statements"] + 1))
+sqlalchemy_ms = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+import app as module
+import_ms = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+module.app
+create_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"sqlalchemy_ms": sqlalchemy_ms, "import_ms": import_ms, "create_app_ms": create_ms, **counts}))
+'''
+
+
+def run_child(env):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - start) * 1000
+    return sample
+
+
+def run(runs, database_url=None):
+    env = dict(os.environ)
+    if database_url:
+        env['DATABASE_URL'] = database_url
+    run_child(env)  # warm the filesystem and bytecode caches
+
+    samples = [run_child(env) for _ in range(runs)]
+    summary = {"runs": runs, "database_url": database_url or "config default"}
+    for field in ("sqlalchemy_ms", "import_ms", "create_app_ms", "process_ms"):
+        values = [sample[field] for sample in samples]
+        summary[field] = {
+            "p50": round(percentile(values, 50), 2),
+            "p95": round(percentile(values, 95), 2),
+            "min": round(min(values), 2),
+        }
+    summary["connects"] = max(sample["connects"] for sample in samples)
+    summary["statements"] = max(sample["statements"] for sample in samples)
+
+    for field in ("import_ms", "create_app_ms", "process_ms"):
+        print(f"{field:<15} p50={summary[field]['p50']:.1f}ms  p95={summary[field]['p95']:.1f}ms")
+    print(f"connections opened: {summary['connects']}  statements executed: {summary['statements']}")
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--database-url', help="Override DATABASE_URL for the child processes")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    summary = run(args.runs, args.database_url)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+    if summary["connects"] or summary["statements"]:
+        sys.exit("app startup touched the database")
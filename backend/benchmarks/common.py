@@ -0,0 +1,128 @@
+"""
+Shared setup for the benchmark scripts: builds the app with create_app()
+against a throwaway SQLite database and seeds it with synthetic data.
+"""
+import http.client
+import os
+import socket
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PRIORITIES = ['low', 'medium', 'high']
+
+
+def create_bench_app(db_path=None, **config):
+    """Returns an app bound to a fresh SQLite file, with rate limiting off"""
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(prefix='taskflow-bench-', suffix='.db')
+        os.close(fd)
+    uri = f"sqlite:///{db_path}"
+
+    from app import create_app
+    from commands import init_db
+    from config import Config
+    from seed import seed_data
+
+    config.setdefault('SQLALCHEMY_DATABASE_URI', uri)
+    config.setdefault('RATELIMIT_ENABLED', False)
+    bench_config = type('BenchConfig', (Config,), config)
+    app = create_app(bench_config)
+    with app.app_context():
+        init_db()
+        seed_data()
+    return app
+
+
+def make_vocabulary(size, seed=7):
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def seed_tasks(app, count, lists=5, tags=20, vocabulary=None, batch_size=5000, seed=7):
+    """Bulk-inserts count tasks spread over lists and tags; returns the vocabulary used"""
+    from extensions import db
+    from models import Task, TaskList, Tag, task_tags
+    from sqlalchemy import insert, func
+
+    rng = random.Random(seed)
+    vocabulary = vocabulary or make_vocabulary(2000, seed)
+    with app.app_context():
+        existing_lists = db.session.query(func.count(TaskList.id)).scalar()
+        if existing_lists < lists:
+            db.session.add_all([TaskList(name=f"Bench list {i}") for i in range(existing_lists, lists)])
+        existing_tags = db.session.query(func.count(Tag.id)).scalar()
+        if existing_tags < tags:
+            db.session.add_all([Tag(name=f"bench-tag-{i}") for i in range(existing_tags, tags)])
+        db.session.commit()
+        list_ids = [row[0] for row in db.session.query(TaskList.id)]
+        tag_ids = [row[0] for row in db.session.query(Tag.id)]
+        start_id = (db.session.query(func.max(Task.id)).scalar() or 0) + 1
+
+        now = datetime.utcnow()
+        for offset in range(0, count, batch_size):
+            rows, links = [], []
+            for i in range(offset, min(offset + batch_size, count)):
+                task_id = start_id + i
+                rows.append({
+                    "id": task_id,
+                    "title": ' '.join(rng.sample(vocabulary, 3)),
+                    "description": ' '.join(rng.sample(vocabulary, 8)),
+                    "completed": rng.random() < 0.3,
+                    "priority": rng.choice(PRIORITIES),
+                    "due_date": (now + timedelta(days=rng.randint(-30, 30))).date() if rng.random() < 0.5 else None,
+                    "list_id": rng.choice(list_ids),
+                    "created_at": now - timedelta(seconds=count - i),
+                    "updated_at": now - timedelta(seconds=count - i),
+                })
+                links.extend({"task_id": task_id, "tag_id": tag_id} for tag_id in rng.sample(tag_ids, 2))
+            db.session.execute(insert(Task), rows)
+            db.session.execute(insert(task_tags), links)
+            db.session.commit()
+
+        from utils.stats_calculator import recalculate_list_counts, rebuild_stats_aggregates
+        recalculate_list_counts()
+        rebuild_stats_aggregates()
+    return vocabulary
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not come up")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
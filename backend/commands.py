@@ -0,0 +1,118 @@
+import click
+from flask import current_app
+from sqlalchemy import inspect
+from extensions import db
+
+# migrations/versions/888fa6c8eca9_baseline_schema.py: the tables create_all
+# made before the project had migrations
+BASELINE_REVISION = '888fa6c8eca9'
+
+
+def init_db():
+    """
+    Brings the schema up to date with the Flask-Migrate revisions. A database
+    that has tables but no alembic_version was set up by create_all: it is
+    stamped at the baseline, and the later revisions add what it lacks.
+    Returns what was done.
+    """
+    from flask_migrate import stamp, upgrade
+
+    with db.engine.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+    stamped = bool(tables) and 'alembic_version' not in tables
+    if stamped:
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+    return 'stamped at the baseline and upgraded' if stamped else 'upgraded'
+
+
+def load_demo_data():
+    from seed import seed_data
+
+    if seed_data():
+        click.echo("Demo data loaded")
+    else:
+        click.echo("Database already has data, skipping seed")
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    @click.option('--seed', is_flag=True, help="Also load the demo data into an empty database.")
+    def init_db_command(seed):
+        """Create or upgrade the database schema."""
+        method = init_db()
+        click.echo(f"Schema ready ({method})")
+        if seed:
+            load_demo_data()
+
+    @app.cli.command('seed')
+    def seed_command():
+        """Load the demo lists, tasks and stats into an empty database."""
+        load_demo_data()
+
+    @app.cli.command('recalc-counts')
+    def recalc_counts():
+        """Reconcile list task counts and the stats aggregates with the tasks table."""
+        from utils.stats_calculator import recalculate_list_counts, rebuild_stats_aggregates
+
+        corrected = recalculate_list_counts()
+        rebuild_stats_aggregates()
+        click.echo(f"Task counts reconciled ({corrected} lists corrected), stats aggregates rebuilt")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search():
+        """Create the full-text search index if missing and repopulate it."""
+        from utils.search import rebuild_search_index
+
+        backend = rebuild_search_index()
+        click.echo(f"Search index rebuilt (backend: {backend})")
+
+    @app.cli.command('prune-deletion-log')
+    @click.option('--days', type=int, default=None, help="Keep this many days of tombstones (default: CHANGES_RETENTION_DAYS).")
+    def prune_deletion_log(days):
+        """Delete change-sync tombstones older than the retention period."""
+        from datetime import datetime, timedelta
+        from models import DeletionLog
+
+        days = days if days is not None else current_app.config.get('CHANGES_RETENTION_DAYS', 30)
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        deleted = DeletionLog.query.filter(DeletionLog.deleted_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        click.echo(f"Removed {deleted} tombstones older than {days} days")
+
+    @app.cli.command('purge-completed')
+    @click.option('--days', type=int, default=None, help="Purge tasks completed more than this many days ago (default: PURGE_COMPLETED_AFTER_DAYS).")
+    @click.option('--chunk-size', type=click.IntRange(min=1), default=None, help="Tasks per transaction (default: PURGE_CHUNK_SIZE).")
+    @click.option('--archive', is_flag=True, help="Copy the tasks into archived_tasks before deleting them.")
+    @click.option('--pause', type=float, default=0.0, help="Seconds to sleep between chunks.")
+    def purge_completed_command(days, chunk_size, archive, pause):
+        """Delete (or archive) old completed tasks in bounded chunks."""
+        from datetime import datetime, timedelta
+        from utils.purge import purge_completed
+
+        days = days if days is not None else current_app.config.get('PURGE_COMPLETED_AFTER_DAYS', 90)
+        chunk_size = chunk_size or current_app.config.get('PURGE_CHUNK_SIZE', 1000)
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        total = 0
+        for purged in purge_completed(cutoff, chunk_size, archive, pause):
+            total += purged
+            click.echo(f"  {total} tasks {'archived' if archive else 'purged'}")
+        click.echo(f"{'Archived' if archive else 'Purged'} {total} tasks completed more than {days} days ago")
+
+    @app.cli.command('generate-recurrences')
+    @click.option('--horizon-days', type=click.IntRange(min=0), default=None, help="Create occurrences up to this many days ahead (default: RECURRENCE_HORIZON_DAYS).")
+    @click.option('--batch-size', type=click.IntRange(min=1), default=None, help="Templates per transaction (default: RECURRENCE_BATCH_SIZE).")
+    def generate_recurrences_command(horizon_days, batch_size):
+        """Create the upcoming tasks of recurring templates; safe to rerun."""
+        from datetime import date, timedelta
+        from utils.templates import generate_recurrences
+
+        horizon_days = horizon_days if horizon_days is not None else current_app.config.get('RECURRENCE_HORIZON_DAYS', 30)
+        batch_size = batch_size or current_app.config.get('RECURRENCE_BATCH_SIZE', 100)
+        through = date.today() + timedelta(days=horizon_days)
+        templates = created = 0
+        for batch_templates, batch_created in generate_recurrences(db.session, through, batch_size):
+            templates += batch_templates
+            created += batch_created
+            click.echo(f"  {templates} templates, {created} tasks")
+        click.echo(f"Created {created} tasks from {templates} recurring templates through {through.isoformat()}")
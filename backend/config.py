@@ -16,13 +16,97 @@ class Config:
     DB_NAME = os.environ.get('MYSQL_DB', 'taskflow')
     
     # Use PyMySQL driver (more portable than mysqlclient)
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{quote_plus(DB_USER)}:{quote_plus(DB_PASS)}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL',
+        f"mysql+pymysql://{quote_plus(DB_USER)}:{quote_plus(DB_PASS)}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+    )
+    
+    # Task search: 'auto' picks FULLTEXT on MySQL, FTS5 on SQLite, else LIKE
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
     
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
     
-    # Rate Limiting
-    RATELIMIT_STORAGE_URI = "memory://"
+    # Rows fetched per server-side cursor batch by GET /api/tasks/export
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    
+    # Records committed per transaction by POST /api/tasks/import, and the
+    # number of per-line errors echoed back in its summary
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 1000))
+    IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', 1000))
+    
+    # Upper bound on the number of tasks accepted by POST /api/tasks/bulk
+    BULK_MAX_TASKS = int(os.environ.get('BULK_MAX_TASKS', 5000))
+    # Ids per statement when bulk-completing tasks
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
+    
+    # `flask purge-completed`: age of the completed tasks it removes, and tasks per transaction
+    PURGE_COMPLETED_AFTER_DAYS = int(os.environ.get('PURGE_COMPLETED_AFTER_DAYS', 90))
+    PURGE_CHUNK_SIZE = int(os.environ.get('PURGE_CHUNK_SIZE', 1000))
+    
+    # `flask generate-recurrences`: days ahead to create recurring tasks for, and templates per transaction
+    RECURRENCE_HORIZON_DAYS = int(os.environ.get('RECURRENCE_HORIZON_DAYS', 30))
+    RECURRENCE_BATCH_SIZE = int(os.environ.get('RECURRENCE_BATCH_SIZE', 100))
+    
+    # Upper bound on the number of operations accepted by POST /api/batch
+    BATCH_MAX_OPERATIONS = int(os.environ.get('BATCH_MAX_OPERATIONS', 50))
+    
+    # Response cache for GET /api/tasks, /api/lists and /api/stats. Entries are
+    # per process; the versions that invalidate them are shared by the workers
+    # on one host through a file (default: <instance path>/cache-versions)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 10))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    RESPONSE_CACHE_VERSIONS_PATH = os.environ.get('RESPONSE_CACHE_VERSIONS_PATH')
+    
+    # 'fast' uses the compiled serializer and orjson (utils/serializers.py), 'marshmallow' the plain schemas
+    SERIALIZER = os.environ.get('SERIALIZER', 'fast')
+    
+    # Connection pool (the sizing options are skipped for in-memory SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    # Below MySQL's wait_timeout so idle connections are replaced before the server drops them
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # Comma-separated read replica URIs for the read-only routes (round-robin), and
+    # how long a client that just wrote keeps reading from the primary
+    REPLICA_DATABASE_URIS = [uri.strip() for uri in os.environ.get('REPLICA_DATABASE_URLS', '').split(',') if uri.strip()]
+    REPLICA_READ_YOUR_WRITES_SECONDS = int(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5))
+    
+    # GET /api/tasks/changes: changes younger than the settle delay wait for the
+    # next poll so writes still committing are not skipped; tombstones are kept
+    # for the retention period and older sync tokens must resync from scratch
+    CHANGES_SETTLE_SECONDS = float(os.environ.get('CHANGES_SETTLE_SECONDS', 2))
+    CHANGES_RETENTION_DAYS = int(os.environ.get('CHANGES_RETENTION_DAYS', 30))
+    
+    # GET /api/events (ASGI mode): events kept for Last-Event-ID resume, per-client
+    # queue bound (oldest dropped first), heartbeat interval and connection cap
+    EVENTS_REPLAY_SIZE = int(os.environ.get('EVENTS_REPLAY_SIZE', 1024))
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 256))
+    EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 10000))
+    
+    # Tag name -> id cache used by tag resolution and the ?tag= filter (per process)
+    TAG_CACHE_MAX_ENTRIES = int(os.environ.get('TAG_CACHE_MAX_ENTRIES', 10000))
+    TAG_CACHE_TTL = int(os.environ.get('TAG_CACHE_TTL', 300))
+    
+    # Per-request SQL/timing instrumentation: Server-Timing header, log line and
+    # /api/metrics histograms for a sampled fraction of requests (0.0 - 1.0)
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 1.0))
+    
+    # Rate Limiting: memory:// counts per worker; mmap:// (utils/rate_limit_storage.py)
+    # shares counters between the workers on one host. With mmap:// the
+    # moving-window strategy is a constant-memory sliding-window counter; a
+    # bare mmap:// keeps its file in the app's instance folder. Give it
+    # ?slots= of several times clients x limits, e.g. "mmap://?slots=262144",
+    # or the least recently seen clients get evicted and their counts reset.
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', "memory://")
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'moving-window')
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
     
     # Frontend URL
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
@@ -1,3 +1,4 @@
+import os
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_marshmallow import Marshmallow
@@ -5,8 +6,13 @@ from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_jwt_extended import JWTManager
+from utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+if os.name == 'posix':
+    # Registers the mmap:// rate limit storage scheme
+    import utils.rate_limit_storage  # noqa: F401
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 ma = Marshmallow()
 cors = CORS()
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings. With preload the app is imported once in the master and
+forked; the post_fork hook drops any pooled connections inherited from the
+master so workers never share a socket.
+
+The ASGI mode runs under the same settings with uvicorn's worker class:
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# Import the app once in the master; workers then start by fork
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def post_fork(server, worker):
+    # Lets the app see it is one of several processes (utils/events.py)
+    os.environ['WEB_CONCURRENCY'] = str(server.cfg.workers)
+    if not server.cfg.preload_app:
+        return
+    from extensions import db
+
+    app = server.app.wsgi()
+    if not hasattr(app, 'app_context'):
+        # asgi:app creates its engine in each worker's lifespan, after the fork
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's connections to the parent
+            engine.dispose(close=False)
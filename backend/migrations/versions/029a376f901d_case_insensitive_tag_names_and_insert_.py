@@ -0,0 +1,66 @@
+"""case-insensitive tag names and insert batches
+
+Tag names unique regardless of case, and tasks.insert_batch, which marks the
+rows of one bulk INSERT so their ids can be read back without RETURNING.
+
+MySQL's utf8mb4_unicode_ci collation already compares tag names that way.
+On SQLite the name column becomes NOCASE; tags that differ only in case are
+merged into the oldest one first, which keeps their tasks.
+
+Revision ID: 029a376f901d
+Revises: 9c5e5b4ee708
+Create Date: 2026-10-17 08:18:19.749954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index, dialect_name, has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '029a376f901d'
+down_revision = '9c5e5b4ee708'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_column('tasks', 'insert_batch'):
+        with op.batch_alter_table('tasks') as batch_op:
+            batch_op.add_column(sa.Column('insert_batch', sa.String(length=32), nullable=True))
+    create_index('ix_tasks_insert_batch', 'tasks', ['insert_batch'])
+
+    if dialect_name() == 'sqlite' and not tag_names_nocase():
+        # UPDATE OR IGNORE leaves the task_tags rows of tasks that already
+        # have the kept tag; the DELETE after it removes them
+        op.execute(
+            "UPDATE OR IGNORE task_tags SET tag_id = ("
+            "SELECT MIN(kept.id) FROM tags AS kept, tags AS merged "
+            "WHERE merged.id = task_tags.tag_id AND kept.name = merged.name COLLATE NOCASE)"
+        )
+        op.execute("DELETE FROM task_tags WHERE tag_id NOT IN (SELECT MIN(id) FROM tags GROUP BY name COLLATE NOCASE)")
+        op.execute("DELETE FROM tags WHERE id NOT IN (SELECT MIN(id) FROM tags GROUP BY name COLLATE NOCASE)")
+        # SQLite has no ALTER COLUMN: batch mode rebuilds the table
+        with op.batch_alter_table('tags', recreate='always') as batch_op:
+            batch_op.alter_column(
+                'name', existing_type=sa.String(length=50), existing_nullable=False,
+                type_=sa.String(length=50, collation='NOCASE')
+            )
+
+
+def downgrade():
+    if dialect_name() == 'sqlite':
+        with op.batch_alter_table('tags', recreate='always') as batch_op:
+            batch_op.alter_column(
+                'name', existing_type=sa.String(length=50, collation='NOCASE'), existing_nullable=False,
+                type_=sa.String(length=50)
+            )
+    op.drop_index('ix_tasks_insert_batch', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('insert_batch')
+
+
+def tag_names_nocase():
+    # SQLite does not reflect collations; read the table's DDL instead
+    ddl = op.get_bind().exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tags'").scalar()
+    return 'NOCASE' in ddl.upper()
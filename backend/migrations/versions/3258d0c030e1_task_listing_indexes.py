@@ -0,0 +1,38 @@
+"""task listing indexes
+
+The composite indexes that cover GET /api/tasks' filters together with its
+(created_at, id) keyset order.
+
+Revision ID: 3258d0c030e1
+Revises: 888fa6c8eca9
+Create Date: 2026-10-17 08:18:14.530316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index
+
+
+# revision identifiers, used by Alembic.
+revision = '3258d0c030e1'
+down_revision = '888fa6c8eca9'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    'ix_tasks_created_at_id': ['created_at', 'id'],
+    'ix_tasks_list_created_at_id': ['list_id', 'created_at', 'id'],
+    'ix_tasks_priority_created_at_id': ['priority', 'created_at', 'id'],
+    'ix_tasks_list_priority_created_at_id': ['list_id', 'priority', 'created_at', 'id'],
+}
+
+
+def upgrade():
+    for name, columns in INDEXES.items():
+        create_index(name, 'tasks', columns)
+
+
+def downgrade():
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name='tasks')
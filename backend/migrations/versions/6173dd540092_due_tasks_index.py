@@ -0,0 +1,28 @@
+"""due tasks index
+
+The (completed, due_date, id) index that GET /api/tasks/due scans open tasks
+through.
+
+Revision ID: 6173dd540092
+Revises: e963a0f316d0
+Create Date: 2026-10-17 08:18:32.061846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index
+
+
+# revision identifiers, used by Alembic.
+revision = '6173dd540092'
+down_revision = 'e963a0f316d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index('ix_tasks_completed_due_date_id', 'tasks', ['completed', 'due_date', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_completed_due_date_id', table_name='tasks')
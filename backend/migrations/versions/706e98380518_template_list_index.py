@@ -0,0 +1,28 @@
+"""template list index
+
+An index on task_templates.list_id, which ON DELETE SET NULL looks templates
+up by when a list is deleted.
+
+Revision ID: 706e98380518
+Revises: b38fc4a712fb
+Create Date: 2026-10-17 08:18:37.025560
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index
+
+
+# revision identifiers, used by Alembic.
+revision = '706e98380518'
+down_revision = 'b38fc4a712fb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index('ix_task_templates_list_id', 'task_templates', ['list_id'])
+
+
+def downgrade():
+    op.drop_index('ix_task_templates_list_id', table_name='task_templates')
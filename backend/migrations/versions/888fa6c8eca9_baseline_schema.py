@@ -0,0 +1,96 @@
+"""baseline schema
+
+The tables as `db.create_all()` created them before the project shipped
+migrations. `flask init-db` stamps databases that already have tables at
+this revision instead of running it.
+
+Revision ID: 888fa6c8eca9
+Revises: 
+Create Date: 2026-10-17 08:17:40.110849
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '888fa6c8eca9'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+PRIORITY = sa.Enum('low', 'medium', 'high')
+
+
+def upgrade():
+    op.create_table(
+        'task_lists',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('color', sa.String(length=7), nullable=False),
+        sa.Column('task_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'tags',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('color', sa.String(length=7), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table(
+        'user_stats',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('current_streak', sa.Integer(), nullable=False),
+        sa.Column('longest_streak', sa.Integer(), nullable=False),
+        sa.Column('tasks_completed_today', sa.Integer(), nullable=False),
+        sa.Column('tasks_completed_total', sa.Integer(), nullable=False),
+        sa.Column('last_completed_date', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'tasks',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('priority', PRIORITY, nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=True),
+        sa.Column('list_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['list_id'], ['task_lists.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'task_templates',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('priority', PRIORITY, nullable=False),
+        sa.Column('due_offset_days', sa.Integer(), nullable=False),
+        sa.Column('list_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['list_id'], ['task_lists.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'task_tags',
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id', 'tag_id')
+    )
+
+
+def downgrade():
+    op.drop_table('task_tags')
+    op.drop_table('task_templates')
+    op.drop_table('tasks')
+    op.drop_table('user_stats')
+    op.drop_table('tags')
+    op.drop_table('task_lists')
@@ -0,0 +1,43 @@
+"""task search index
+
+The full-text index behind ?search=: a FULLTEXT index on MySQL, the tasks_fts
+FTS5 table and its triggers on SQLite builds that have FTS5. Other databases
+keep the LIKE fallback (utils/search.py).
+
+Revision ID: 9c5e5b4ee708
+Revises: 3258d0c030e1
+Create Date: 2026-10-17 08:18:17.221169
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from models import MYSQL_FULLTEXT_DDL, SQLITE_FTS_DDL, fts5_available
+from utils.migrations import FTS_TRIGGERS, dialect_name, has_index, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '9c5e5b4ee708'
+down_revision = '3258d0c030e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if dialect_name() == 'mysql':
+        if not has_index('tasks', 'ix_tasks_fulltext'):
+            op.execute(MYSQL_FULLTEXT_DDL)
+    elif dialect_name() == 'sqlite' and fts5_available(None, None, op.get_bind()):
+        if not has_table('tasks_fts'):
+            for statement in SQLITE_FTS_DDL:
+                op.execute(statement)
+            # Index the tasks that are already there
+            op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if dialect_name() == 'mysql':
+        op.drop_index('ix_tasks_fulltext', table_name='tasks')
+    elif dialect_name() == 'sqlite':
+        for trigger in FTS_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -0,0 +1,39 @@
+"""deletion log
+
+The deletion_log tombstones and the (updated_at, id) index that
+GET /api/tasks/changes reads.
+
+Revision ID: aee0e26a676b
+Revises: f940c989fbec
+Create Date: 2026-10-17 08:18:24.555780
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = 'aee0e26a676b'
+down_revision = 'f940c989fbec'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table('deletion_log'):
+        op.create_table(
+            'deletion_log',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('entity', sa.Enum('task', 'list'), nullable=False),
+            sa.Column('entity_id', sa.Integer(), nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    create_index('ix_deletion_log_deleted_at_id', 'deletion_log', ['deleted_at', 'id'])
+    create_index('ix_tasks_updated_at_id', 'tasks', ['updated_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tasks_updated_at_id', table_name='tasks')
+    op.drop_table('deletion_log')
@@ -0,0 +1,69 @@
+"""template instances and recurrence
+
+Tasks created from templates and recurring templates: tasks.template_id and
+occurrence_date with one task per (template_id, occurrence_date), the
+recurrence fields of task_templates, and ON DELETE SET NULL on
+task_templates.list_id so deleting a list keeps its templates.
+
+SQLite cannot add a foreign key or a unique constraint to an existing table;
+batch mode rebuilds tasks there, and the search triggers with it.
+
+Revision ID: b38fc4a712fb
+Revises: 6173dd540092
+Create Date: 2026-10-17 08:18:34.598720
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import (
+    NAMING_CONVENTION, foreign_key_name, has_column, has_unique_constraint, restore_fts_triggers,
+    set_foreign_key_ondelete
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'b38fc4a712fb'
+down_revision = '6173dd540092'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_template_id = not has_column('tasks', 'template_id')
+    add_unique = not has_unique_constraint('tasks', 'uq_tasks_template_occurrence')
+    if add_template_id or add_unique:
+        with op.batch_alter_table('tasks', naming_convention=NAMING_CONVENTION) as batch_op:
+            if add_template_id:
+                batch_op.add_column(sa.Column('template_id', sa.Integer(), nullable=True))
+                batch_op.add_column(sa.Column('occurrence_date', sa.Date(), nullable=True))
+                batch_op.create_foreign_key(
+                    foreign_key_name('tasks', 'template_id', 'task_templates'), 'task_templates',
+                    ['template_id'], ['id'], ondelete='SET NULL'
+                )
+            if add_unique:
+                batch_op.create_unique_constraint('uq_tasks_template_occurrence', ['template_id', 'occurrence_date'])
+        restore_fts_triggers()
+
+    if not has_column('task_templates', 'recurrence'):
+        with op.batch_alter_table('task_templates') as batch_op:
+            batch_op.add_column(sa.Column('recurrence', sa.Enum('daily', 'weekly', 'monthly'), nullable=True))
+            batch_op.add_column(sa.Column('recurrence_interval', sa.Integer(), nullable=False, server_default='1'))
+            batch_op.add_column(sa.Column('starts_on', sa.Date(), nullable=True))
+            batch_op.add_column(sa.Column('ends_on', sa.Date(), nullable=True))
+            batch_op.add_column(sa.Column('generated_through', sa.Date(), nullable=True))
+    set_foreign_key_ondelete('task_templates', 'list_id', 'task_lists', 'SET NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('task_templates') as batch_op:
+        batch_op.drop_column('generated_through')
+        batch_op.drop_column('ends_on')
+        batch_op.drop_column('starts_on')
+        batch_op.drop_column('recurrence_interval')
+        batch_op.drop_column('recurrence')
+    with op.batch_alter_table('tasks', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('uq_tasks_template_occurrence', type_='unique')
+        batch_op.drop_constraint(foreign_key_name('tasks', 'template_id', 'task_templates'), type_='foreignkey')
+        batch_op.drop_column('occurrence_date')
+        batch_op.drop_column('template_id')
+    restore_fts_triggers()
@@ -0,0 +1,28 @@
+"""tag filter index
+
+The (tag_id, task_id) index that ?tag= filters go through, from a tag to its
+tasks.
+
+Revision ID: c0b43f733e51
+Revises: aee0e26a676b
+Create Date: 2026-10-17 08:18:27.047437
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0b43f733e51'
+down_revision = 'aee0e26a676b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index('ix_task_tags_tag_id_task_id', 'task_tags', ['tag_id', 'task_id'])
+
+
+def downgrade():
+    op.drop_index('ix_task_tags_tag_id_task_id', table_name='task_tags')
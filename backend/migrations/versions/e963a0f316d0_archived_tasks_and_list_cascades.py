@@ -0,0 +1,54 @@
+"""archived tasks and list cascades
+
+archived_tasks for `flask purge-completed --archive`, and ON DELETE CASCADE
+on the foreign keys into tasks and task_tags: deleting a list is one DELETE
+that the database cascades (TaskList.tasks and Task.tags use passive_deletes).
+
+Databases created from the models already have the cascades; the foreign
+keys are only recreated where they lack them.
+
+Revision ID: e963a0f316d0
+Revises: c0b43f733e51
+Create Date: 2026-10-17 08:18:29.672337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index, has_table, restore_fts_triggers, set_foreign_key_ondelete
+
+
+# revision identifiers, used by Alembic.
+revision = 'e963a0f316d0'
+down_revision = 'c0b43f733e51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table('archived_tasks'):
+        op.create_table(
+            'archived_tasks',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('priority', sa.Enum('low', 'medium', 'high'), nullable=False),
+            sa.Column('due_date', sa.Date(), nullable=True),
+            sa.Column('list_id', sa.Integer(), nullable=False),
+            sa.Column('tag_names', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.Column('completed_at', sa.DateTime(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    create_index('ix_archived_tasks_list_id', 'archived_tasks', ['list_id'])
+
+    if set_foreign_key_ondelete('tasks', 'list_id', 'task_lists', 'CASCADE'):
+        restore_fts_triggers()
+    set_foreign_key_ondelete('task_tags', 'task_id', 'tasks', 'CASCADE')
+    set_foreign_key_ondelete('task_tags', 'tag_id', 'tags', 'CASCADE')
+
+
+def downgrade():
+    # The cascades were part of the baseline schema; they stay
+    op.drop_table('archived_tasks')
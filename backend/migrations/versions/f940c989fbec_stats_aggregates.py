@@ -0,0 +1,88 @@
+"""stats aggregates
+
+Materialized stats: tasks.completed_at, the task totals on user_stats and the
+daily_completions rollup, backfilled from the tasks already there the way
+`flask recalc-counts` rebuilds them.
+
+Revision ID: f940c989fbec
+Revises: 029a376f901d
+Create Date: 2026-10-17 08:18:22.093058
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.migrations import create_index, has_column, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = 'f940c989fbec'
+down_revision = '029a376f901d'
+branch_labels = None
+depends_on = None
+
+
+tasks = sa.table(
+    'tasks',
+    sa.column('id', sa.Integer),
+    sa.column('completed', sa.Boolean),
+    sa.column('completed_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+user_stats = sa.table(
+    'user_stats',
+    sa.column('task_count', sa.Integer),
+    sa.column('completed_task_count', sa.Integer),
+)
+daily_completions = sa.table(
+    'daily_completions',
+    sa.column('day', sa.Date),
+    sa.column('count', sa.Integer),
+)
+
+
+def upgrade():
+    if not has_column('tasks', 'completed_at'):
+        with op.batch_alter_table('tasks') as batch_op:
+            batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+        # Tasks completed before completed_at existed fall back to updated_at
+        op.execute(
+            tasks.update()
+            .where(tasks.c.completed == sa.true())
+            .values(completed_at=tasks.c.updated_at)
+        )
+    create_index('ix_tasks_completed_at', 'tasks', ['completed_at'])
+
+    if not has_column('user_stats', 'task_count'):
+        with op.batch_alter_table('user_stats') as batch_op:
+            batch_op.add_column(sa.Column('task_count', sa.Integer(), nullable=False, server_default='0'))
+            batch_op.add_column(sa.Column('completed_task_count', sa.Integer(), nullable=False, server_default='0'))
+        op.execute(user_stats.update().values(
+            task_count=sa.select(sa.func.count(tasks.c.id)).scalar_subquery(),
+            completed_task_count=sa.select(sa.func.count(tasks.c.id))
+            .where(tasks.c.completed == sa.true()).scalar_subquery(),
+        ))
+
+    if not has_table('daily_completions'):
+        op.create_table(
+            'daily_completions',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('day')
+        )
+        day = sa.func.date(tasks.c.completed_at)
+        op.execute(daily_completions.insert().from_select(
+            ['day', 'count'],
+            sa.select(day, sa.func.count(tasks.c.id))
+            .where(tasks.c.completed == sa.true(), tasks.c.completed_at.isnot(None))
+            .group_by(day)
+        ))
+
+
+def downgrade():
+    op.drop_table('daily_completions')
+    with op.batch_alter_table('user_stats') as batch_op:
+        batch_op.drop_column('completed_task_count')
+        batch_op.drop_column('task_count')
+    op.drop_index('ix_tasks_completed_at', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('completed_at')
@@ -1,14 +1,16 @@
 from datetime import datetime
 from extensions import db
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, Boolean, Date, ForeignKey, Enum, Integer, Table, Column
+from sqlalchemy import String, Text, Boolean, Date, ForeignKey, Enum, Integer, Table, Column, Index, UniqueConstraint, DDL, JSON, event
 
 # Many-to-Many association table for Task-Tags
 task_tags = Table(
     'task_tags',
     db.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves lookups by task; ?tag= filters go from tag to tasks
+    Index('ix_task_tags_tag_id_task_id', 'tag_id', 'task_id')
 )
 
 class TaskList(db.Model):
@@ -20,7 +22,9 @@ class TaskList(db.Model):
     task_count: Mapped[int] = mapped_column(default=0)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     
-    tasks = relationship("Task", back_populates="task_list", cascade="all, delete-orphan")
+    # Deleting a list is one DELETE: the database's ON DELETE CASCADE removes
+    # its tasks and their task_tags rows instead of the ORM loading them
+    tasks = relationship("Task", back_populates="task_list", cascade="all, delete-orphan", passive_deletes=True)
 
 class Task(db.Model):
     __tablename__ = 'tasks'
@@ -34,15 +38,67 @@ class Task(db.Model):
     list_id: Mapped[int] = mapped_column(ForeignKey('task_lists.id', ondelete='CASCADE'), nullable=False)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at: Mapped[datetime] = mapped_column(nullable=True, index=True)
+    # Set on tasks created from a template; occurrence_date only on recurrences
+    template_id: Mapped[int] = mapped_column(ForeignKey('task_templates.id', ondelete='SET NULL'), nullable=True)
+    occurrence_date: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    # Marks the rows of one bulk INSERT on databases without RETURNING (MySQL)
+    # so utils/bulk.py can read their ids back
+    insert_batch: Mapped[str] = mapped_column(String(32), nullable=True, index=True)
     
     task_list = relationship("TaskList", back_populates="tasks")
-    tags = relationship("Tag", secondary=task_tags, back_populates="tasks")
+    tags = relationship("Tag", secondary=task_tags, back_populates="tasks", passive_deletes=True)
+
+    # Every filter combination of GET /api/tasks ends in the (created_at, id)
+    # keyset order, so each one gets an index that covers the sort as well
+    __table_args__ = (
+        Index('ix_tasks_created_at_id', 'created_at', 'id'),
+        Index('ix_tasks_list_created_at_id', 'list_id', 'created_at', 'id'),
+        Index('ix_tasks_priority_created_at_id', 'priority', 'created_at', 'id'),
+        Index('ix_tasks_list_priority_created_at_id', 'list_id', 'priority', 'created_at', 'id'),
+        # GET /api/tasks/changes walks tasks in (updated_at, id) order
+        Index('ix_tasks_updated_at_id', 'updated_at', 'id'),
+        # GET /api/tasks/due scans open tasks by due date
+        Index('ix_tasks_completed_due_date_id', 'completed', 'due_date', 'id'),
+        # One task per occurrence: re-running the recurrence job inserts nothing twice
+        UniqueConstraint('template_id', 'occurrence_date', name='uq_tasks_template_occurrence'),
+    )
+
+# Full-text search index over title/description used by utils/search.py.
+# MySQL keeps a FULLTEXT index in sync by itself; SQLite gets an external
+# content FTS5 table that triggers keep in step with every write to tasks.
+MYSQL_FULLTEXT_DDL = "CREATE FULLTEXT INDEX ix_tasks_fulltext ON tasks (title, description)"
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+def fts5_available(ddl, target, bind, **kw):
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+event.listen(Task.__table__, 'after_create', DDL(MYSQL_FULLTEXT_DDL).execute_if(dialect='mysql'))
+for statement in SQLITE_FTS_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite', callable_=fts5_available))
+event.listen(Task.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect='sqlite'))
 
 class Tag(db.Model):
     __tablename__ = 'tags'
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    # Unique regardless of case: MySQL's utf8mb4_unicode_ci already compares
+    # that way, SQLite needs NOCASE (utils/tags.py matches names by tag_key)
+    name: Mapped[str] = mapped_column(
+        String(50).with_variant(String(50, collation='NOCASE'), 'sqlite'), unique=True, nullable=False
+    )
     color: Mapped[str] = mapped_column(String(7), default='#6b7280')
     
     tasks = relationship("Task", secondary=task_tags, back_populates="tags")
@@ -55,7 +111,16 @@ class TaskTemplate(db.Model):
     description: Mapped[str] = mapped_column(Text, nullable=True)
     priority: Mapped[str] = mapped_column(Enum('low', 'medium', 'high'), default='medium')
     due_offset_days: Mapped[int] = mapped_column(default=0)
-    list_id: Mapped[int] = mapped_column(ForeignKey('task_lists.id'), nullable=True)
+    # Indexed for ON DELETE SET NULL when a list goes
+    list_id: Mapped[int] = mapped_column(ForeignKey('task_lists.id', ondelete='SET NULL'), nullable=True, index=True)
+    # Optional recurrence: a task every recurrence_interval days/weeks/months
+    # from starts_on until ends_on. `flask generate-recurrences` has created
+    # the occurrences up to generated_through.
+    recurrence: Mapped[str] = mapped_column(Enum('daily', 'weekly', 'monthly'), nullable=True)
+    recurrence_interval: Mapped[int] = mapped_column(default=1)
+    starts_on: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    ends_on: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    generated_through: Mapped[datetime.date] = mapped_column(Date, nullable=True)
 
 class UserStats(db.Model):
     __tablename__ = 'user_stats'
@@ -66,4 +131,44 @@ class UserStats(db.Model):
     tasks_completed_today: Mapped[int] = mapped_column(default=0)
     tasks_completed_total: Mapped[int] = mapped_column(default=0)
     last_completed_date: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    # Materialized totals over the tasks table, kept current by utils/stats_calculator.py
+    task_count: Mapped[int] = mapped_column(default=0)
+    completed_task_count: Mapped[int] = mapped_column(default=0)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DeletionLog(db.Model):
+    __tablename__ = 'deletion_log'
+    
+    # Tombstones for GET /api/tasks/changes, written by the delete routes
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    entity: Mapped[str] = mapped_column(Enum('task', 'list'), nullable=False)
+    entity_id: Mapped[int] = mapped_column(nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_deletion_log_deleted_at_id', 'deleted_at', 'id'),
+    )
+
+class DailyCompletion(db.Model):
+    __tablename__ = 'daily_completions'
+    
+    # Number of existing tasks whose completed_at falls on this (UTC) day
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+class ArchivedTask(db.Model):
+    __tablename__ = 'archived_tasks'
+    
+    # Completed tasks moved out of tasks by `flask purge-completed --archive`.
+    # Keeps the original id; list_id has no foreign key as the list may go later.
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    priority: Mapped[str] = mapped_column(Enum('low', 'medium', 'high'), default='medium')
+    due_date: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    list_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    tag_names: Mapped[list] = mapped_column(JSON, default=list)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
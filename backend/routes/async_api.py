@@ -0,0 +1,206 @@
+"""
+async def handlers for the ASGI mode (asgi.py): tasks, lists, stats, templates
+and health over an AsyncSession, plus the /api/events stream. The bodies are
+the Flask routes' own (utils/endpoints.py), run on the async connection
+through session.run_sync and encoded by the same json_response, so both
+stacks answer a request with the same bytes.
+
+Each handler runs as the Flask route with the same method and path
+(@flask_route): inside the Flask app's context, under that route's rate
+limits, on the counters the WSGI routes use, and counted in /api/metrics.
+The response cache and replica routing stay Flask-only: these reads always
+go to the primary, uncached.
+"""
+import functools
+import time
+from flask import request as flask_request
+from flask_limiter import RateLimitExceeded
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from extensions import limiter
+from utils import endpoints, serializers
+from utils.events import broker, event_stream, unavailable_body
+from utils.instrumentation import record_request
+
+
+def json_response(payload, status=200):
+    """The Flask routes' json_response as a Starlette response (needs the app context)"""
+    response, status = serializers.json_response(payload, status)
+    return Response(response.get_data(), status_code=status, media_type=response.mimetype)
+
+
+async def read_json(request):
+    """The body as JSON, None unless it is valid JSON (like request.get_json(silent=True))"""
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if not (content_type == 'application/json'
+            or (content_type.startswith('application/') and content_type.endswith('+json'))):
+        return None
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def run(request, operation, *args):
+    """Runs a utils.endpoints body on a fresh AsyncSession and encodes its answer"""
+    async with request.app.state.sessionmaker() as session:
+        return json_response(*await session.run_sync(operation, *args))
+
+
+def check_rate_limits(flask_app, method, path, client):
+    """
+    Checks the limits of the Flask route serving method and path for client;
+    returns (its endpoint, the Flask app's 429 response or None)
+    """
+    with flask_app.test_request_context(path, method=method, environ_base={'REMOTE_ADDR': client}):
+        endpoint = flask_request.endpoint
+        try:
+            limiter.check()
+        except RateLimitExceeded as e:
+            rejected = flask_app.make_response(flask_app.handle_http_exception(e))
+            return endpoint, Response(rejected.get_data(), status_code=rejected.status_code,
+                                      media_type=rejected.mimetype)
+    return endpoint, None
+
+
+def flask_route(handler):
+    """Runs handler as the Flask route with the same method and path (see the module docstring)"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        flask_app = request.app.state.flask_app
+        start = time.perf_counter()
+        # Storage backends such as Redis block, keep them off the event loop
+        endpoint, response = await run_in_threadpool(
+            check_rate_limits, flask_app, request.method, request.url.path,
+            request.client.host if request.client else None
+        )
+        if response is None:
+            # The shared endpoint bodies read current_app's config and search backend
+            with flask_app.app_context():
+                response = await handler(request)
+        record_request(flask_app, request.method, endpoint, response.status_code, time.perf_counter() - start)
+        return response
+    return wrapper
+
+
+# Tasks
+
+@flask_route
+async def get_tasks(request):
+    return await run(request, endpoints.list_tasks, request.query_params)
+
+
+@flask_route
+async def create_task(request):
+    return await run(request, endpoints.create_task, await read_json(request))
+
+
+@flask_route
+async def update_task(request):
+    return await run(request, endpoints.update_task, request.path_params['id'], await read_json(request))
+
+
+@flask_route
+async def delete_task(request):
+    return await run(request, endpoints.delete_task, request.path_params['id'])
+
+
+@flask_route
+async def bulk_complete(request):
+    return await run(request, endpoints.bulk_complete, await read_json(request))
+
+
+@flask_route
+async def get_templates(request):
+    return await run(request, endpoints.list_templates)
+
+
+# Lists
+
+@flask_route
+async def get_lists(request):
+    return await run(request, endpoints.list_lists)
+
+
+@flask_route
+async def create_list(request):
+    return await run(request, endpoints.create_list, await read_json(request))
+
+
+@flask_route
+async def update_list(request):
+    return await run(request, endpoints.update_list, request.path_params['id'], await read_json(request))
+
+
+@flask_route
+async def delete_list(request):
+    return await run(request, endpoints.delete_list, request.path_params['id'])
+
+
+# Stats
+
+@flask_route
+async def get_stats(request):
+    return await run(request, endpoints.get_stats)
+
+
+@flask_route
+async def reset_streak(request):
+    return await run(request, endpoints.reset_streak)
+
+
+# Events
+
+async def events(request):
+    flask_app = request.app.state.flask_app
+    config = request.app.state.config
+    if not broker.enabled:
+        # Other workers' writes would never reach this stream
+        with flask_app.app_context():
+            return json_response(unavailable_body("the server runs several worker processes"), 501)
+    if broker.subscriber_count >= config.get('EVENTS_MAX_SUBSCRIBERS', 10000):
+        with flask_app.app_context():
+            return json_response({"error": "Too many event subscribers"}, 503)
+
+    # EventSource sends Last-Event-ID when it reconnects
+    last_event_id = request.headers.get('last-event-id') or request.query_params.get('last_event_id')
+    subscription, missed = broker.subscribe(config.get('EVENTS_QUEUE_SIZE', 256), last_event_id)
+
+    async def body():
+        try:
+            async for chunk in event_stream(subscription, missed, config.get('EVENTS_HEARTBEAT_SECONDS', 15)):
+                yield chunk
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(body(), media_type='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        # Stop nginx from buffering the stream
+        "X-Accel-Buffering": "no"
+    })
+
+
+# Health
+
+@flask_route
+async def health(request):
+    return await run(request, endpoints.check_health)
+
+
+routes = [
+    Route('/api/health', health, methods=['GET']),
+    Route('/api/events', events, methods=['GET']),
+    Route('/api/tasks', get_tasks, methods=['GET']),
+    Route('/api/tasks', create_task, methods=['POST']),
+    Route('/api/tasks/bulk-complete', bulk_complete, methods=['POST']),
+    Route('/api/tasks/templates', get_templates, methods=['GET']),
+    Route('/api/tasks/{id:int}', update_task, methods=['PUT']),
+    Route('/api/tasks/{id:int}', delete_task, methods=['DELETE']),
+    Route('/api/lists', get_lists, methods=['GET']),
+    Route('/api/lists', create_list, methods=['POST']),
+    Route('/api/lists/{id:int}', update_list, methods=['PUT']),
+    Route('/api/lists/{id:int}', delete_list, methods=['DELETE']),
+    Route('/api/stats', get_stats, methods=['GET']),
+    Route('/api/stats/reset-streak', reset_streak, methods=['POST']),
+]
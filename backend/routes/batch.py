@@ -0,0 +1,48 @@
+from flask import Blueprint, request, jsonify, current_app
+from extensions import db, limiter
+from utils.batch import parse_operations, run_batch, InvalidBatch
+from utils.query_budget import query_budget
+
+batch_bp = Blueprint('batch', __name__)
+
+
+def batch_cost():
+    # One hit per operation, in place of the default limits of the routes they call
+    data = request.get_json(silent=True)
+    try:
+        operations, _ = parse_operations(data, current_app.config.get('BATCH_MAX_OPERATIONS', 50))
+    except InvalidBatch:
+        return 1
+    return len(operations)
+
+
+@batch_bp.route('', methods=['POST'])
+@query_budget(statements=8, rows_scanned=100, indexed=('tasks',), json={"operations": [
+    {"method": "GET", "path": "/api/lists"},
+    {"method": "PUT", "path": "/api/tasks/10", "body": {"completed": True}},
+    {"method": "POST", "path": "/api/tasks", "body": {"title": "Budget check", "list_id": 1}},
+]})
+@limiter.limit("60 per minute", cost=batch_cost)
+def batch():
+    """
+    Runs {"operations": [{"method", "path", "body"}, ...], "atomic": true} in
+    one transaction and returns each operation's status and body, in order.
+    A failed atomic batch answers with the failing operation's status.
+    """
+    try:
+        operations, atomic = parse_operations(
+            request.get_json(silent=True), current_app.config.get('BATCH_MAX_OPERATIONS', 50)
+        )
+    except InvalidBatch as e:
+        return jsonify({"error": str(e)}), 400
+
+    results, committed = run_batch(db.session, operations, atomic)
+    if committed:
+        return jsonify({"atomic": atomic, "committed": True, "results": results}), 200
+    failed = next(i for i, result in enumerate(results) if result["status"] >= 400)
+    return jsonify({
+        "error": f"Operation {failed} failed, nothing was saved",
+        "atomic": atomic,
+        "committed": False,
+        "results": results
+    }), results[failed]["status"]
@@ -1,13 +1,41 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, current_app
 from extensions import db
+from utils.instrumentation import render_metrics
+from utils.db_routing import replica_reads, pool_status, render_pool_metrics
+from utils.tags import tag_cache
+from utils.query_budget import query_budget
+from utils.events import unavailable_body
+from utils.serializers import json_response
+from utils import endpoints
 
 health_bp = Blueprint('health', __name__)
 
 @health_bp.route('/health', methods=['GET'])
+@query_budget(statements=1)
+@replica_reads
 def health():
-    try:
-        # Check DB connection
-        db.session.execute(db.text('SELECT 1'))
-        return jsonify({"status": "healthy", "database": "connected"}), 200
-    except Exception as e:
-        return jsonify({"status": "unhealthy", "error": str(e)}), 500
+    return json_response(*endpoints.check_health(db.session))
+
+@health_bp.route('/health/cache', methods=['GET'])
+@query_budget(statements=0)
+def cache_stats():
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        return jsonify({"enabled": False, "tags": tag_cache.stats()}), 200
+    return jsonify({"enabled": True, **cache.stats(), "tags": tag_cache.stats()}), 200
+
+@health_bp.route('/metrics', methods=['GET'])
+@query_budget(statements=0)
+def metrics():
+    body = render_metrics(current_app) + render_pool_metrics(db.engines)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@health_bp.route('/health/pool', methods=['GET'])
+@query_budget(statements=0)
+def pool_stats():
+    return jsonify(pool_status(db.engines)), 200
+
+@health_bp.route('/events', methods=['GET'])
+def events():
+    # The stream is served by asgi:app; reached here, the app runs under WSGI
+    return jsonify(unavailable_body("the server runs the WSGI app (app:app), not asgi:app")), 501
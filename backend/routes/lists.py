@@ -1,41 +1,32 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request
 from extensions import db
-from models import TaskList
-from utils.validators import ListSchema
+from utils.cache import cached_response
+from utils.db_routing import replica_reads
+from utils.serializers import json_response
+from utils.query_budget import query_budget
+from utils import endpoints
 
 lists_bp = Blueprint('lists', __name__)
-list_schema = ListSchema()
-lists_schema = ListSchema(many=True)
 
 @lists_bp.route('', methods=['GET'])
+@query_budget(statements=1, rows_scanned=100)
+@cached_response('lists')
+@replica_reads
 def get_lists():
-    all_lists = TaskList.query.all()
-    return jsonify(lists_schema.dump(all_lists)), 200
+    return json_response(*endpoints.list_lists(db.session))
 
 @lists_bp.route('', methods=['POST'])
+@query_budget(statements=2, rows_scanned=100, json={"name": "Budget check"})
 def create_list():
-    data = request.json
-    errors = list_schema.validate(data)
-    if errors:
-        return jsonify(errors), 400
-    
-    new_list = TaskList(name=data['name'], color=data.get('color', '#3b82f6'))
-    db.session.add(new_list)
-    db.session.commit()
-    return jsonify(list_schema.dump(new_list)), 201
+    return json_response(*endpoints.create_list(db.session, request.get_json(silent=True)))
 
 @lists_bp.route('/<int:id>', methods=['PUT'])
+@query_budget(statements=3, rows_scanned=100, cases=[{"id": 1}], json={"name": "Budget check"})
 def update_list(id):
-    lst = TaskList.query.get_or_404(id)
-    data = request.json
-    lst.name = data.get('name', lst.name)
-    lst.color = data.get('color', lst.color)
-    db.session.commit()
-    return jsonify(list_schema.dump(lst)), 200
+    return json_response(*endpoints.update_list(db.session, id, request.get_json(silent=True)))
 
 @lists_bp.route('/<int:id>', methods=['DELETE'])
+# Reads the list's tasks three times: completions per day, totals and the cascade
+@query_budget(statements=7, rows_scanned=1500, indexed=('tasks', 'task_templates'), cases=[{"id": 5}])
 def delete_list(id):
-    lst = TaskList.query.get_or_404(id)
-    db.session.delete(lst)
-    db.session.commit()
-    return jsonify({"message": "List deleted"}), 200
+    return json_response(*endpoints.delete_list(db.session, id))
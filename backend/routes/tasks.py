@@ -1,126 +1,308 @@
-from flask import Blueprint, request, jsonify
+from datetime import date
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from extensions import db, limiter
-from models import Task, TaskList, Tag, task_tags, TaskTemplate
-from utils.validators import TaskSchema, TagSchema
-from utils.stats_calculator import update_streak_logic, recalculate_list_counts
-from sqlalchemy import or_
+from models import Task, TaskTemplate
+from utils.validators import TaskSchema, TemplateSchema, InstantiateSchema
+from utils.bulk import existing_list_ids, resolve_tag_ids, insert_tasks
+from utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from utils.cache import cached_response
+from utils.db_routing import replica_reads
+from utils.serializers import dump, json_response
+from utils.export import EXPORT_FORMATS, stream_export
+from utils.importer import IMPORT_FORMATS, detect_format, import_tasks
+from utils.changes import load_changes, ExpiredToken
+from utils.due import DUE_VIEWS, filter_view, view_range, view_counts
+from utils.events import queue_event
+from utils.templates import instantiate_templates
+from utils.query_budget import query_budget
+from utils import endpoints
+from sqlalchemy.orm import selectinload
+from marshmallow import ValidationError
 
 tasks_bp = Blueprint('tasks', __name__)
 task_schema = TaskSchema()
 tasks_schema = TaskSchema(many=True)
+template_schema = TemplateSchema()
+templates_schema = TemplateSchema(many=True)
+instantiate_schema = InstantiateSchema()
 
 @tasks_bp.route('', methods=['GET'])
+# Page mode counts every matching task; keyset mode only reads the page
+@query_budget(statements=3, indexed=('tasks', 'task_tags'), cases=[
+    {}, {"list_id": 1}, {"priority": "high"}, {"list_id": 1, "priority": "high"}, {"tag": "bench-tag-1"}
+])
+@query_budget(statements=2, rows_scanned=200, indexed=('tasks', 'task_tags'), cases=[
+    {"cursor": ""}, {"cursor": "", "list_id": 1}, {"cursor": "", "list_id": 1, "priority": "high"}
+])
+@cached_response('tasks')
+@replica_reads
 def get_tasks():
-    page = request.args.get('page', 1, type=int)
-    limit = request.args.get('limit', 20, type=int)
-    list_id = request.args.get('list_id', type=int)
-    priority = request.args.get('priority')
-    search = request.args.get('search')
-    
-    query = Task.query
-    
-    if list_id:
-        query = query.filter(Task.list_id == list_id)
-    if priority:
-        query = query.filter(Task.priority == priority)
-    if search:
-        query = query.filter(or_(Task.title.contains(search), Task.description.contains(search)))
-        
-    pagination = query.order_by(Task.created_at.desc()).paginate(page=page, per_page=limit, error_out=False)
-    
-    return jsonify({
-        "data": tasks_schema.dump(pagination.items),
-        "pagination": {
-            "page": pagination.page,
-            "limit": pagination.per_page,
-            "total": pagination.total,
-            "pages": pagination.pages
+    return json_response(*endpoints.list_tasks(db.session, request.args))
+
+@tasks_bp.route('/changes', methods=['GET'])
+@query_budget(statements=4, rows_scanned=1000, indexed=('tasks', 'deletion_log'))
+def get_task_changes():
+    """Tasks created or updated and tasks/lists deleted since the ?since= token"""
+    # Served by the primary: a lagging replica could hide writes older than the horizon
+    limit = max(1, min(request.args.get('limit', 500, type=int), 1000))
+    try:
+        tasks, tombstones, next_token, has_more = load_changes(
+            Task.query.options(selectinload(Task.tags)), db.session,
+            request.args.get('since', ''), limit,
+            current_app.config.get('CHANGES_SETTLE_SECONDS', 2),
+            current_app.config.get('CHANGES_RETENTION_DAYS', 30)
+        )
+    except InvalidCursor:
+        return jsonify({"error": "Invalid sync token"}), 400
+    except ExpiredToken as e:
+        return jsonify({"error": str(e), "resync": True}), 410
+
+    return json_response({
+        "data": dump(tasks_schema, tasks),
+        "deleted": {
+            "tasks": [t.entity_id for t in tombstones if t.entity == 'task'],
+            "lists": [t.entity_id for t in tombstones if t.entity == 'list']
         },
-        "filters": {
-            "list_id": list_id,
-            "priority": priority
+        "next": next_token,
+        "has_more": has_more
+    }, 200)
+
+@tasks_bp.route('/due', methods=['GET'])
+@query_budget(statements=3, indexed=('tasks',), cases=[{"view": "overdue"}, {"view": "upcoming"}])
+@cached_response('tasks')
+@replica_reads
+def get_due_tasks():
+    """Open tasks by due date (?view=overdue|today|upcoming&days=N), keyset-paginated, with per-view counts"""
+    view = request.args.get('view', 'overdue')
+    if view not in DUE_VIEWS:
+        return jsonify({"error": f"view must be one of: {', '.join(DUE_VIEWS)}"}), 400
+    days = max(1, min(request.args.get('days', 7, type=int), 365))
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    cursor = request.args.get('cursor')
+    today = date.today()
+
+    after = None
+    if cursor:
+        try:
+            due_at, last_id = decode_cursor(cursor)
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+        # Cursors carry datetimes; due_date is a plain date
+        after = (due_at.date(), last_id)
+
+    query = filter_view(Task.query.options(selectinload(Task.tags)), view, today, days, after)
+    items = query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(items[-1].due_date, items[-1].id) if has_more else None
+    first, last = view_range(view, today, days)
+
+    return json_response({
+        "data": dump(tasks_schema, items),
+        "view": view,
+        "range": {"from": first.isoformat() if first else None, "to": last.isoformat()},
+        # Only the first page pays for the counts
+        "counts": None if cursor else view_counts(db.session, today, days),
+        "pagination": {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": has_more
         }
-    }), 200
+    }, 200)
+
+@tasks_bp.route('/export', methods=['GET'])
+# One read per EXPORT_BATCH_SIZE rows and the tags of each batch; a full
+# export walks the whole table, a filtered one only the matching tasks
+@query_budget(statements=4, cases=[{"format": "ndjson"}])
+@query_budget(statements=4, indexed=('tasks',), cases=[{"format": "csv", "list_id": 1}])
+def export_tasks():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    query, _ = endpoints.filter_tasks(db.session, Task.query, request.args)
+    statement = query.with_entities(*Task.__table__.columns).order_by(Task.id).statement
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    return Response(
+        stream_with_context(stream_export(statement, fmt, tasks_schema, batch_size)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{fmt}"}
+    )
 
 @tasks_bp.route('', methods=['POST'])
+@query_budget(statements=7, rows_scanned=100, indexed=('tasks', 'tags'), json={
+    "title": "Budget check", "list_id": 1, "tags": [{"name": "bench-tag-1"}, {"name": "budget-tag"}]
+})
 @limiter.limit("6 per minute")
 def create_task():
+    return json_response(*endpoints.create_task(db.session, request.get_json(silent=True)))
+
+@tasks_bp.route('/bulk', methods=['POST'])
+# A fixed number of statements, however many tasks, tags and lists
+@query_budget(statements=7, rows_scanned=100, indexed=('tasks', 'tags'), json={"tasks": [
+    {"title": f"Budget check {i}", "list_id": i % 3 + 1, "tags": [{"name": f"bench-tag-{i}"}]} for i in range(20)
+]})
+@limiter.limit("10 per minute")
+def bulk_create_tasks():
     data = request.json
-    errors = task_schema.validate(data)
-    if errors:
-        return jsonify(errors), 400
-    
-    new_task = Task(
-        title=data['title'],
-        description=data.get('description'),
-        priority=data.get('priority', 'medium'),
-        due_date=data.get('due_date'),
-        list_id=data['list_id']
-    )
-    
-    # Handle tags if provided
-    if 'tags' in data:
-        for tag_data in data['tags']:
-            tag = Tag.query.filter_by(name=tag_data['name']).first()
-            if not tag:
-                tag = Tag(name=tag_data['name'], color=tag_data.get('color', '#6b7280'))
-            new_task.tags.append(tag)
-            
-    db.session.add(new_task)
-    db.session.commit()
-    recalculate_list_counts()
-    
+    items = data.get('tasks') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty list of tasks"}), 400
+    max_items = current_app.config.get('BULK_MAX_TASKS', 5000)
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} tasks per request"}), 413
+
+    try:
+        records = tasks_schema.load(items)
+        errors = {}
+    except ValidationError as err:
+        records = err.valid_data
+        errors = err.messages
+
+    known_lists = existing_list_ids(db.session, [
+        record['list_id'] for i, record in enumerate(records) if i not in errors and 'list_id' in record
+    ])
+    for i, record in enumerate(records):
+        if i not in errors and record['list_id'] not in known_lists:
+            errors[i] = {"list_id": ["List not found."]}
+
+    valid = [(i, record) for i, record in enumerate(records) if i not in errors]
+    created = {}
+    if valid:
+        tag_ids = resolve_tag_ids(db.session, [tag for _, record in valid for tag in record.get('tags') or []])
+        ids = insert_tasks(db.session, [record for _, record in valid], tag_ids)
+        queue_event(db.session, 'task.created', ids)
+        db.session.commit()
+        created = {i: task_id for (i, _), task_id in zip(valid, ids)}
+
+    results = [
+        {"index": i, "status": "created", "id": created[i]} if i in created
+        else {"index": i, "status": "error", "errors": errors[i]}
+        for i in range(len(items))
+    ]
     return jsonify({
-        "id": new_task.id,
-        "message": "Task created successfully",
-        "is_overdue": False
-    }), 201
+        "created": len(created),
+        "failed": len(items) - len(created),
+        "results": results
+    }), 201 if created else 400
+
+@tasks_bp.route('/import', methods=['POST'])
+@query_budget(statements=5, rows_scanned=100, indexed=('tasks', 'tags'), content_type='application/x-ndjson', data=''.join(
+    f'{{"title": "Budget check {i}", "list_id": {i % 3 + 1}, "tags": [{{"name": "bench-tag-{i}"}}]}}\n' for i in range(20)
+))
+@limiter.limit("5 per minute")
+def import_tasks_route():
+    fmt = detect_format(request.args.get('format'), request.content_type)
+    if fmt is None:
+        return jsonify({"error": f"Unsupported format, use one of: {', '.join(IMPORT_FORMATS)}"}), 400
+    chunk_size = request.args.get('chunk_size', current_app.config.get('IMPORT_CHUNK_SIZE', 1000), type=int)
+    if chunk_size < 1:
+        return jsonify({"error": "chunk_size must be positive"}), 400
+
+    summary = import_tasks(
+        request.stream, fmt, task_schema,
+        chunk_size=chunk_size,
+        max_errors=current_app.config.get('IMPORT_MAX_ERRORS', 1000)
+    )
+    return jsonify(summary), 201 if summary["imported"] else 400
 
 @tasks_bp.route('/<int:id>', methods=['PUT'])
+@query_budget(statements=9, rows_scanned=100, indexed=('tasks',), cases=[{"id": 1}], json={"title": "Budget check", "completed": True})
 def update_task(id):
-    task = Task.query.get_or_404(id)
-    data = request.json
-    
-    was_completed = task.completed
-    
-    task.title = data.get('title', task.title)
-    task.description = data.get('description', task.description)
-    task.priority = data.get('priority', task.priority)
-    task.due_date = data.get('due_date', task.due_date)
-    task.completed = data.get('completed', task.completed)
-    
-    if not was_completed and task.completed:
-        update_streak_logic(db.session)
-        
-    db.session.commit()
-    return jsonify(task_schema.dump(task)), 200
+    return json_response(*endpoints.update_task(db.session, id, request.get_json(silent=True)))
 
 @tasks_bp.route('/<int:id>', methods=['DELETE'])
+@query_budget(statements=5, rows_scanned=100, indexed=('tasks',), cases=[{"id": 2}])
 def delete_task(id):
-    task = Task.query.get_or_404(id)
-    db.session.delete(task)
-    db.session.commit()
-    recalculate_list_counts()
-    return jsonify({"message": "Task deleted"}), 200
+    return json_response(*endpoints.delete_task(db.session, id))
 
 @tasks_bp.route('/bulk-complete', methods=['POST'])
+@query_budget(statements=5, rows_scanned=200, indexed=('tasks',), json={"ids": list(range(3, 103))})
 def bulk_complete():
-    ids = request.json.get('ids', [])
-    tasks = Task.query.filter(Task.id.in_(ids)).all()
-    for task in tasks:
-        if not task.completed:
-            task.completed = True
-            update_streak_logic(db.session)
-    db.session.commit()
-    return jsonify({"message": f"{len(tasks)} tasks updated"}), 200
+    return json_response(*endpoints.bulk_complete(db.session, request.get_json(silent=True)))
 
 @tasks_bp.route('/templates', methods=['GET'])
+@query_budget(statements=1, rows_scanned=100)
+@replica_reads
 def get_templates():
-    templates = TaskTemplate.query.all()
-    return jsonify([{
-        "id": t.id,
-        "title": t.title,
-        "description": t.description,
-        "priority": t.priority,
-        "due_offset_days": t.due_offset_days
-    } for t in templates]), 200
+    return json_response(*endpoints.list_templates(db.session))
+
+@tasks_bp.route('/templates', methods=['POST'])
+@query_budget(statements=3, rows_scanned=100, json={"title": "Budget check", "list_id": 1})
+def create_template():
+    try:
+        data = template_schema.load(request.json)
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    if data.get('list_id') is not None and not existing_list_ids(db.session, [data['list_id']]):
+        return jsonify({"list_id": ["List not found."]}), 400
+    if data.get('starts_on') and data.get('ends_on') and data['ends_on'] < data['starts_on']:
+        return jsonify({"ends_on": ["Must not be before starts_on."]}), 400
+
+    # Occurrences of a recurring template are created by `flask generate-recurrences`
+    template = TaskTemplate(**data)
+    db.session.add(template)
+    db.session.commit()
+    return json_response(dump(template_schema, template), 201)
+
+@tasks_bp.route('/templates/<int:id>/instantiate', methods=['POST'])
+@query_budget(statements=7, rows_scanned=100, indexed=('tasks',), cases=[{"id": 1}])
+@limiter.limit("6 per minute")
+def instantiate_template(id):
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    try:
+        data = instantiate_schema.load(dict(body, template_id=id))
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    created, errors = instantiate_templates(db.session, [data])
+    if errors:
+        status = 404 if "template_id" in errors[0] else 400
+        return jsonify(errors[0]), status
+    task_id = created[0]
+    queue_event(db.session, 'task.created', [task_id])
+    db.session.commit()
+    return json_response(dump(task_schema, db.session.get(Task, task_id)), 201)
+
+@tasks_bp.route('/templates/instantiate', methods=['POST'])
+@query_budget(statements=5, rows_scanned=100, indexed=('tasks',), json={"templates": [{"template_id": 1, "list_id": i % 3 + 1} for i in range(20)]})
+@limiter.limit("10 per minute")
+def instantiate_templates_route():
+    """Creates a task from each {"template_id", "list_id"?, "due_date"?} in one transaction"""
+    data = request.json
+    items = data.get('templates') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty list of templates"}), 400
+    max_items = current_app.config.get('BULK_MAX_TASKS', 5000)
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} tasks per request"}), 413
+
+    try:
+        records = instantiate_schema.load(items, many=True)
+        errors = {}
+    except ValidationError as err:
+        records = err.valid_data
+        errors = err.messages
+
+    valid = [(i, record) for i, record in enumerate(records) if i not in errors]
+    created = {}
+    if valid:
+        created_by_position, instance_errors = instantiate_templates(db.session, [record for _, record in valid])
+        created = {valid[position][0]: task_id for position, task_id in created_by_position.items()}
+        errors.update((valid[position][0], messages) for position, messages in instance_errors.items())
+        if created:
+            queue_event(db.session, 'task.created', list(created.values()))
+            db.session.commit()
+
+    results = [
+        {"index": i, "status": "created", "id": created[i]} if i in created
+        else {"index": i, "status": "error", "errors": errors[i]}
+        for i in range(len(items))
+    ]
+    return jsonify({
+        "created": len(created),
+        "failed": len(items) - len(created),
+        "results": results
+    }), 201 if created else 400
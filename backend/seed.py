@@ -0,0 +1,49 @@
+"""Demo data for a fresh database, loaded by `flask seed` / `flask init-db --seed`"""
+from datetime import date, timedelta
+from extensions import db
+from models import TaskList, Task, Tag, UserStats
+from utils.stats_calculator import recalculate_list_counts, rebuild_stats_aggregates
+
+
+def seed_data():
+    """Loads the demo data unless the database already has lists; returns whether it did"""
+    if TaskList.query.first():
+        return False # Already seeded
+
+    # Create Lists
+    personal = TaskList(name="Personal", color="#ef4444")
+    work = TaskList(name="Work", color="#3b82f6")
+    shopping = TaskList(name="Shopping", color="#10b981")
+    db.session.add_all([personal, work, shopping])
+    db.session.flush()
+
+    # Create Tags
+    urgent = Tag(name="Urgent", color="#ef4444")
+    db.session.add(urgent)
+
+    # Create User Stats
+    stats = UserStats(current_streak=5, longest_streak=12, tasks_completed_total=47)
+    db.session.add(stats)
+
+    # Create Tasks
+    tasks = [
+        Task(title="Complete API docs", description="Finish backend documentation", priority="high", list_id=work.id, due_date=date.today()),
+        Task(title="Buy Milk", description="Need whole milk", priority="low", list_id=shopping.id),
+        Task(title="Morning Workout", completed=True, priority="medium", list_id=personal.id, due_date=date.today() - timedelta(days=1)),
+        Task(title="React Integration", priority="high", list_id=work.id, due_date=date.today() + timedelta(days=2)),
+        Task(title="Call Mom", priority="medium", list_id=personal.id),
+        Task(title="Read Book", priority="low", list_id=personal.id),
+        Task(title="Grocery Run", priority="medium", list_id=shopping.id),
+        Task(title="Debug Frontend", priority="high", list_id=work.id),
+        Task(title="Plan Weekend", priority="low", list_id=personal.id),
+        Task(title="Pay Bills", priority="high", list_id=personal.id, due_date=date.today())
+    ]
+    db.session.add_all(tasks)
+
+    
+    db.session.commit()
+    
+    # Update counts
+    recalculate_list_counts()
+    rebuild_stats_aggregates()
+    return True
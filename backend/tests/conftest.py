@@ -0,0 +1,64 @@
+"""
+Fixtures shared by the test suite: apps built with create_app() on a
+throwaway SQLite file with the demo data, rate limiting, the response cache
+and instrumentation off unless a test turns them on.
+"""
+import pytest
+
+from app import create_app
+from commands import init_db
+from config import Config
+from extensions import db
+from seed import seed_data
+
+TEST_CONFIG = {
+    "RATELIMIT_ENABLED": False,
+    "RATELIMIT_STORAGE_URI": "memory://",
+    "RESPONSE_CACHE_ENABLED": False,
+    "INSTRUMENTATION_ENABLED": False,
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--budget-database-url',
+        help="Check the SQL budgets against this empty database (e.g. MySQL) instead of SQLite"
+    )
+
+
+def build_app(database_uri, **config):
+    """An app on database_uri, initialised and seeded with the demo data"""
+    settings = dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=database_uri, **config)
+    app = create_app(type('TestConfig', (Config,), settings))
+    with app.app_context():
+        init_db()
+        seed_data()
+    return app
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Builds apps on fresh SQLite files; keyword arguments override the config"""
+    apps = []
+
+    def make(**config):
+        app = build_app(f"sqlite:///{tmp_path / f'taskflow-{len(apps)}.db'}", **config)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
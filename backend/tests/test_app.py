@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import app as app_module
+from app import create_app
+from config import Config
+from conftest import TEST_CONFIG
+
+
+def test_create_app_does_not_touch_the_database(tmp_path):
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        database = tmp_path / 'never-opened.db'
+        create_app(type('LazyConfig', (Config,), dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=f"sqlite:///{database}")))
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+    assert statements == []
+    assert not database.exists()
+
+
+def test_importing_the_module_builds_no_app():
+    code = "import sys, app; sys.exit('app' in vars(app))"
+    assert subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(app_module.__file__)).returncode == 0
+
+
+def test_init_db_seeds_an_empty_database_once(tmp_path):
+    app = create_app(type('CliConfig', (Config,), dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'cli.db'}")))
+    runner = app.test_cli_runner()
+    first = runner.invoke(args=['init-db', '--seed'])
+    assert first.exit_code == 0
+    assert "Demo data loaded" in first.output
+    second = runner.invoke(args=['init-db', '--seed'])
+    assert "already has data" in second.output
+    assert len(app.test_client().get('/api/tasks').get_json()["data"]) == 10
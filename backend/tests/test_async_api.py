@@ -0,0 +1,155 @@
+"""The ASGI mode's async handlers (asgi.py, routes/async_api.py)"""
+import re
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('a2wsgi')
+pytest.importorskip('httpx')
+
+from starlette.testclient import TestClient
+
+from asgi import create_asgi_app
+from config import Config
+from conftest import TEST_CONFIG, build_app
+from utils.tags import tag_cache
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    clients = []
+
+    def make(**config):
+        settings = dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / f'asgi-{len(clients)}.db'}", **config)
+        build_app(settings['SQLALCHEMY_DATABASE_URI'])
+        client = TestClient(create_asgi_app(type('AsgiTestConfig', (Config,), settings)))
+        clients.append(client.__enter__())
+        return client
+
+    yield make
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+def test_async_routes_apply_the_flask_rate_limits(make_client):
+    client = make_client(RATELIMIT_ENABLED=True)
+    statuses = [client.post('/api/tasks', json={"title": f"Task {i}", "list_id": 1}).status_code for i in range(7)]
+    # POST /api/tasks allows 6 per minute
+    assert statuses == [201] * 6 + [429]
+
+
+def test_async_routes_share_counters_with_the_wsgi_routes(make_client):
+    client = make_client(RATELIMIT_ENABLED=True)
+    for i in range(6):
+        assert client.post('/api/tasks', json={"title": f"Task {i}", "list_id": 1}).status_code == 201
+    # The Flask view behind the mount sees the same six hits
+    batch = client.post('/api/batch', json={"operations": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": "Batched", "list_id": 1}}
+    ]})
+    assert batch.status_code == 429
+
+
+def test_async_update_validates_the_body(make_client):
+    client = make_client()
+    response = client.put('/api/tasks/1', json={"due_date": "next tuesday"})
+    assert response.status_code == 400
+    assert "due_date" in response.json()
+
+    response = client.put('/api/tasks/1', json={"due_date": "2030-01-31", "id": 99, "is_overdue": True})
+    assert response.status_code == 200
+    assert response.json()["due_date"] == "2030-01-31"
+    assert response.json()["id"] == 1
+
+
+def test_async_routes_are_counted_in_metrics(make_client):
+    client = make_client(INSTRUMENTATION_ENABLED=True)
+    assert client.get('/api/lists').status_code == 200
+    metrics = client.get('/api/metrics').text
+    assert 'taskflow_http_requests_total{method="GET",endpoint="lists.get_lists",status="200"} 1' in metrics
+
+
+def test_events_are_refused_with_several_workers(make_client, monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    client = make_client()
+    response = client.get('/api/events')
+    assert response.status_code == 501
+    assert response.json()["fallback"] == '/api/tasks/changes'
+
+
+@pytest.mark.parametrize('path', [
+    '/api/tasks?limit=100', '/api/tasks?list_id=2&priority=high', '/api/tasks?search=milk',
+    '/api/tasks?cursor=&limit=3', '/api/tasks/templates', '/api/lists', '/api/stats', '/api/health',
+])
+def test_async_reads_answer_like_the_flask_views(make_client, path):
+    client = make_client()
+    client.post('/api/tasks', json={"title": "Async", "list_id": 2, "priority": "high", "tags": [{"name": "Urgent"}]})
+    client.put('/api/tasks/1', json={"completed": True})
+    flask_client = client.app.state.flask_app.test_client()
+    assert client.get(path).json() == flask_client.get(path).get_json()
+
+
+def test_async_writes_keep_the_counts(make_client):
+    client = make_client()
+    task_id = client.post('/api/tasks', json={"title": "Async", "list_id": 1}).json()["id"]
+    client.post('/api/tasks/bulk-complete', json={"ids": [task_id, 2]})
+    assert client.delete('/api/tasks/2').status_code == 200
+    list_id = client.post('/api/lists', json={"name": "Async list"}).json()["id"]
+    assert client.delete(f'/api/lists/{list_id}').status_code == 200
+
+    flask_client = client.app.state.flask_app.test_client()
+    counts = {item["id"]: item["task_count"] for item in client.get('/api/lists').json()}
+    actual = {}
+    for task in flask_client.get('/api/tasks', query_string={"limit": 100}).get_json()["data"]:
+        actual[task["list_id"]] = actual.get(task["list_id"], 0) + 1
+    assert counts == actual
+    assert client.get('/api/stats').json()["completion_rate"] == "20.0%"
+
+
+# Timestamps, and the cursors encoding them, are the only bytes two runs of
+# the same requests may differ in
+TIMESTAMP = re.compile(rb'"\d{4}-\d{2}-\d{2}T[\d:.]+"|(?<="next_cursor":)"[^"]+"')
+
+
+def test_wsgi_and_asgi_answer_with_the_same_bytes(make_client):
+    asgi_client = make_client()
+    # A second, identical database served by the Flask routes alone
+    flask_client = make_client().app.state.flask_app.test_client()
+    requests = [
+        ('POST', '/api/tasks', {"title": "Café ☕ naïve", "list_id": 2, "tags": [{"name": "Ürgent"}]}),
+        ('POST', '/api/tasks', {"title": "", "list_id": 2}),
+        ('POST', '/api/tasks', {"title": "No list", "list_id": 999}),
+        ('PUT', '/api/tasks/1', {"completed": True, "title": "Größe"}),
+        ('PUT', '/api/tasks/9999', {"title": "Missing"}),
+        ('PUT', '/api/tasks/1', {"due_date": "next tuesday"}),
+        ('POST', '/api/tasks/bulk-complete', {"ids": [1, 2, 3, 3, "4"]}),
+        ('POST', '/api/tasks/bulk-complete', None),
+        ('DELETE', '/api/tasks/2', None),
+        ('DELETE', '/api/tasks/2', None),
+        ('POST', '/api/lists', {"name": "Ñandú", "color": "#ff0000"}),
+        ('POST', '/api/lists', {}),
+        ('PUT', '/api/lists/2', {"name": "Zürich"}),
+        ('DELETE', '/api/lists/1', None),
+        ('DELETE', '/api/lists/1', None),
+        ('POST', '/api/stats/reset-streak', None),
+        ('GET', '/api/tasks?limit=100', None),
+        ('GET', '/api/tasks?cursor=&limit=2&include_total=1', None),
+        ('GET', '/api/tasks?cursor=bogus', None),
+        ('GET', '/api/tasks?tag=Ürgent', None),
+        ('GET', '/api/tasks/templates', None),
+        ('GET', '/api/lists', None),
+        ('GET', '/api/stats', None),
+        ('GET', '/api/health', None),
+    ]
+    for method, path, body in requests:
+        # The tag cache is per process, not per database
+        tag_cache.clear()
+        asgi = asgi_client.request(method, path, json=body)
+        tag_cache.clear()
+        wsgi = flask_client.open(path, method=method, json=body)
+        assert (asgi.status_code, TIMESTAMP.sub(b'"<t>"', asgi.content)) == \
+            (wsgi.status_code, TIMESTAMP.sub(b'"<t>"', wsgi.get_data())), (method, path)
+
+    # Neither stack accepts a body that is not JSON
+    asgi = asgi_client.post('/api/tasks', content=b'title=x', headers={'Content-Type': 'text/plain'})
+    wsgi = flask_client.post('/api/tasks', data=b'title=x', content_type='text/plain')
+    assert (asgi.status_code, asgi.content) == (wsgi.status_code, wsgi.get_data())
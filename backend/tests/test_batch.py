@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from extensions import db
+from models import TaskList
+import utils.batch
+
+
+@pytest.fixture
+def interleaved(monkeypatch):
+    """
+    Keeps each batch open after its operation until the other thread has
+    met it twice, and drops SQLite's BEGIN IMMEDIATE, which would serialise
+    requests that MySQL lets run side by side
+    """
+    monkeypatch.setattr(utils.batch, 'begin_batch', lambda session: None)
+    dispatch = utils.batch.dispatch
+    barrier = threading.Barrier(2, timeout=10)
+
+    def held_dispatch(operation):
+        result = dispatch(operation)
+        barrier.wait()
+        barrier.wait()
+        return result
+
+    monkeypatch.setattr(utils.batch, 'dispatch', held_dispatch)
+    return barrier
+
+
+def run_concurrently(*requests):
+    responses = [None] * len(requests)
+
+    def run(i):
+        responses[i] = requests[i]()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return responses
+
+
+def list_names(app):
+    with app.app_context():
+        return {name for name, in db.session.query(TaskList.name)}
+
+
+def test_write_during_a_batch_is_committed(app, interleaved):
+    def write():
+        # Runs its INSERT and commit() while the batch's commits are deferred
+        interleaved.wait()
+        response = app.test_client().post('/api/lists', json={"name": "Concurrent list"})
+        interleaved.wait()
+        return response
+
+    batch, written = run_concurrently(
+        lambda: app.test_client().post('/api/batch', json={"operations": [{"method": "GET", "path": "/api/lists"}]}),
+        write,
+    )
+    assert batch.status_code == 200
+    assert written.status_code == 201
+    assert "Concurrent list" in list_names(app)
+
+
+def test_overlapping_batches_both_finish(app, interleaved):
+    def batch():
+        return app.test_client().post('/api/batch', json={"operations": [{"method": "GET", "path": "/api/stats"}]})
+
+    responses = run_concurrently(batch, batch)
+    assert [response.status_code for response in responses] == [200, 200]
+
+
+def test_batch_commits_once_at_the_end(client):
+    response = client.post('/api/batch', json={"operations": [
+        {"method": "POST", "path": "/api/lists", "body": {"name": "Batched list"}},
+        {"method": "PUT", "path": "/api/lists/999", "body": {"name": "Missing"}},
+    ]})
+    assert response.status_code == 404
+    assert [result["status"] for result in response.get_json()["results"]] == [201, 404]
+    assert "Batched list" not in list_names(client.application)
+
+    response = client.post('/api/batch', json={"atomic": False, "operations": [
+        {"method": "POST", "path": "/api/lists", "body": {"name": "Batched list"}},
+        {"method": "PUT", "path": "/api/lists/999", "body": {"name": "Missing"}},
+    ]})
+    assert response.status_code == 200
+    assert [result["status"] for result in response.get_json()["results"]] == [201, 404]
+    assert "Batched list" in list_names(client.application)
+
+
+def test_operations_count_against_their_routes_limits(make_app):
+    client = make_app(RATELIMIT_ENABLED=True).test_client()
+    for i in range(5):
+        assert client.post('/api/tasks', json={"title": f"Direct {i}", "list_id": 1}).status_code == 201
+
+    # POST /api/tasks allows 6 per minute: one more, batched or not
+    response = client.post('/api/batch', json={"atomic": False, "operations": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": f"Batched {i}", "list_id": 1}} for i in range(2)
+    ]})
+    assert [result["status"] for result in response.get_json()["results"]] == [201, 429]
+    assert client.post('/api/tasks', json={"title": "Direct", "list_id": 1}).status_code == 429
+
+
+def test_a_batch_is_charged_once_by_its_weight(make_app):
+    client = make_app(RATELIMIT_ENABLED=True).test_client()
+    reads = {"operations": [{"method": "GET", "path": "/api/lists"}] * 50}
+    assert client.post('/api/batch', json=reads).status_code == 200
+
+    # The operations did not count against GET /api/lists' 60 per minute
+    assert all(client.get('/api/lists').status_code == 200 for _ in range(15))
+    # 50 + 50 is past the batch's own 60 per minute
+    assert client.post('/api/batch', json=reads).status_code == 429
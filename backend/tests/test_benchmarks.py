@@ -0,0 +1,37 @@
+"""The HTTP benchmark suite (benchmarks/bench_http.py) covers every route and runs clean"""
+import os
+import re
+import sys
+from argparse import Namespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import bench_http  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def report(tmp_path_factory):
+    args = Namespace(
+        tasks=60, lists=3, tags=5, requests=2, warmup=1, concurrency=[1], batch=3,
+        blueprints=list(bench_http.BLUEPRINTS), no_cache=False, seed=7,
+        db=str(tmp_path_factory.mktemp('bench') / 'bench.db'),
+    )
+    return bench_http.run(args)
+
+
+def test_every_route_has_a_scenario(app, report):
+    routes = set()
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split('.')[0] in bench_http.BLUEPRINTS:
+            path = re.sub(r'<(?:\w+:)?(\w+)>', r'<\1>', rule.rule)
+            routes.update(f"{method} {path}" for method in rule.methods - {'HEAD', 'OPTIONS'})
+
+    benchmarked = {row["route"].split('?')[0] for row in report["results"]}
+    assert routes - set(bench_http.UNBENCHMARKED) == benchmarked
+
+
+def test_every_scenario_succeeds(report):
+    assert {row["route"]: row["statuses"] for row in report["results"] if row["errors"]} == {}
+    assert report["meta"]["commit"]
@@ -0,0 +1,66 @@
+from extensions import db
+from models import Tag, Task
+
+
+def bulk_create(client, tasks):
+    response = client.post('/api/tasks/bulk', json={"tasks": tasks})
+    assert response.status_code == 201, response.get_json()
+    return response
+
+
+def test_bulk_ids_follow_the_input_order(client):
+    tasks = [{"title": f"Bulk {i}", "list_id": i % 3 + 1, "priority": "high" if i % 2 else "low"} for i in range(30)]
+    results = bulk_create(client, tasks).get_json()["results"]
+    with client.application.app_context():
+        for task, result in zip(tasks, results):
+            row = db.session.get(Task, result["id"])
+            assert (row.title, row.list_id, row.priority) == (task["title"], task["list_id"], task["priority"])
+
+
+def test_tags_match_regardless_of_case(client):
+    response = bulk_create(client, [
+        {"title": "First", "list_id": 1, "tags": [{"name": "urgent"}, {"name": "Errand"}]},
+        {"title": "Second", "list_id": 1, "tags": [{"name": "ERRAND"}, {"name": "errand"}, {"name": "URGENT"}]},
+    ])
+    ids = [result["id"] for result in response.get_json()["results"]]
+    # Tags named in a new spelling later are the same tags
+    created = client.post('/api/tasks', json={"title": "Third", "list_id": 2, "tags": [{"name": "errand"}]})
+    assert created.status_code == 201
+    ids.append(created.get_json()["id"])
+
+    with client.application.app_context():
+        names = [name for name, in db.session.query(Tag.name)]
+        assert sorted(name.casefold() for name in names) == sorted({name.casefold() for name in names})
+        assert "Urgent" in names and "Errand" in names
+        for task_id in ids:
+            tags = sorted(tag.name for tag in db.session.get(Task, task_id).tags)
+            assert tags in (["Errand", "Urgent"], ["Errand"])
+
+
+def test_bulk_statements_do_not_grow_with_the_payload(client):
+    def statements(count):
+        response = bulk_create(client, [
+            {"title": f"Task {i}", "list_id": i % 3 + 1, "tags": [{"name": f"tag-{count}-{i % 4}"}]} for i in range(count)
+        ])
+        return int(response.headers['X-Query-Count'])
+
+    assert statements(3) == statements(60)
+
+
+def test_ids_are_read_back_without_returning(client):
+    # As on MySQL: no RETURNING, and lastrowid does not tell the other rows' ids
+    # (SQLite reports the last row's)
+    with client.application.app_context():
+        dialect = db.engine.dialect
+    dialect.insert_returning = False
+    try:
+        tasks = [{"title": f"Bulk {i}", "list_id": 1, "tags": [{"name": f"read-back-{i % 2}"}]} for i in range(5)]
+        results = bulk_create(client, tasks).get_json()["results"]
+    finally:
+        dialect.insert_returning = True
+
+    with client.application.app_context():
+        for i, result in enumerate(results):
+            row = db.session.get(Task, result["id"])
+            assert row.title == f"Bulk {i}"
+            assert [tag.name for tag in row.tags] == [f"read-back-{i % 2}"]
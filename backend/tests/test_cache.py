@@ -0,0 +1,66 @@
+import multiprocessing
+
+from extensions import db
+from utils.cache import EntityVersions
+
+
+def test_versions_are_shared_through_their_file(tmp_path):
+    first, second = EntityVersions(), EntityVersions()
+    first.share(str(tmp_path / 'versions'))
+    second.share(str(tmp_path / 'versions'))
+    try:
+        before = second.snapshot(('tasks', 'lists'))
+        first.bump({'lists'})
+        assert second.snapshot(('tasks', 'lists')) == (before[0], before[1] + 1)
+    finally:
+        first.close()
+        second.close()
+
+
+def create_list(app, name):
+    # A worker forked from the one that cached the lists
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    response = app.test_client().post('/api/lists', json={"name": name})
+    raise SystemExit(0 if response.status_code == 201 else 1)
+
+
+def test_a_write_in_another_worker_invalidates_the_cache(make_app, tmp_path):
+    app = make_app(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_TTL=600,
+                   RESPONSE_CACHE_VERSIONS_PATH=str(tmp_path / 'versions'))
+    client = app.test_client()
+    assert client.get('/api/lists').status_code == 200
+
+    worker = multiprocessing.get_context('fork').Process(target=create_list, args=(app, "Other worker's list"))
+    worker.start()
+    worker.join(30)
+    assert worker.exitcode == 0
+
+    names = [item["name"] for item in client.get('/api/lists').get_json()]
+    assert "Other worker's list" in names
+    assert app.extensions['response_cache'].stats()["misses"] == 2
+
+
+def test_conditional_gets_and_invalidation(make_app, tmp_path):
+    app = make_app(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_VERSIONS_PATH=str(tmp_path / 'versions'))
+    client = app.test_client()
+    first = client.get('/api/tasks', query_string={"list_id": 1})
+    etag = first.headers['ETag'].strip('"')
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    revalidated = client.get('/api/tasks', query_string={"list_id": 1}, headers={"If-None-Match": f'"{etag}"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['X-Query-Count'] == '0'
+
+    client.post('/api/tasks', json={"title": "Fresh", "list_id": 1})
+    changed = client.get('/api/tasks', query_string={"list_id": 1}, headers={"If-None-Match": f'"{etag}"'})
+    assert changed.status_code == 200
+    assert "Fresh" in [task["title"] for task in changed.get_json()["data"]]
+    # Lists are keyed on their own version and on tasks
+    assert [item["task_count"] for item in client.get('/api/lists').get_json() if item["id"] == 1] == [
+        first.get_json()["pagination"]["total"] + 1
+    ]
+
+    stats = app.extensions['response_cache'].stats()
+    assert (stats["not_modified"], stats["misses"]) == (1, 3)
@@ -0,0 +1,51 @@
+import time
+
+
+def sync(client, token='', limit=500):
+    response = client.get('/api/tasks/changes', query_string={"since": token, "limit": limit})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def sync_all(client, token='', limit=500):
+    """Every page since token: (task ids upserted, deleted tasks, deleted lists, next token)"""
+    upserted, tasks, lists = [], [], []
+    while True:
+        page = sync(client, token, limit)
+        upserted += [task["id"] for task in page["data"]]
+        tasks += page["deleted"]["tasks"]
+        lists += page["deleted"]["lists"]
+        token = page["next"]
+        if not page["has_more"]:
+            return upserted, tasks, lists, token
+
+
+def test_changes_since_a_token(make_app):
+    client = make_app(CHANGES_SETTLE_SECONDS=0).test_client()
+    upserted, tasks, lists, token = sync_all(client, limit=3)
+    assert sorted(upserted) == list(range(1, 11))
+    assert sync_all(client, token)[:3] == ([], [], [])
+
+    time.sleep(0.01)
+    client.put('/api/tasks/4', json={"title": "Renamed"})
+    client.delete('/api/tasks/5')
+    # List 3 takes tasks 2 and 7 with it
+    client.delete('/api/lists/3')
+    created = client.post('/api/tasks', json={"title": "New", "list_id": 1}).get_json()["id"]
+    time.sleep(0.01)
+
+    upserted, tasks, lists, _ = sync_all(client, token, limit=1)
+    assert sorted(upserted) == [4, created]
+    assert tasks == [5] and lists == [3]
+
+
+def test_bad_and_expired_tokens(make_app):
+    client = make_app(CHANGES_SETTLE_SECONDS=0).test_client()
+    assert client.get('/api/tasks/changes', query_string={"since": "garbage"}).status_code == 400
+
+    token = sync(client)["next"]
+    expired = make_app(CHANGES_SETTLE_SECONDS=0, CHANGES_RETENTION_DAYS=0).test_client()
+    time.sleep(0.01)
+    response = expired.get('/api/tasks/changes', query_string={"since": token})
+    assert response.status_code == 410
+    assert response.get_json()["resync"] is True
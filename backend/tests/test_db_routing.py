@@ -0,0 +1,48 @@
+from extensions import db
+from models import TaskList
+
+
+def list_names(client, **headers):
+    response = client.get('/api/lists', headers=headers)
+    return response.headers.get('X-DB-Replica'), {item["name"] for item in response.get_json()}
+
+
+def test_reads_go_to_the_replicas_until_the_client_writes(make_app):
+    replica = make_app()
+    with replica.app_context():
+        db.session.get(TaskList, 1).name = "Replica copy"
+        db.session.commit()
+    uri = replica.config['SQLALCHEMY_DATABASE_URI']
+    app = make_app(REPLICA_DATABASE_URIS=[uri, uri], DB_POOL_SIZE=3, REPLICA_READ_YOUR_WRITES_SECONDS=60)
+    client = app.test_client()
+
+    assert {list_names(client)[0] for _ in range(4)} == {'replica_0', 'replica_1'}
+    assert "Replica copy" in list_names(client)[1]
+    replica_key, names = list_names(client, **{"X-Read-Your-Writes": "1"})
+    assert replica_key is None and "Personal" in names
+
+    # A write lands on the primary and pins this client's reads there
+    assert client.post('/api/lists', json={"name": "Written"}).status_code == 201
+    replica_key, names = list_names(client)
+    assert replica_key is None and {"Personal", "Written"} <= names
+    assert "Written" not in list_names(app.test_client())[1]
+
+    pools = app.test_client().get('/api/health/pool').get_json()
+    assert set(pools) == {'primary', 'replica_0', 'replica_1'}
+    assert pools['primary']['size'] == 3
+
+
+def test_cached_responses_are_filled_from_the_primary(make_app):
+    replica = make_app()
+    with replica.app_context():
+        db.session.get(TaskList, 1).name = "Replica copy"
+        db.session.commit()
+    uri = replica.config['SQLALCHEMY_DATABASE_URI']
+    client = make_app(REPLICA_DATABASE_URIS=[uri], RESPONSE_CACHE_ENABLED=True).test_client()
+
+    # The replica lags behind the primary; what gets cached must not
+    replica_key, names = list_names(client)
+    assert replica_key is None and "Personal" in names
+    replica_key, names = list_names(client)
+    assert replica_key is None and "Replica copy" not in names
+    assert client.get('/api/health/cache').get_json()["hits"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+
+from sqlalchemy import update
+
+from extensions import db
+from models import TaskList
+import utils.events
+from utils.events import EventBroker, event_stream, queue_event
+
+
+def test_events_point_wsgi_clients_to_the_changes_feed(client):
+    response = client.get('/api/events')
+    assert response.status_code == 501
+    assert response.get_json()["fallback"] == '/api/tasks/changes'
+    assert client.get(response.get_json()["fallback"]).status_code == 200
+
+
+def read(stream, chunks):
+    async def take():
+        return [await stream.__anext__() for _ in range(chunks)]
+    return take()
+
+
+def test_subscribers_get_committed_events_only(app, monkeypatch):
+    test_broker = EventBroker()
+    test_broker.configure(16)
+    monkeypatch.setattr(utils.events, 'broker', test_broker)
+
+    async def scenario():
+        subscription, missed = test_broker.subscribe(8)
+        with app.app_context():
+            db.session.execute(update(TaskList).where(TaskList.id == 1).values(name="Renamed"))
+            queue_event(db.session, 'list.updated', [1])
+            db.session.rollback()
+            queue_event(db.session, 'task.created', [7, 9])
+            db.session.commit()
+        await asyncio.sleep(0)
+        return await read(event_stream(subscription, missed, heartbeat=5), 2)
+
+    retry, events = asyncio.run(scenario())
+    assert retry == "retry: 3000\n\n"
+    assert events.startswith(f"id: {test_broker.epoch}-1\nevent: task.created\ndata: {{\"ids\":[7,9]}}\n\n")
+    assert "event: stats.updated" in events and "list.updated" not in events
+
+
+def test_resume_replays_or_asks_for_a_resync():
+    test_broker = EventBroker(replay_size=2)
+    test_broker.enabled = True
+    for i in range(4):
+        test_broker.publish([('task.updated', {"ids": [i]})])
+
+    async def scenario():
+        resumed, missed = test_broker.subscribe(8, f"{test_broker.epoch}-2")
+        assert not missed and [item[0] for item in resumed.drain()] == [3, 4]
+        # Event 1 has left the replay buffer; ids of another process never match
+        for last_event_id in (f"{test_broker.epoch}-1", "0a0b0c-3"):
+            subscription, missed = test_broker.subscribe(8, last_event_id)
+            assert missed
+            assert (await read(event_stream(subscription, missed, heartbeat=5), 2))[1] == "event: resync\ndata: {}\n\n"
+
+        slow, _ = test_broker.subscribe(2)
+        test_broker.publish([('task.created', {"ids": [i]}) for i in range(5)])
+        await asyncio.sleep(0)
+        chunks = await read(event_stream(slow, False, heartbeat=5), 3)
+        assert chunks[1] == 'event: resync\ndata: {"dropped": 3}\n\n'
+        assert chunks[2].count("event: task.created") == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,34 @@
+import csv
+import io
+import json
+
+
+def test_ndjson_export_streams_every_task(make_app):
+    client = make_app(EXPORT_BATCH_SIZE=3).test_client()
+    client.post('/api/tasks', json={"title": "Tagged", "list_id": 2, "tags": [{"name": "Urgent"}, {"name": "Home"}]})
+
+    response = client.get('/api/tasks/export', buffered=False)
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    listed = {task["id"]: task for task in client.get('/api/tasks', query_string={"limit": 100}).get_json()["data"]}
+    assert [row["id"] for row in rows] == sorted(listed)
+    assert rows == [listed[row["id"]] for row in rows]
+
+
+def test_csv_export_imports_back(make_app):
+    source = make_app().test_client()
+    source.post('/api/tasks', json={"title": "Tagged, quoted \"x\"", "list_id": 2, "tags": [{"name": "Urgent"}, {"name": "Home"}]})
+    exported = source.get('/api/tasks/export', query_string={"format": "csv", "list_id": 2}).get_data(as_text=True)
+    rows = list(csv.DictReader(io.StringIO(exported)))
+    assert len(rows) == 4
+    assert rows[-1]["tags"] == "Urgent;Home"
+
+    target = make_app().test_client()
+    before = target.get('/api/tasks', query_string={"list_id": 2, "limit": 100}).get_json()["pagination"]["total"]
+    summary = target.post('/api/tasks/import', data=exported, content_type='text/csv').get_json()
+    assert (summary["imported"], summary["failed"]) == (4, 0)
+    tasks = target.get('/api/tasks', query_string={"list_id": 2, "limit": 100}).get_json()
+    assert tasks["pagination"]["total"] == before + 4
+    imported = next(task for task in tasks["data"] if task["title"] == 'Tagged, quoted "x"')
+    assert sorted(tag["name"] for tag in imported["tags"]) == ["Home", "Urgent"]
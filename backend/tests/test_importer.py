@@ -0,0 +1,58 @@
+from sqlalchemy import func
+
+from extensions import db
+from models import Task, TaskList, UserStats
+from utils.importer import TaskImporter
+from utils.validators import TaskSchema
+
+
+def counts_match(list_id):
+    stored = db.session.get(TaskList, list_id).task_count
+    actual = db.session.query(func.count(Task.id)).filter(Task.list_id == list_id).scalar()
+    stats = db.session.query(UserStats.task_count, UserStats.completed_task_count).one()
+    totals = db.session.query(func.count(Task.id), func.count(Task.id).filter(Task.completed.is_(True))).one()
+    return stored == actual and tuple(stats) == tuple(totals)
+
+
+def test_each_chunk_commits_its_counts(app):
+    seen = []
+
+    def records():
+        for i in range(5):
+            if i and i % 2 == 0:
+                # The previous chunk is committed by now
+                seen.append(counts_match(1))
+            yield i + 1, {"title": f"Imported {i}", "list_id": 1, "completed": i == 0}, None
+        raise RuntimeError("connection lost")
+
+    with app.app_context():
+        importer = TaskImporter(TaskSchema(), chunk_size=2)
+        try:
+            importer.run(records())
+        except RuntimeError:
+            pass
+        assert seen == [True, True]
+        assert importer.imported == 4
+        assert counts_match(1)
+
+
+def test_import_reports_bad_lines_and_keeps_the_good_ones(client):
+    body = "\n".join([
+        '{"title": "Good 1", "list_id": 1, "id": 7, "is_overdue": true}',
+        '{"title": "No list", "list_id": 99}',
+        'not json',
+        '',
+        '{"priority": "high", "list_id": 1}',
+        '{"title": "Good 2", "list_id": 3, "tags": [{"name": "urgent"}]}',
+    ])
+    response = client.post('/api/tasks/import', query_string={"chunk_size": 1},
+                           data=body, content_type='application/x-ndjson')
+    assert response.status_code == 201
+    summary = response.get_json()
+    assert (summary["lines"], summary["imported"], summary["failed"]) == (5, 2, 3)
+    assert [error["line"] for error in summary["errors"]] == [2, 3, 5]
+    assert summary["errors"][0]["errors"] == {"list_id": ["List not found."]}
+
+    response = client.post('/api/tasks/import', data='not json\n', content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert client.post('/api/tasks/import', query_string={"format": "xml"}, data='').status_code == 400
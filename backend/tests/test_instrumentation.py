@@ -0,0 +1,38 @@
+import re
+
+
+def metric(body, series):
+    values = [float(line.rsplit(' ', 1)[1]) for line in body.splitlines() if line.startswith(series + ' ')]
+    assert len(values) == 1, series
+    return values[0]
+
+
+def test_sampled_requests_are_timed_and_counted(make_app):
+    client = make_app(INSTRUMENTATION_ENABLED=True).test_client()
+    for _ in range(3):
+        response = client.get('/api/tasks')
+    assert response.headers['X-Query-Count'] == '3'
+    assert re.fullmatch(
+        r'db;dur=[\d.]+;desc="3 queries", serialize;dur=[\d.]+, total;dur=[\d.]+', response.headers['Server-Timing']
+    )
+    assert client.get('/api/nowhere').status_code == 404
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+    labels = 'method="GET",endpoint="tasks.get_tasks"'
+    assert metric(body, f'taskflow_http_requests_total{{{labels},status="200"}}') == 3
+    assert metric(body, 'taskflow_http_requests_total{method="GET",endpoint="unmatched",status="404"}') == 1
+    assert metric(body, f'taskflow_http_request_duration_seconds_count{{{labels}}}') == 3
+    assert metric(body, f'taskflow_db_queries_per_request_sum{{{labels}}}') == 9
+    assert metric(body, f'taskflow_db_queries_per_request_bucket{{{labels},le="2"}}') == 0
+    assert metric(body, f'taskflow_db_queries_per_request_bucket{{{labels},le="3"}}') == 3
+
+
+def test_unsampled_requests_are_only_counted(make_app):
+    client = make_app(INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_SAMPLE_RATE=0.0).test_client()
+    response = client.get('/api/lists')
+    assert 'Server-Timing' not in response.headers
+    assert response.headers['X-Query-Count'] == '1'
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+    assert metric(body, 'taskflow_http_requests_total{method="GET",endpoint="lists.get_lists",status="200"}') == 1
+    assert 'endpoint="lists.get_lists"}' not in body
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, update
+
+from extensions import db
+from models import ArchivedTask, DeletionLog, Task, TaskList, TaskTemplate, UserStats, task_tags
+
+
+def list_counts(client):
+    return {item["id"]: item["task_count"] for item in client.get('/api/lists').get_json()}
+
+
+def actual_counts(app):
+    with app.app_context():
+        counts = dict(db.session.query(Task.list_id, func.count(Task.id)).group_by(Task.list_id).all())
+        return {list_id: counts.get(list_id, 0) for list_id, in db.session.query(TaskList.id)}
+
+
+def test_task_writes_keep_the_list_counts(client):
+    before = list_counts(client)
+    created = [client.post('/api/tasks', json={"title": f"Counted {i}", "list_id": 1}).get_json()["id"] for i in range(3)]
+    client.post('/api/tasks/bulk', json={"tasks": [{"title": "Bulk", "list_id": 2}, {"title": "Bulk", "list_id": 3}]})
+    assert client.delete(f'/api/tasks/{created[0]}').status_code == 200
+
+    after = list_counts(client)
+    assert after == actual_counts(client.application)
+    assert (after[1] - before[1], after[2] - before[2], after[3] - before[3]) == (2, 1, 1)
+
+
+def test_recalc_counts_repairs_drifted_counts(app):
+    with app.app_context():
+        db.session.execute(update(TaskList).values(task_count=99))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['recalc-counts'])
+    assert "3 lists corrected" in result.output
+    assert list_counts(app.test_client()) == actual_counts(app)
+
+
+def test_deleting_a_list_cascades_in_the_database(app, client):
+    def delete_filled_list(count):
+        list_id = client.post('/api/lists', json={"name": f"Filled {count}"}).get_json()["id"]
+        client.post('/api/tasks/bulk', json={"tasks": [
+            {"title": f"Doomed {i}", "list_id": list_id, "tags": [{"name": "doomed"}]} for i in range(count)
+        ]})
+        template_id = client.post('/api/tasks/templates', json={"title": "Kept", "list_id": list_id}).get_json()["id"]
+        response = client.delete(f'/api/lists/{list_id}')
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(TaskTemplate, template_id).list_id is None
+        return int(response.headers['X-Query-Count'])
+
+    assert delete_filled_list(2) == delete_filled_list(40)
+    with app.app_context():
+        assert db.session.query(func.count()).select_from(task_tags).scalar() == 0
+    assert list_counts(client) == actual_counts(app)
+    assert client.post('/api/tasks', json={"title": "Orphan", "list_id": 999}).status_code == 400
+
+
+def test_purge_completed_archives_old_tasks_in_chunks(app, client):
+    client.post('/api/tasks', json={"title": "Old tagged", "list_id": 2, "tags": [{"name": "Urgent"}]})
+    client.post('/api/tasks/bulk-complete', json={"ids": [1, 2, 11]})
+    long_ago = datetime.utcnow() - timedelta(days=120)
+    with app.app_context():
+        db.session.execute(update(Task).where(Task.id.in_([1, 11])).values(completed_at=long_ago))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['purge-completed', '--days', '90', '--chunk-size', '1', '--archive'])
+    assert result.exit_code == 0
+    assert "Archived 2 tasks completed more than 90 days ago" in result.output
+
+    with app.app_context():
+        archived = {task.id: task.tag_names for task in ArchivedTask.query}
+        stats = db.session.query(UserStats).one()
+        totals = db.session.query(func.count(Task.id), func.count(Task.id).filter(Task.completed == True)).one()
+        tombstones = {entity_id for entity_id, in db.session.query(DeletionLog.entity_id).filter_by(entity='task')}
+    assert archived == {1: [], 11: ["Urgent"]}
+    assert (stats.task_count, stats.completed_task_count) == tuple(totals)
+    assert list_counts(client) == actual_counts(app)
+    assert tombstones == {1, 11}
+
+    # Nothing left past the cutoff; task 2 was completed just now
+    result = app.test_cli_runner().invoke(args=['purge-completed', '--days', '90'])
+    assert "Purged 0 tasks" in result.output
+    with app.app_context():
+        assert db.session.get(Task, 2).completed
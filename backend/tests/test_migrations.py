@@ -0,0 +1,141 @@
+"""The Flask-Migrate revisions (migrations/) and how `flask init-db` applies them"""
+from datetime import datetime
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
+
+from app import create_app
+from commands import BASELINE_REVISION, init_db
+from config import Config
+from conftest import TEST_CONFIG
+from extensions import db
+
+
+@pytest.fixture
+def bare_app(tmp_path):
+    """An app on an empty SQLite file, without init_db"""
+    settings = dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'migrations.db'}")
+    app = create_app(type('MigrationConfig', (Config,), settings))
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def schema_differences():
+    def include_object(obj, name, type_, reflected, compare_to):
+        # The FTS5 table and its shadow tables are not models
+        return not (type_ == 'table' and name.startswith('tasks_fts'))
+
+    with db.engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"include_object": include_object})
+        return compare_metadata(context, db.metadata)
+
+
+def current_revision():
+    with db.engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def head_revision(app):
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(app.extensions['migrate'].migrate.get_config()).get_current_head()
+
+
+def test_upgraded_schema_matches_the_models(bare_app):
+    assert init_db() == 'upgraded'
+    assert current_revision() == head_revision(bare_app)
+    assert schema_differences() == []
+
+
+def test_revisions_downgrade_and_upgrade_again(bare_app):
+    init_db()
+    downgrade(revision='base')
+    assert inspect(db.engine).get_table_names() == ['alembic_version']
+    upgrade()
+    assert schema_differences() == []
+
+
+def test_create_all_databases_are_stamped_and_upgraded(bare_app):
+    # A database set up before the project had migrations
+    db.create_all(bind_key=None)
+    db.session.execute(text("INSERT INTO task_lists (name, color, task_count, created_at) VALUES ('Kept', '#000000', 0, '2026-01-01')"))
+    db.session.commit()
+
+    assert init_db() == 'stamped at the baseline and upgraded'
+    assert current_revision() == head_revision(bare_app)
+    assert schema_differences() == []
+    assert db.session.execute(text("SELECT name FROM task_lists")).scalars().all() == ['Kept']
+
+
+def test_baseline_databases_keep_and_backfill_their_data(bare_app):
+    upgrade(revision=BASELINE_REVISION)
+    rows = [
+        "INSERT INTO task_lists (id, name, color, task_count, created_at) VALUES (1, 'Home', '#000000', 3, '2026-01-01')",
+        "INSERT INTO tags (id, name, color) VALUES (1, 'Work', '#6b7280'), (2, 'work', '#6b7280'), (3, 'Home', '#6b7280')",
+        "INSERT INTO tasks (id, title, completed, priority, list_id, created_at, updated_at) VALUES "
+        "(1, 'Buy milk', 1, 'low', 1, '2026-01-01', '2026-01-02 10:00:00'), "
+        "(2, 'Walk dog', 1, 'low', 1, '2026-01-01', '2026-01-02 18:00:00'), "
+        "(3, 'Pay rent', 0, 'high', 1, '2026-01-01', '2026-01-01')",
+        "INSERT INTO task_tags (task_id, tag_id) VALUES (1, 1), (1, 2), (2, 2), (3, 3)",
+        "INSERT INTO task_templates (id, title, priority, due_offset_days, list_id) VALUES (1, 'Weekly review', 'medium', 0, 1)",
+        "INSERT INTO user_stats (id, current_streak, longest_streak, tasks_completed_today, tasks_completed_total, updated_at) "
+        "VALUES (1, 0, 0, 0, 2, '2026-01-02')",
+    ]
+    with db.engine.begin() as conn:
+        for statement in rows:
+            conn.exec_driver_sql(statement)
+
+    assert init_db() == 'upgraded'
+    assert schema_differences() == []
+
+    query = lambda sql: db.session.execute(text(sql)).all()
+    # 'Work' and 'work' are one tag now, still on both tasks
+    assert query("SELECT id, name FROM tags ORDER BY id") == [(1, 'Work'), (3, 'Home')]
+    assert query("SELECT task_id, tag_id FROM task_tags ORDER BY task_id") == [(1, 1), (2, 1), (3, 3)]
+    # completed_at and the stats aggregates are backfilled
+    assert query("SELECT id, completed_at FROM tasks WHERE completed_at IS NOT NULL ORDER BY id") == [
+        (1, '2026-01-02 10:00:00'), (2, '2026-01-02 18:00:00')
+    ]
+    assert query("SELECT task_count, completed_task_count FROM user_stats") == [(3, 2)]
+    assert query("SELECT day, count FROM daily_completions") == [('2026-01-02', 2)]
+
+    # The search index covers the existing tasks and, through its triggers, new ones
+    db.session.execute(text("UPDATE tasks SET title = 'Feed cat' WHERE id = 2"))
+    search = "SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :q ORDER BY rowid"
+    assert db.session.execute(text(search), {"q": "milk"}).scalars().all() == [1]
+    assert db.session.execute(text(search), {"q": "cat"}).scalars().all() == [2]
+
+    # Deleting the list cascades to its tasks and keeps the template
+    db.session.execute(text("DELETE FROM task_lists WHERE id = 1"))
+    assert query("SELECT COUNT(*) FROM tasks") == [(0,)]
+    assert query("SELECT COUNT(*) FROM task_tags") == [(0,)]
+    assert query("SELECT list_id FROM task_templates") == [(None,)]
+    db.session.rollback()
+
+
+def test_tag_names_are_unique_regardless_of_case_after_the_upgrade(bare_app):
+    init_db()
+    db.session.execute(text("INSERT INTO tags (name, color) VALUES ('Urgent', '#6b7280')"))
+    with pytest.raises(Exception, match='UNIQUE'):
+        db.session.execute(text("INSERT INTO tags (name, color) VALUES ('URGENT', '#6b7280')"))
+    db.session.rollback()
+
+
+def test_recurrence_inserts_each_occurrence_once_after_the_upgrade(bare_app):
+    init_db()
+    now = datetime(2026, 1, 1)
+    db.session.execute(text("INSERT INTO task_lists (id, name, color, task_count, created_at) VALUES (1, 'L', '#000000', 0, :now)"), {"now": now})
+    db.session.execute(text("INSERT INTO task_templates (id, title, priority, due_offset_days, recurrence_interval) VALUES (1, 'T', 'low', 0, 1)"))
+    insert = text(
+        "INSERT INTO tasks (title, completed, priority, list_id, created_at, updated_at, template_id, occurrence_date) "
+        "VALUES ('T', 0, 'low', 1, :now, :now, 1, '2026-01-05')"
+    )
+    db.session.execute(insert, {"now": now})
+    with pytest.raises(Exception, match='UNIQUE'):
+        db.session.execute(insert, {"now": now})
+    db.session.rollback()
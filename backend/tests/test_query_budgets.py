@@ -0,0 +1,54 @@
+"""
+Checks every SQL budget declared with @query_budget (utils/query_budget.py):
+one test per budgeted request, against seeded data on a throwaway SQLite
+database or, with --budget-database-url, on the given empty database.
+"""
+import pytest
+
+from app import create_app
+from benchmarks.common import seed_tasks
+from config import Config
+from extensions import db
+from models import TaskTemplate
+from utils.query_budget import budgeted_cases, check_case
+from conftest import TEST_CONFIG, build_app
+
+# Enough rows for full scans to stand out from indexed reads
+BUDGET_TASKS = 2000
+
+
+def _budgeted_cases():
+    # create_app() touches no database, the routes are all it is needed for
+    config = type('CollectConfig', (Config,), dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI='sqlite://'))
+    return budgeted_cases(create_app(config))
+
+
+CASES = _budgeted_cases()
+
+
+@pytest.fixture(scope='module')
+def budget_app(request, tmp_path_factory):
+    database_uri = request.config.getoption('--budget-database-url') or \
+        f"sqlite:///{tmp_path_factory.mktemp('budgets') / 'taskflow.db'}"
+    app = build_app(database_uri)
+    seed_tasks(app, BUDGET_TASKS)
+    with app.app_context():
+        db.session.add(TaskTemplate(title="Budget template", list_id=1))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.mark.parametrize(
+    'endpoint, method, budget, case', CASES,
+    ids=[f"{method} {endpoint} {case}" for endpoint, method, _, case in CASES]
+)
+def test_query_budget(budget_app, endpoint, method, budget, case):
+    tables = set(db.metadata.tables)
+    url, problems = check_case(budget_app, budget_app.test_client(), endpoint, method, budget, case, tables)
+    if problems:
+        pytest.fail('\n'.join([f"{method} {url} ({endpoint}) over budget:"]
+                              + [f"  {line}" for lines in problems for line in lines]), pytrace=False)
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+
+import pytest
+
+pytest.importorskip('fcntl')
+
+from utils.rate_limit_storage import BUCKET_SLOTS, MmapStorage, with_default_path
+
+
+def test_a_full_bucket_evicts_the_least_recently_used_key(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('utils.rate_limit_storage.time.time', lambda: clock[0])
+    # One bucket, so every key competes for its slots
+    storage = MmapStorage(f"mmap://{tmp_path / 'table'}?slots={BUCKET_SLOTS}")
+    keys = [f"client-{i}" for i in range(BUCKET_SLOTS)]
+    for key in keys:
+        clock[0] += 1
+        assert storage.acquire_entry(key, 2, 86400)
+    clock[0] += 1
+    assert storage.acquire_entry(keys[0], 2, 86400)
+
+    # A newcomer gets a slot at once; client-1 was idle the longest
+    clock[0] += 1
+    assert storage.acquire_entry("newcomer", 2, 86400)
+    assert storage.incr("fixed-newcomer", 60) == 1
+    assert storage.evictions == 2
+    assert storage.get_moving_window("client-1", 2, 86400)[1] == 0
+    assert storage.get_moving_window("client-2", 2, 86400)[1] == 0
+    # The active keys kept their counts
+    assert not storage.acquire_entry(keys[0], 2, 86400)
+    assert [storage.get_moving_window(key, 2, 86400)[1] for key in keys[3:]] == [1] * (BUCKET_SLOTS - 3)
+
+
+def test_the_table_file_is_not_opened_through_a_symlink(tmp_path):
+    target = tmp_path / 'elsewhere'
+    target.write_bytes(b'')
+    os.symlink(target, tmp_path / 'table')
+    with pytest.raises(OSError):
+        MmapStorage(f"mmap://{tmp_path / 'table'}")
+
+
+def test_a_bare_uri_uses_the_instance_folder(tmp_path):
+    instance = tmp_path / 'instance'
+    uri = with_default_path('mmap://?slots=64', str(instance))
+    assert uri == f"mmap://{instance / 'ratelimit.mmap'}?slots=64"
+    assert with_default_path(uri, str(tmp_path / 'other')) == uri
+    assert with_default_path('memory://', str(instance)) == 'memory://'
+
+    storage = MmapStorage(uri)
+    assert storage.path == str(instance / 'ratelimit.mmap')
+    assert os.stat(storage.path).st_mode & 0o777 == 0o600
+    with pytest.raises(ValueError):
+        MmapStorage('mmap://')
+
+
+def hit(uri, results):
+    storage = MmapStorage(uri)
+    results.put(sum(storage.acquire_entry("shared-client", 12, 60) for _ in range(10)))
+
+
+def test_processes_share_one_limit(tmp_path):
+    uri = f"mmap://{tmp_path / 'table'}"
+    MmapStorage(uri)
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=hit, args=(uri, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join(30)
+    assert allowed == 12
+    assert MmapStorage(uri).get_moving_window("shared-client", 12, 60)[1] == 12
+
+
+def test_fixed_window_counts_expire(tmp_path, monkeypatch):
+    storage = MmapStorage(f"mmap://{tmp_path / 'table'}")
+    now = [1000.0]
+    monkeypatch.setattr('utils.rate_limit_storage.time.time', lambda: now[0])
+    assert [storage.incr("key", 10) for _ in range(3)] == [1, 2, 3]
+    assert (storage.get("key"), storage.get_expiry("key")) == (3, 1010)
+    now[0] = 1010.5
+    assert storage.get("key") == 0
+    assert storage.incr("key", 10) == 1
@@ -0,0 +1,20 @@
+import pytest
+
+
+@pytest.mark.parametrize('path', [
+    '/api/tasks?limit=100', '/api/tasks?cursor=&limit=5', '/api/tasks/templates', '/api/lists', '/api/stats',
+    '/api/tasks/due?view=upcoming',
+])
+def test_fast_serializer_matches_marshmallow_byte_for_byte(app, path):
+    client = app.test_client()
+    client.post('/api/tasks', json={
+        "title": "Café ✓ \"quoted\"", "description": "tab\tand\x7f", "list_id": 1,
+        "due_date": "2001-02-03", "tags": [{"name": "über", "color": "#000000"}]
+    })
+    client.post('/api/tasks/templates', json={"title": "Template", "list_id": 1})
+
+    fast = client.get(path)
+    app.config['SERIALIZER'] = 'marshmallow'
+    plain = client.get(path)
+    assert fast.status_code == 200
+    assert fast.get_data() == plain.get_data()
@@ -0,0 +1,25 @@
+def aggregates(client):
+    stats = client.get('/api/stats').get_json()
+    return {key: stats[key] for key in ("completion_rate", "tasks_completed_week")}
+
+
+def test_maintained_aggregates_match_a_rebuild(app):
+    client = app.test_client()
+    ids = [client.post('/api/tasks', json={"title": f"Stat {i}", "list_id": 1}).get_json()["id"] for i in range(4)]
+    client.put(f'/api/tasks/{ids[0]}', json={"completed": True})
+    client.put(f'/api/tasks/{ids[1]}', json={"completed": True})
+    client.put(f'/api/tasks/{ids[1]}', json={"completed": False})
+    client.post('/api/tasks/bulk-complete', json={"ids": [ids[2], ids[3]]})
+    client.delete(f'/api/tasks/{ids[3]}')
+    client.post('/api/tasks/bulk', json={"tasks": [{"title": "Done", "list_id": 2, "completed": True}]})
+
+    maintained = aggregates(client)
+    assert maintained == {"completion_rate": "28.6%", "tasks_completed_week": 4}
+    app.test_cli_runner().invoke(args=['recalc-counts'])
+    assert aggregates(client) == maintained
+
+
+def test_stats_read_no_tasks(client):
+    response = client.get('/api/stats')
+    # The user_stats row and the week's rollup, whatever the number of tasks
+    assert response.headers['X-Query-Count'] == '2'
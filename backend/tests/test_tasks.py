@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+
+import pytest
+
+from extensions import db
+from models import Tag
+from utils.tags import lookup_tag_ids, tag_cache
+
+
+def test_update_validates_the_body(client):
+    response = client.put('/api/tasks/1', json={"due_date": "next tuesday"})
+    assert response.status_code == 400
+    assert "due_date" in response.get_json()
+
+    response = client.put('/api/tasks/1', json={"due_date": "2030-01-31", "priority": "high", "id": 99})
+    assert response.status_code == 200
+    assert response.get_json()["due_date"] == "2030-01-31"
+    assert response.get_json()["priority"] == "high"
+
+    assert client.put('/api/tasks/1', json={"priority": "urgent"}).status_code == 400
+
+
+def walk_cursor(client, **params):
+    ids, cursor = [], ''
+    while cursor is not None:
+        body = client.get('/api/tasks', query_string=dict(params, cursor=cursor, limit=4)).get_json()
+        ids.extend(task["id"] for task in body["data"])
+        cursor = body["pagination"]["next_cursor"]
+        assert body["pagination"]["has_more"] == (cursor is not None)
+    return ids
+
+
+def test_cursor_pages_follow_the_page_order(client):
+    # Same created_at for the whole batch: the id breaks the ties
+    client.post('/api/tasks/bulk', json={"tasks": [{"title": f"Bulk {i}", "list_id": 1} for i in range(9)]})
+    paged = client.get('/api/tasks', query_string={"limit": 100}).get_json()
+    expected = sorted(paged["data"], key=lambda task: (task["created_at"], task["id"]), reverse=True)
+
+    ids = walk_cursor(client)
+    assert ids == [task["id"] for task in expected]
+    assert len(ids) == paged["pagination"]["total"] == 19
+
+    work = walk_cursor(client, list_id=2, priority="high")
+    assert work and all(task_id in ids for task_id in work)
+    body = client.get('/api/tasks', query_string={"cursor": "", "list_id": 2, "include_total": "true"}).get_json()
+    assert body["pagination"]["total"] == 3
+
+    assert client.get('/api/tasks', query_string={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_a_page_loads_its_tags_in_one_query(client):
+    def statements(count):
+        client.post('/api/tasks/bulk', json={"tasks": [
+            {"title": f"Tagged {count}-{i}", "list_id": 3, "tags": [{"name": f"tag-{i}"}, {"name": "Urgent"}]}
+            for i in range(count)
+        ]})
+        response = client.get('/api/tasks', query_string={"list_id": 3, "limit": 100})
+        assert all(task["tags"] for task in response.get_json()["data"] if task["title"].startswith("Tagged"))
+        return int(response.headers['X-Query-Count'])
+
+    assert statements(2) == statements(40)
+
+
+def titles(client, **params):
+    body = client.get('/api/tasks', query_string=dict(params, limit=100)).get_json()
+    return sorted(task["title"] for task in body["data"])
+
+
+def test_tasks_filter_by_any_of_the_tags(client):
+    client.post('/api/tasks', json={"title": "Both", "list_id": 1, "tags": [{"name": "home"}, {"name": "Urgent"}]})
+    client.post('/api/tasks', json={"title": "Home only", "list_id": 2, "tags": [{"name": "HOME"}]})
+    client.post('/api/tasks', json={"title": "Untagged", "list_id": 1})
+
+    assert titles(client, tag="home") == ["Both", "Home only"]
+    assert titles(client, tag="urgent") == ["Both"]
+    assert titles(client, tags="urgent, missing") == ["Both"]
+    assert titles(client, tag="home", list_id=2) == ["Home only"]
+    assert titles(client, tag="missing") == []
+    body = client.get('/api/tasks', query_string={"tag": "home", "cursor": ""}).get_json()
+    assert len(body["data"]) == 2 and body["filters"]["tags"] == ["home"]
+
+
+def test_tag_names_are_resolved_from_the_cache(app, client):
+    def create(title):
+        response = client.post('/api/tasks', json={"title": title, "list_id": 1, "tags": [{"name": "Urgent"}]})
+        assert response.status_code == 201
+        return int(response.headers['X-Query-Count'])
+
+    # Seeding committed Urgent, so it starts out cached
+    tag_cache.clear()
+    tags_before = client.get('/api/health/cache').get_json()["tags"]
+    cold, warm = create("Cold"), create("Warm")
+    tags = client.get('/api/health/cache').get_json()["tags"]
+    assert warm == cold - 1
+    assert (tags["misses"], tags["hits"]) == (tags_before["misses"] + 1, tags_before["hits"] + 1)
+
+    # Renaming a tag clears the cache, so the old name stops resolving
+    with app.app_context():
+        db.session.get(Tag, 1).name = "Critical"
+        db.session.commit()
+    assert client.get('/api/health/cache').get_json()["tags"]["invalidations"] == tags["invalidations"] + 1
+    assert titles(client, tag="urgent") == []
+    assert titles(client, tag="critical") == ["Cold", "Warm"]
+
+    # A tag created in a transaction that rolls back never reaches the cache
+    with app.app_context():
+        db.session.add(Tag(name="Discarded"))
+        db.session.flush()
+        db.session.rollback()
+        assert lookup_tag_ids(db.session, ["discarded"]) == {}
+
+
+def search(client, term, **params):
+    body = client.get('/api/tasks', query_string=dict(params, search=term, limit=100)).get_json()
+    return sorted(task["title"] for task in body["data"])
+
+
+@pytest.mark.parametrize('backend', ['auto', 'like'])
+def test_search_finds_words_and_prefixes(make_app, backend):
+    client = make_app(SEARCH_BACKEND=backend).test_client()
+    assert search(client, "milk") == ["Buy Milk"]
+    assert search(client, "Gro") == ["Grocery Run"]
+    assert search(client, "documentation") == ["Complete API docs"]
+    # Quoted for FTS5, a plain substring for LIKE
+    assert search(client, 'docs" (') == ([] if backend == 'like' else ["Complete API docs"])
+
+    task_id = client.post('/api/tasks', json={"title": "Renew passport", "list_id": 1}).get_json()["id"]
+    client.put(f'/api/tasks/{task_id}', json={"title": "Renew driving licence"})
+    assert search(client, "passport") == []
+    assert search(client, "licence") == ["Renew driving licence"]
+    client.delete(f'/api/tasks/{task_id}')
+    assert search(client, "licence") == []
+
+
+def test_bulk_complete_counts_only_newly_completed_tasks(client):
+    # Task 3 is complete already; 999 does not exist
+    response = client.post('/api/tasks/bulk-complete', json={"ids": [1, 2, 3, 2, 999, "4"]})
+    assert response.get_json()["completed"] == 2
+    assert client.post('/api/tasks/bulk-complete', json={"ids": [1, 2]}).get_json()["completed"] == 0
+
+    stats = client.get('/api/stats').get_json()
+    # One streak update for the whole set
+    assert (stats["current_streak"], stats["tasks_completed_today"], stats["tasks_completed_total"]) == (1, 2, 49)
+
+    created = client.post('/api/tasks/bulk', json={"tasks": [{"title": f"Open {i}", "list_id": 1} for i in range(60)]})
+    ids = [result["id"] for result in created.get_json()["results"]]
+    few = client.post('/api/tasks/bulk-complete', json={"ids": ids[:2]})
+    many = client.post('/api/tasks/bulk-complete', json={"ids": ids[2:]})
+    assert many.get_json()["completed"] == 58
+    assert few.headers['X-Query-Count'] == many.headers['X-Query-Count']
+
+
+def due_view(client, view, **params):
+    return client.get('/api/tasks/due', query_string=dict(params, view=view)).get_json()
+
+
+def test_due_views_split_open_tasks_by_due_date(client):
+    today = date.today()
+    for offset in (-3, -1, -1, 5, 10):
+        client.post('/api/tasks', json={
+            "title": f"Due {offset}", "list_id": 1, "due_date": (today + timedelta(days=offset)).isoformat()
+        })
+    # Completed tasks never show up, however late they were
+    client.put('/api/tasks/1', json={"completed": True})
+
+    body = due_view(client, 'today')
+    assert [task["title"] for task in body["data"]] == ["Pay Bills"]
+    assert body["counts"] == {"overdue": 3, "today": 1, "upcoming": 2}
+    assert [task["title"] for task in due_view(client, 'upcoming')["data"]] == ["React Integration", "Due 5"]
+    assert due_view(client, 'upcoming', days=10)["counts"]["upcoming"] == 3
+
+    # Keyset pages in (due_date, id) order; only the first page is counted
+    titles, cursor = [], None
+    while True:
+        body = due_view(client, 'overdue', limit=2, **({"cursor": cursor} if cursor else {}))
+        assert body["counts"] is None or cursor is None
+        titles.extend(task["title"] for task in body["data"])
+        cursor = body["pagination"]["next_cursor"]
+        if cursor is None:
+            break
+    assert titles == ["Due -3", "Due -1", "Due -1"]
+
+    assert client.get('/api/tasks/due', query_string={"view": "someday"}).status_code == 400
+    assert client.get('/api/tasks/due', query_string={"cursor": "not-a-cursor"}).status_code == 400
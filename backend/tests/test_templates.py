@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects import mysql
+
+from extensions import db
+from models import Task, TaskList, TaskTemplate
+from utils.templates import _insert_skipping_occurrences, generate_recurrences
+
+
+def generate(through):
+    return sum(created for _, created in generate_recurrences(db.session, through))
+
+
+def test_regenerating_skips_existing_occurrences(client):
+    response = client.post('/api/tasks/templates', json={
+        "title": "Standup", "list_id": 2, "recurrence": "daily", "starts_on": date.today().isoformat()
+    })
+    assert response.status_code == 201
+    template_id = response.get_json()["id"]
+    through = date.today() + timedelta(days=6)
+
+    with client.application.app_context():
+        assert generate(through) == 7
+        # Lose the watermark, as a rerun racing the first one would
+        db.session.execute(update(TaskTemplate).where(TaskTemplate.id == template_id).values(generated_through=None))
+        db.session.commit()
+        assert generate(through) == 0
+        assert generate(through + timedelta(days=2)) == 2
+
+        occurrences = db.session.query(func.count(Task.id)).filter(Task.template_id == template_id).scalar()
+        assert occurrences == 9
+        actual = db.session.query(func.count(Task.id)).filter(Task.list_id == 2).scalar()
+        assert db.session.get(TaskList, 2).task_count == actual
+
+
+def test_templates_instantiate_singly_and_in_bulk(client):
+    template_id = client.post('/api/tasks/templates', json={
+        "title": "Water plants", "list_id": 1, "priority": "high", "due_offset_days": 3
+    }).get_json()["id"]
+
+    response = client.post(f'/api/tasks/templates/{template_id}/instantiate', json={})
+    task = response.get_json()
+    assert response.status_code == 201
+    assert (task["title"], task["list_id"], task["priority"]) == ("Water plants", 1, "high")
+    assert task["due_date"] == (date.today() + timedelta(days=3)).isoformat()
+    assert client.post('/api/tasks/templates/999/instantiate', json={}).status_code == 404
+
+    def instantiate(count):
+        response = client.post('/api/tasks/templates/instantiate', json={"templates": [
+            {"template_id": template_id, "list_id": i % 3 + 1, "due_date": "2030-01-01"} for i in range(count)
+        ] + [{"template_id": 999}, {"list_id": 1}]})
+        body = response.get_json()
+        assert (response.status_code, body["created"], body["failed"]) == (201, count, 2)
+        assert [result["status"] for result in body["results"][-2:]] == ["error", "error"]
+        return int(response.headers['X-Query-Count'])
+
+    assert instantiate(2) == instantiate(30)
+    with client.application.app_context():
+        counts = dict(db.session.query(Task.list_id, func.count(Task.id)).group_by(Task.list_id).all())
+        assert all(db.session.get(TaskList, list_id).task_count == count for list_id, count in counts.items())
+
+
+def test_mysql_skips_duplicates_without_ignoring_errors():
+    session = SimpleNamespace(connection=lambda: SimpleNamespace(dialect=mysql.dialect()))
+    sql = str(_insert_skipping_occurrences(session).compile(dialect=mysql.dialect()))
+    assert 'IGNORE' not in sql
+    assert sql.endswith('ON DUPLICATE KEY UPDATE id = tasks.id')
@@ -0,0 +1,46 @@
+"""
+SQLAlchemy asyncio engine for the ASGI mode (asgi.py). Uses the same URI as
+the WSGI app with the driver swapped for its asyncio counterpart, and the same
+DB_POOL_* settings.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from utils.db_routing import enable_sqlite_foreign_keys
+
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_url(uri):
+    """mysql+pymysql://... -> mysql+aiomysql://..., sqlite://... -> sqlite+aiosqlite://..."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db(config):
+    """Returns (engine, sessionmaker) for the configured database"""
+    url = async_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {
+        "pool_pre_ping": config.get('DB_POOL_PRE_PING', True),
+        "pool_recycle": config.get('DB_POOL_RECYCLE', 1800),
+    }
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        # aiosqlite defaults to NullPool for files; pool them like the sync engine does
+        options.update({
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": config.get('DB_POOL_SIZE', 10),
+            "max_overflow": config.get('DB_MAX_OVERFLOW', 20),
+            "pool_timeout": config.get('DB_POOL_TIMEOUT', 30),
+        })
+    options.update(config.get('ASYNC_ENGINE_OPTIONS') or {})
+    engine = create_async_engine(url, **options)
+    enable_sqlite_foreign_keys(engine.sync_engine)
+    # Objects are serialized after commit, so keep them loaded
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return engine, sessionmaker
@@ -0,0 +1,138 @@
+"""
+Runs the sub-operations of POST /api/batch against the existing views.
+
+Each operation is dispatched to the tasks, lists or stats view its method
+and path match, in a request context of its own that shares the batch's
+database session. The views' session.commit() calls only flush while the
+batch runs, so the batch commits once at the end: events, cache versions
+and tag cache entries are published by that commit like for any request.
+
+In atomic mode the first failing operation (status >= 400) rolls the whole
+batch back and the remaining operations are skipped. In best-effort mode
+every operation runs in a SAVEPOINT, a failing one is rolled back alone and
+the others are committed.
+
+The batch is charged once against its own limit, weighted by its number
+of operations, in place of the default limits of the routes it calls. A
+view's own @limiter.limit still fires when an operation calls it, so a
+batch cannot go past a stricter per-route limit. Otherwise only the view
+runs for an operation: before/after request hooks and the response cache
+apply to the batch as a whole.
+"""
+import contextlib
+import copy
+import structlog
+from flask import current_app, g, request
+from sqlalchemy.orm import scoped_session
+from werkzeug.exceptions import HTTPException
+
+logger = structlog.get_logger()
+
+BATCH_BLUEPRINTS = ('tasks', 'lists', 'stats')
+# Streaming and upload endpoints do not fit in a JSON batch
+EXCLUDED_ENDPOINTS = {'tasks.export_tasks', 'tasks.import_tasks_route'}
+
+SKIPPED = {"status": 424, "body": {"error": "Not run, an earlier operation failed"}}
+
+
+class InvalidBatch(ValueError):
+    pass
+
+
+def parse_operations(data, max_operations):
+    """Validates the batch payload; returns (operations, atomic)"""
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list) or not data['operations']:
+        raise InvalidBatch("Expected {\"operations\": [...]} with at least one operation")
+    operations = data['operations']
+    if len(operations) > max_operations:
+        raise InvalidBatch(f"At most {max_operations} operations per batch")
+    for i, operation in enumerate(operations):
+        if not isinstance(operation, dict) or not isinstance(operation.get('path'), str) \
+                or not isinstance(operation.get('method', 'GET'), str):
+            raise InvalidBatch(f"Operation {i} needs a path and an optional method")
+        if not operation['path'].startswith('/api/'):
+            raise InvalidBatch(f"Operation {i} path must start with /api/")
+    return operations, data.get('atomic', True) is not False
+
+
+@contextlib.contextmanager
+def deferred_commits(session):
+    """
+    Turns the views' session.commit() into a flush until the batch commits.
+    Only this request's Session is patched: db.session is a proxy shared by
+    every thread, whose other requests must keep committing.
+    """
+    if isinstance(session, scoped_session):
+        session = session()
+    session.commit = session.flush
+    try:
+        yield
+    finally:
+        del session.commit
+
+
+def dispatch(operation):
+    """Runs one operation's view; returns {"status", "body"}"""
+    method = operation.get('method', 'GET').upper()
+    with current_app.test_request_context(
+        operation['path'], method=method, json=operation.get('body'),
+        environ_base={'REMOTE_ADDR': request.remote_addr}
+    ):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            endpoint = request.url_rule.endpoint
+            if endpoint.split('.')[0] not in BATCH_BLUEPRINTS or endpoint in EXCLUDED_ENDPOINTS:
+                return {"status": 400, "body": {"error": f"{method} {request.path} cannot be batched"}}
+            response = current_app.make_response(current_app.view_functions[endpoint](**request.view_args))
+        except HTTPException as e:
+            response = current_app.make_response(current_app.handle_http_exception(e))
+        except Exception as e:
+            logger.error("batch_operation_error", method=method, path=operation['path'], error=str(e))
+            return {"status": 500, "body": {"error": "Internal server error"}}
+        return {"status": response.status_code, "body": response.get_json(silent=True)}
+
+
+def begin_batch(session):
+    connection = session.connection()
+    dbapi_connection = connection.connection.dbapi_connection
+    if connection.dialect.name == 'sqlite' and not dbapi_connection.in_transaction:
+        # pysqlite only opens a transaction before DML, so a SAVEPOINT issued
+        # first would commit on release. IMMEDIATE takes the write lock up
+        # front rather than failing to upgrade a read snapshot later.
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def run_batch(session, operations, atomic):
+    """Runs the operations in one transaction; returns (results, committed)"""
+    results = []
+    begin_batch(session)
+    g.batch = True
+    try:
+        with deferred_commits(session):
+            for i, operation in enumerate(operations):
+                if atomic:
+                    result = dispatch(operation)
+                    results.append(result)
+                    if result["status"] >= 400:
+                        session.rollback()
+                        results.extend(SKIPPED for _ in operations[i + 1:])
+                        return results, False
+                    continue
+
+                # Events and cache bookkeeping queued on session.info are not
+                # savepoint-aware, so a failed operation restores them by hand
+                info = copy.deepcopy(dict(session.info))
+                savepoint = session.begin_nested()
+                result = dispatch(operation)
+                if result["status"] < 400:
+                    savepoint.commit()
+                else:
+                    savepoint.rollback()
+                    session.info.clear()
+                    session.info.update(info)
+                results.append(result)
+    finally:
+        g.batch = False
+    session.commit()
+    return results, True
@@ -0,0 +1,132 @@
+import uuid
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import insert, select
+from models import Task, Tag, TaskList, task_tags
+from utils.stats_calculator import adjust_list_counts, record_task_changes
+from utils.tags import lookup_tag_ids, remember_tag_ids, tag_key
+
+# Keep IN lists and multi-row inserts well below driver parameter limits
+BATCH_SIZE = 1000
+
+
+def chunked(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def existing_list_ids(session, list_ids):
+    """Returns the subset of list_ids that exist, in one IN query per batch"""
+    found = set()
+    for batch in chunked(sorted(set(list_ids))):
+        found.update(row[0] for row in session.query(TaskList.id).filter(TaskList.id.in_(batch)))
+    return found
+
+
+def insert_returning_ids(session, table, rows, key=None):
+    """
+    Inserts rows with one multi-row INSERT per batch; returns their ids in
+    input order. Auto-increment ids grow in VALUES order within a statement,
+    so the ids RETURNING gives back (SQLite, MariaDB), sorted, line up with
+    the rows. MySQL has no RETURNING and its ids need not be consecutive
+    (auto_increment_increment, interleaved lock mode), so the rows are read
+    back: by their unique key column when they have one, otherwise by a
+    marker written into table's insert_batch column, in id order.
+    """
+    returning = session.connection().dialect.insert_returning
+    ids = []
+    for batch in chunked(rows):
+        if returning:
+            ids.extend(sorted(session.execute(insert(table).values(batch).returning(table.c.id)).scalars()))
+        elif key is not None:
+            session.execute(insert(table).values(batch))
+            found = dict(session.execute(
+                select(table.c[key], table.c.id).where(table.c[key].in_([row[key] for row in batch]))
+            ).all())
+            ids.extend(found[row[key]] for row in batch)
+        else:
+            marker = uuid.uuid4().hex
+            session.execute(insert(table).values([dict(row, insert_batch=marker) for row in batch]))
+            ids.extend(session.execute(
+                select(table.c.id).where(table.c.insert_batch == marker).order_by(table.c.id)
+            ).scalars())
+    return ids
+
+
+def resolve_tag_ids(session, tags):
+    """
+    Maps tag name -> id for the given tag payloads through the tag cache,
+    inserting missing tags in one batch. Names differing only in case are one
+    tag, created with the first spelling and color given.
+    """
+    new = {}
+    for tag in tags:
+        new.setdefault(tag_key(tag['name']), tag)
+    if not new:
+        return {}
+
+    names = list(dict.fromkeys(tag['name'] for tag in tags))
+    tag_ids = lookup_tag_ids(session, names)
+    missing = [tag for tag in new.values() if tag['name'] not in tag_ids]
+    if missing:
+        ids = insert_returning_ids(session, Tag.__table__, [
+            {"name": tag['name'], "color": tag.get('color', '#6b7280')} for tag in missing
+        ], key='name')
+        created = {tag_key(tag['name']): tag_id for tag, tag_id in zip(missing, ids)}
+        remember_tag_ids(session, {tag['name']: tag_id for tag, tag_id in zip(missing, ids)})
+        tag_ids.update((name, created[tag_key(name)]) for name in names if name not in tag_ids)
+    return tag_ids
+
+
+def insert_task_rows(session, records, tag_ids, now):
+    """
+    Inserts validated task records and their task_tags rows with multi-row
+    INSERTs; returns the new ids in input order
+    """
+    ids = insert_returning_ids(session, Task.__table__, [
+        {
+            "title": record['title'],
+            "description": record.get('description'),
+            "completed": record.get('completed', False),
+            "completed_at": now if record.get('completed') else None,
+            "priority": record.get('priority', 'medium'),
+            "due_date": record.get('due_date'),
+            "list_id": record['list_id'],
+            "template_id": record.get('template_id'),
+            "occurrence_date": record.get('occurrence_date'),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for record in records
+    ])
+
+    links = []
+    for task_id, record in zip(ids, records):
+        # Spellings of one tag in different case link it once
+        for tag_id in dict.fromkeys(tag_ids[tag['name']] for tag in record.get('tags') or []):
+            links.append({"task_id": task_id, "tag_id": tag_id})
+    for batch in chunked(links):
+        session.execute(insert(task_tags), batch)
+    return ids
+
+
+def apply_insert_counts(session, list_counts, completed, now):
+    """Bumps task_count once per list and the stats totals for a set of inserted tasks"""
+    adjust_list_counts(session, list_counts)
+    record_task_changes(session, total=sum(list_counts.values()), completed=completed, completed_at=now)
+
+
+def insert_tasks(session, records, tag_ids):
+    """
+    Inserts validated task records with their tags and updates the list and
+    stats counters in the same transaction. Returns the new ids in input order.
+    """
+    now = datetime.utcnow()
+    ids = insert_task_rows(session, records, tag_ids, now)
+    apply_insert_counts(
+        session,
+        Counter(record['list_id'] for record in records),
+        sum(1 for record in records if record.get('completed')),
+        now
+    )
+    return ids
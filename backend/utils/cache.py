@@ -0,0 +1,279 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from flask import request, current_app, g
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from utils.db_routing import reads_pinned_to_primary
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn, so one process
+    fcntl = None
+
+# Cached read endpoints are keyed on these entities; a committed write to any
+# of the tables bumps the versions of the entities that depend on it
+TABLE_ENTITIES = {
+    'tasks': ('tasks',),
+    'task_tags': ('tasks',),
+    'tags': ('tasks',),
+    # task_count lives on task_lists, and list deletes cascade to tasks
+    'task_lists': ('lists', 'tasks'),
+    'user_stats': ('stats',),
+    'daily_completions': ('stats',),
+}
+
+
+# Offsets of each entity's counter in the shared versions file
+ENTITY_OFFSETS = {
+    entity: index * 8
+    for index, entity in enumerate(sorted({entity for entities in TABLE_ENTITIES.values() for entity in entities}))
+}
+COUNTER = struct.Struct('<q')
+
+
+class EntityVersions:
+    """
+    Version counters, bumped after each commit that touches an entity. They
+    live in the process until share() maps them onto a file that every worker
+    on the host opens, so a write served by one worker invalidates the
+    responses the others have cached.
+    """
+
+    def __init__(self):
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+        self.path = None
+        self._fd = None
+        self._mm = None
+
+    def share(self, path):
+        if path == self.path:
+            return
+        size = COUNTER.size * len(ENTITY_OFFSETS)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            # Zero-filled, and never shrunk under another worker
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            mm = mmap.mmap(fd, size)
+        except OSError:
+            os.close(fd)
+            raise
+        with self._lock:
+            self.close()
+            self.path, self._fd, self._mm = path, fd, mm
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._fd)
+        self.path, self._fd, self._mm = None, None, None
+
+    def bump(self, entities):
+        with self._lock:
+            if self._mm is None:
+                for entity in entities:
+                    self._versions[entity] += 1
+                return
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                for entity in entities:
+                    offset = ENTITY_OFFSETS[entity]
+                    COUNTER.pack_into(self._mm, offset, COUNTER.unpack_from(self._mm, offset)[0] + 1)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def snapshot(self, entities):
+        mm = self._mm
+        if mm is None:
+            return tuple(self._versions[entity] for entity in entities)
+        return tuple(COUNTER.unpack_from(mm, ENTITY_OFFSETS[entity])[0] for entity in entities)
+
+
+entity_versions = EntityVersions()
+
+
+class CacheEntry:
+    __slots__ = ('versions', 'etag', 'body', 'mimetype', 'expires_at')
+
+    def __init__(self, versions, etag, body, mimetype, expires_at):
+        self.versions = versions
+        self.etag = etag
+        self.body = body
+        self.mimetype = mimetype
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """In-process LRU of rendered responses with a TTL and entry/byte limits"""
+
+    def __init__(self, ttl=10, max_entries=1024, max_bytes=32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                self._remove(key)
+                self.metrics["expired"] += 1
+                return None
+            if entry.versions != versions:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.metrics["evictions"] += 1
+
+    def record(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["not_modified"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_ratio": round((lookups - self.metrics["misses"]) / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+
+def cached_response(*entities):
+    """
+    Caches a GET view's 200 responses per path and query string, tagged with the
+    versions of the given entities, and answers If-None-Match with 304 from the
+    cache without running the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            # Batch operations see uncommitted writes, which must neither be served stale nor cached
+            if cache is None or g.get('batch'):
+                return view(*args, **kwargs)
+
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            # Taken before the view runs so a concurrent write invalidates what we store
+            versions = entity_versions.snapshot(entities)
+            # A client reading its own writes must not get a page rendered from a lagging replica
+            entry = None if 'db_router' in current_app.extensions and reads_pinned_to_primary() else cache.get(key, versions)
+            if entry is not None:
+                if entry.etag in request.if_none_match:
+                    cache.record("not_modified")
+                else:
+                    cache.record("hits")
+                response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+                return _finalize(response, entry.etag)
+
+            cache.record("misses")
+            # The body is stored under versions taken now, so it must be read
+            # from the primary: a replica may not have the latest writes yet
+            g.filling_cache = True
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest()
+            cache.put(key, CacheEntry(versions, etag, body, response.mimetype, time.monotonic() + cache.ttl))
+            return _finalize(response, etag)
+        return wrapper
+    return decorator
+
+
+def _finalize(response, etag):
+    response.set_etag(etag)
+    # Let clients keep the body but always revalidate with If-None-Match
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def _changed_entities(session):
+    return session.info.setdefault('changed_entities', set())
+
+
+def _track_flush(session, flush_context):
+    changed = _changed_entities(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        changed.update(TABLE_ENTITIES.get(table, ()))
+
+
+def _track_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _changed_entities(orm_execute_state.session).update(TABLE_ENTITIES.get(table.name, ()))
+
+
+def _bump_on_commit(session):
+    # Savepoints report commits and rollbacks too; wait for the outer transaction
+    if session.in_nested_transaction():
+        return
+    changed = session.info.pop('changed_entities', None)
+    if changed:
+        entity_versions.bump(changed)
+
+
+def _discard_on_rollback(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop('changed_entities', None)
+
+
+def init_response_cache(app):
+    """Sets up the response cache for cached_response views and write tracking on sessions"""
+    if not app.config.get('RESPONSE_CACHE_ENABLED', True):
+        return
+    app.extensions['response_cache'] = ResponseCache(
+        ttl=app.config.get('RESPONSE_CACHE_TTL', 10),
+        max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024),
+        max_bytes=app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+    )
+    if fcntl is not None:
+        path = app.config.get('RESPONSE_CACHE_VERSIONS_PATH') or os.path.join(app.instance_path, 'cache-versions')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entity_versions.share(path)
+    for name, listener in (
+        ('after_flush', _track_flush),
+        ('do_orm_execute', _track_statement),
+        ('after_commit', _bump_on_commit),
+        ('after_rollback', _discard_on_rollback),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
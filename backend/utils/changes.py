@@ -0,0 +1,106 @@
+"""
+Delta sync for GET /api/tasks/changes.
+
+A sync token holds two keyset positions: (updated_at, id) in tasks and
+(deleted_at, id) in deletion_log. A call returns the tasks and tombstones
+past those positions, oldest first, and the token to send next time. Only
+rows older than the settle delay (the horizon) are read, so a write still
+committing when the sync runs is picked up by the next one rather than
+jumped over.
+
+Clients apply a page's tombstones before its tasks. A list tombstone also
+removes every task of that list. Task pages never run ahead of the
+tombstone pages, so a page never carries an upsert that a later page's
+tombstone would wrongly remove.
+"""
+import base64
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import insert, or_, and_
+from models import Task, DeletionLog
+from utils.pagination import InvalidCursor
+
+SyncToken = namedtuple('SyncToken', 'horizon task_at task_id deleted_at deletion_id')
+
+
+class ExpiredToken(ValueError):
+    """The token predates the tombstone retention period; the client must resync"""
+
+
+def encode_token(token):
+    raw = '|'.join('' if value is None else value.isoformat() if isinstance(value, datetime) else str(value)
+                   for value in token)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_token(value):
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        horizon, task_at, task_id, deleted_at, deletion_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        )
+        return SyncToken(
+            datetime.fromisoformat(horizon),
+            datetime.fromisoformat(task_at) if task_at else None,
+            int(task_id) if task_id else 0,
+            datetime.fromisoformat(deleted_at) if deleted_at else None,
+            int(deletion_id) if deletion_id else 0,
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def record_deletions(session, entity, ids, now=None):
+    """Writes one tombstone per deleted task or list id"""
+    now = now or datetime.utcnow()
+    rows = [{"entity": entity, "entity_id": entity_id, "deleted_at": now} for entity_id in ids]
+    if rows:
+        session.execute(insert(DeletionLog), rows)
+
+
+def _after(stamp_column, id_column, stamp, last_id):
+    if stamp is None:
+        return True
+    return or_(stamp_column > stamp, and_(stamp_column == stamp, id_column > last_id))
+
+
+def load_changes(query, session, since, limit, settle_seconds, retention_days):
+    """
+    Returns (tasks, tombstones, next_token, has_more) past the since token; an
+    empty since starts a full sync and skips the existing tombstones
+    """
+    now = datetime.utcnow()
+    horizon = now - timedelta(seconds=settle_seconds)
+    if since:
+        token = decode_token(since)
+        if token.horizon < now - timedelta(days=retention_days):
+            raise ExpiredToken("Sync token expired, start a full sync")
+    else:
+        token = SyncToken(horizon, None, 0, horizon, 0)
+
+    tombstones = session.query(DeletionLog).filter(
+        _after(DeletionLog.deleted_at, DeletionLog.id, token.deleted_at, token.deletion_id),
+        DeletionLog.deleted_at <= horizon
+    ).order_by(DeletionLog.deleted_at, DeletionLog.id).limit(limit + 1).all()
+    more_tombstones = len(tombstones) > limit
+    tombstones = tombstones[:limit]
+
+    # Keep task upserts from overtaking tombstones that did not fit in this page
+    task_horizon = tombstones[-1].deleted_at if more_tombstones else horizon
+    tasks = query.filter(
+        _after(Task.updated_at, Task.id, token.task_at, token.task_id),
+        Task.updated_at <= task_horizon
+    ).order_by(Task.updated_at, Task.id).limit(limit + 1).all()
+    more_tasks = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    last_task = tasks[-1] if tasks else None
+    last_tombstone = tombstones[-1] if tombstones else None
+    next_token = SyncToken(
+        horizon,
+        last_task.updated_at if last_task else token.task_at,
+        last_task.id if last_task else token.task_id,
+        last_tombstone.deleted_at if last_tombstone else token.deleted_at,
+        last_tombstone.id if last_tombstone else token.deletion_id,
+    )
+    return tasks, tombstones, encode_token(next_token), more_tasks or more_tombstones
@@ -0,0 +1,200 @@
+"""
+Engine options, read-replica routing and pool metrics.
+
+Views decorated with replica_reads send their SELECTs to one of the
+REPLICA_DATABASE_URIS, picked round-robin once per request. Flushes and
+INSERT/UPDATE/DELETE statements always go to the primary, and so does every
+later statement of that request. A client that just wrote (successful
+non-GET) gets a short-lived cookie that keeps its reads on the primary;
+sending X-Read-Your-Writes: 1 does the same. So do responses the response
+cache is about to store (g.filling_cache).
+"""
+import itertools
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import UpdateBase, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from utils.instrumentation import Histogram
+
+PRIMARY_COOKIE = 'taskflow_primary_until'
+REPLICA_BIND_PREFIX = 'replica_'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Seconds; checkouts are usually far below the request latency buckets
+POOL_WAIT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+pool_checkout = Histogram(
+    'taskflow_db_pool_checkout_seconds',
+    'Time to get a connection from the pool, including opening new ones.',
+    ('pool',), POOL_WAIT_BUCKETS
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited"""
+    name = 'primary'
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout.observe((self.name,), time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.name = self.name
+        return pool
+
+
+class ReplicaRouter:
+    """Round-robin over the replica bind keys"""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self._cycle = itertools.cycle(keys)
+        self._lock = threading.Lock()
+
+    def next_key(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that serves replica_reads views from a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get('replica_reads'):
+            if self._flushing or isinstance(clause, UpdateBase):
+                # Read our own writes for the rest of the request
+                g.replica_reads = False
+            else:
+                key = g.get('replica_key')
+                if key is None:
+                    key = g.replica_key = current_app.extensions['db_router'].next_key()
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def reads_pinned_to_primary():
+    """True when the client asked to read its own writes, or wrote moments ago"""
+    if request.headers.get('X-Read-Your-Writes', '').lower() in ('1', 'true', 'yes'):
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def replica_reads(view):
+    """Marks a read-only view whose queries may be served by a replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Batch operations must read the writes made earlier in the same transaction,
+        # and a response the cache will keep must not come from a lagging replica
+        if 'db_router' in current_app.extensions and not reads_pinned_to_primary() \
+                and not g.get('batch') and not g.get('filling_cache'):
+            g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _engine_options(uri, config):
+    options = {
+        "pool_pre_ping": config.get('DB_POOL_PRE_PING', True),
+        "pool_recycle": config.get('DB_POOL_RECYCLE', 1800),
+    }
+    # In-memory SQLite uses a single shared connection, not a sized pool
+    if not _is_memory_sqlite(uri):
+        options.update({
+            "poolclass": TimedQueuePool,
+            "pool_size": config.get('DB_POOL_SIZE', 10),
+            "max_overflow": config.get('DB_MAX_OVERFLOW', 20),
+            "pool_timeout": config.get('DB_POOL_TIMEOUT', 30),
+        })
+    # Explicit engine options win over the defaults
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def configure_engines(app):
+    """Builds engine options from the DB_POOL_* settings and adds the replica binds; call before db.init_app"""
+    config = app.config
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    # Flask-SQLAlchemy only applies SQLALCHEMY_ENGINE_OPTIONS to the primary
+    for i, uri in enumerate(config.get('REPLICA_DATABASE_URIS') or []):
+        binds[f"{REPLICA_BIND_PREFIX}{i}"] = {"url": uri, **_engine_options(uri, config)}
+    config['SQLALCHEMY_BINDS'] = binds
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options(config['SQLALCHEMY_DATABASE_URI'], config)
+
+
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+
+def enable_sqlite_foreign_keys(engine):
+    """SQLite enforces foreign keys, ondelete='CASCADE' included, only when each connection turns them on"""
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _sqlite_foreign_keys):
+        event.listen(engine, 'connect', _sqlite_foreign_keys)
+
+
+def init_db_routing(app, db):
+    """Names the pools for metrics and enables replica routing when replicas are configured; call after db.init_app"""
+    with app.app_context():
+        for key, engine in db.engines.items():
+            enable_sqlite_foreign_keys(engine)
+            if isinstance(engine.pool, TimedQueuePool):
+                engine.pool.name = key or 'primary'
+        replicas = sorted(key for key in db.engines if key and key.startswith(REPLICA_BIND_PREFIX))
+    if not replicas:
+        return
+    app.extensions['db_router'] = ReplicaRouter(replicas)
+    window = app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5)
+
+    @app.after_request
+    def pin_writer_to_primary(response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(PRIMARY_COOKIE, str(time.time() + window), max_age=window,
+                                httponly=True, samesite='Lax')
+        if g.get('replica_key'):
+            response.headers['X-DB-Replica'] = g.replica_key
+        return response
+
+
+def pool_status(engines):
+    """Size, checked-out connections, overflow and utilization per pool"""
+    status = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        size = pool.size()
+        capacity = size + max(pool._max_overflow, 0)
+        status[key or 'primary'] = {
+            "size": size,
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "utilization": round(pool.checkedout() / capacity, 4) if capacity else 0.0,
+        }
+    return status
+
+
+def render_pool_metrics(engines):
+    lines = pool_checkout.render()
+    status = pool_status(engines)
+    for field in ('size', 'checked_out', 'overflow', 'utilization'):
+        metric = f'taskflow_db_pool_{field}'
+        lines.append(f'# TYPE {metric} gauge')
+        lines.extend(f'{metric}{{pool="{name}"}} {values[field]}' for name, values in sorted(status.items()))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,48 @@
+"""
+Due-date views for GET /api/tasks/due: open tasks that are overdue, due
+today or due within the next N days, in (due_date, id) order.
+
+Every query starts with completed = false and a due_date range, so it is a
+range scan on the (completed, due_date, id) index, and the per-view counts
+come from one grouped COUNT over that range. Days are server-local, like
+TaskSchema.is_overdue.
+"""
+from datetime import timedelta
+from sqlalchemy import case, func, or_, and_
+from models import Task
+
+DUE_VIEWS = ('overdue', 'today', 'upcoming')
+
+
+def view_range(view, today, days):
+    """(first, last) due dates of a view, either end None when open"""
+    if view == 'overdue':
+        return None, today - timedelta(days=1)
+    if view == 'today':
+        return today, today
+    return today + timedelta(days=1), today + timedelta(days=days)
+
+
+def filter_view(query, view, today, days, after=None):
+    """Open tasks of view, past the (due_date, id) keyset position after"""
+    first, last = view_range(view, today, days)
+    query = query.filter(Task.completed == False, Task.due_date <= last)
+    if first is not None:
+        query = query.filter(Task.due_date >= first)
+    if after is not None:
+        due_date, last_id = after
+        query = query.filter(or_(Task.due_date > due_date, and_(Task.due_date == due_date, Task.id > last_id)))
+    return query.order_by(Task.due_date, Task.id)
+
+
+def view_counts(session, today, days):
+    """{view: open task count} for all views from one grouped query"""
+    bucket = case(
+        (Task.due_date < today, 'overdue'),
+        (Task.due_date == today, 'today'),
+        else_='upcoming'
+    )
+    rows = session.query(bucket, func.count()).filter(
+        Task.completed == False, Task.due_date <= today + timedelta(days=days)
+    ).group_by(bucket).all()
+    return {**{view: 0 for view in DUE_VIEWS}, **dict(rows)}
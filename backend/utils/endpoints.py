@@ -0,0 +1,360 @@
+"""
+Bodies of the task, list, stats and health endpoints that both the Flask
+routes and the ASGI handlers (routes/async_api.py) serve.
+
+Each function takes a sync Session (db.session, or an AsyncSession's through
+run_sync) and the parts of the request it needs, does the queries, counter
+maintenance and commit, and returns (payload, status) for json_response().
+The callers only parse the request and encode the answer, so the two stacks
+cannot drift apart. They run inside the Flask app's context, which gives
+these functions current_app's config and search backend.
+"""
+import math
+from datetime import date, datetime
+from flask import current_app
+from marshmallow import ValidationError, EXCLUDE
+from sqlalchemy import func, update, case, or_, and_, text
+from sqlalchemy.orm import selectinload
+from models import Task, TaskList, UserStats, TaskTemplate
+from utils.validators import TaskSchema, ListSchema, StatsSchema, TemplateSchema
+from utils.serializers import dump
+from utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from utils.bulk import chunked, existing_list_ids, resolve_tag_ids, insert_task_rows
+from utils.tags import tag_names, tag_filter
+from utils.search import get_search_backend
+from utils.changes import record_deletions
+from utils.events import queue_event
+from utils.stats_calculator import (
+    update_streak_logic, adjust_list_count, record_task_changes, get_or_create_stats,
+    get_weekly_completed_count, adjust_task_totals, adjust_daily_completions_by_day
+)
+
+task_schema = TaskSchema()
+# Updates send any subset of the fields; read-only ones echoed back are dropped
+task_update_schema = TaskSchema(partial=True, unknown=EXCLUDE)
+tasks_schema = TaskSchema(many=True)
+list_schema = ListSchema()
+lists_schema = ListSchema(many=True)
+stats_schema = StatsSchema()
+templates_schema = TemplateSchema(many=True)
+
+NOT_FOUND = {"error": "Resource not found"}, 404
+
+
+def int_arg(args, name, default=None):
+    """args[name] as an int, default when missing or not a number (like request.args.get(type=int))"""
+    try:
+        return int(args[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def is_true(args, name):
+    return args.get(name, 'false').lower() in ('1', 'true', 'yes')
+
+
+# Tasks
+
+def filter_tasks(session, query, args, rank=False):
+    """Applies the list_id/priority/tag/search filters shared by the task listing routes"""
+    list_id = int_arg(args, 'list_id')
+    priority = args.get('priority')
+    search = args.get('search')
+    tags = tag_names(args)
+
+    if list_id:
+        query = query.filter(Task.list_id == list_id)
+    if priority:
+        query = query.filter(Task.priority == priority)
+    if tags:
+        query = query.filter(tag_filter(session, tags))
+    if search:
+        query = get_search_backend().apply(query, search, rank=rank)
+
+    return query, {
+        "list_id": list_id,
+        "priority": priority,
+        "tags": tags or None
+    }
+
+
+def list_tasks(session, args):
+    """GET /api/tasks: a page of tasks, or a keyset page with ?cursor="""
+    page = int_arg(args, 'page', 1)
+    limit = int_arg(args, 'limit', 20)
+    cursor = args.get('cursor')
+
+    rank = args.get('sort') == 'relevance' and cursor is None
+    query, filters = filter_tasks(session, session.query(Task).options(selectinload(Task.tags)), args, rank=rank)
+
+    # Cursor mode: ?cursor= (empty for the first page) switches to keyset pagination
+    if cursor is not None:
+        return list_tasks_by_cursor(query, args, cursor, limit, filters)
+
+    # Same defaults as Flask-SQLAlchemy's paginate(error_out=False)
+    page = max(page, 1)
+    limit = limit if limit > 0 else 20
+    total = query.order_by(None).count()
+    items = query.order_by(Task.created_at.desc()).limit(limit).offset((page - 1) * limit).all()
+
+    return {
+        "data": dump(tasks_schema, items),
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "pages": math.ceil(total / limit) if total else 0
+        },
+        "filters": filters
+    }, 200
+
+
+def list_tasks_by_cursor(query, args, cursor, limit, filters):
+    """Keyset pagination on (created_at, id); skips the COUNT unless include_total is set"""
+    limit = max(1, min(limit, 100))
+    total = query.order_by(None).count() if is_true(args, 'include_total') else None
+
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+        except InvalidCursor:
+            return {"error": "Invalid cursor"}, 400
+        query = query.filter(or_(
+            Task.created_at < created_at,
+            and_(Task.created_at == created_at, Task.id < last_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    items = query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if has_more else None
+
+    return {
+        "data": dump(tasks_schema, items),
+        "pagination": {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "total": total
+        },
+        "filters": filters
+    }, 200
+
+
+def create_task(session, body):
+    """POST /api/tasks"""
+    try:
+        data = task_schema.load(body)
+    except ValidationError as err:
+        return err.messages, 400
+    if not existing_list_ids(session, [data['list_id']]):
+        return {"list_id": ["List not found."]}, 400
+
+    # Tag ids come from the tag cache; new tags are inserted in one batch
+    tag_ids = resolve_tag_ids(session, data.get('tags') or [])
+    # Tasks created here always start open
+    task_id, = insert_task_rows(session, [dict(data, completed=False)], tag_ids, datetime.utcnow())
+    adjust_list_count(session, data['list_id'], 1)
+    record_task_changes(session, total=1)
+    queue_event(session, 'task.created', [task_id])
+    session.commit()
+
+    return {
+        "id": task_id,
+        "message": "Task created successfully",
+        "is_overdue": False
+    }, 201
+
+
+def update_task(session, task_id, body):
+    """PUT /api/tasks/<id>"""
+    task = session.query(Task).options(selectinload(Task.tags)).filter(Task.id == task_id).first()
+    if task is None:
+        return NOT_FOUND
+    try:
+        data = task_update_schema.load(body or {})
+    except ValidationError as err:
+        return err.messages, 400
+
+    was_completed = task.completed
+
+    task.title = data.get('title', task.title)
+    task.description = data.get('description', task.description)
+    task.priority = data.get('priority', task.priority)
+    task.due_date = data.get('due_date', task.due_date)
+    task.completed = data.get('completed', task.completed)
+
+    if not was_completed and task.completed:
+        task.completed_at = datetime.utcnow()
+        record_task_changes(session, completed=1, completed_at=task.completed_at)
+        update_streak_logic(session)
+    elif was_completed and not task.completed:
+        record_task_changes(session, completed=-1, completed_at=task.completed_at)
+        task.completed_at = None
+
+    queue_event(session, 'task.updated', [task.id])
+    # The flush sets updated_at; serialize before the commit expires the task
+    session.flush()
+    payload = dump(task_schema, task)
+    session.commit()
+    return payload, 200
+
+
+def delete_task(session, task_id):
+    """DELETE /api/tasks/<id>"""
+    task = session.get(Task, task_id)
+    if task is None:
+        return NOT_FOUND
+    session.delete(task)
+    adjust_list_count(session, task.list_id, -1)
+    record_task_changes(session, total=-1, completed=-1 if task.completed else 0, completed_at=task.completed_at)
+    record_deletions(session, 'task', [task.id])
+    queue_event(session, 'task.deleted', [task.id])
+    session.commit()
+    return {"message": "Task deleted"}, 200
+
+
+def bulk_complete(session, body):
+    """POST /api/tasks/bulk-complete"""
+    ids = body.get('ids', []) if isinstance(body, dict) else []
+    ids = sorted({i for i in ids if isinstance(i, int)}) if isinstance(ids, list) else []
+    chunk_size = current_app.config.get('BULK_CHUNK_SIZE', 1000)
+
+    # One set-based UPDATE per chunk of ids; the affected row count is the
+    # number of newly completed tasks and feeds a single streak update
+    now = datetime.utcnow()
+    completed = 0
+    for batch in chunked(ids, chunk_size):
+        result = session.execute(
+            update(Task)
+            # IS NOT: an equality on completed would tempt SQLite's planner
+            # into reading every open task through the completed index
+            .where(Task.id.in_(batch), Task.completed.isnot(True))
+            .values(completed=True, completed_at=now, updated_at=now),
+            execution_options={"synchronize_session": False}
+        )
+        completed += result.rowcount
+
+    if completed:
+        record_task_changes(session, completed=completed, completed_at=now)
+        update_streak_logic(session, completed)
+        # The requested ids; some of them may already have been complete
+        queue_event(session, 'task.updated', ids)
+    session.commit()
+    return {"message": f"{completed} tasks updated", "completed": completed}, 200
+
+
+def list_templates(session):
+    """GET /api/tasks/templates"""
+    return dump(templates_schema, session.query(TaskTemplate).all()), 200
+
+
+# Lists
+
+def list_lists(session):
+    """GET /api/lists"""
+    return dump(lists_schema, session.query(TaskList).all()), 200
+
+
+def create_list(session, body):
+    """POST /api/lists"""
+    errors = list_schema.validate(body)
+    if errors:
+        return errors, 400
+
+    new_list = TaskList(name=body['name'], color=body.get('color', '#3b82f6'))
+    session.add(new_list)
+    session.flush()
+    queue_event(session, 'list.created', [new_list.id])
+    payload = dump(list_schema, new_list)
+    session.commit()
+    return payload, 201
+
+
+def update_list(session, list_id, body):
+    """PUT /api/lists/<id>"""
+    lst = session.get(TaskList, list_id)
+    if lst is None:
+        return NOT_FOUND
+    data = body if isinstance(body, dict) else {}
+    lst.name = data.get('name', lst.name)
+    lst.color = data.get('color', lst.color)
+    queue_event(session, 'list.updated', [lst.id])
+    session.flush()
+    payload = dump(list_schema, lst)
+    session.commit()
+    return payload, 200
+
+
+def delete_list(session, list_id):
+    """DELETE /api/lists/<id>"""
+    lst = session.get(TaskList, list_id)
+    if lst is None:
+        return NOT_FOUND
+
+    # Take the list's tasks out of the materialized stats with grouped counts;
+    # IS NOT keeps SQLite's planner on the list_id index rather than reading
+    # every completed task through the completed one
+    completed_day = func.date(Task.completed_at)
+    completions = session.query(completed_day, func.count(Task.id)).filter(
+        Task.list_id == list_id, Task.completed.isnot(False), Task.completed_at.isnot(None)
+    ).group_by(completed_day).all()
+    total, completed = session.query(
+        func.count(Task.id),
+        func.coalesce(func.sum(case((Task.completed == True, 1), else_=0)), 0)
+    ).filter(Task.list_id == list_id).one()
+
+    # Tasks and their tags go through ON DELETE CASCADE (passive_deletes), not row by row
+    session.delete(lst)
+    # One tombstone for the list stands for all of its tasks
+    record_deletions(session, 'list', [list_id])
+    queue_event(session, 'list.deleted', [list_id])
+    adjust_task_totals(session, total=-total, completed=-completed)
+    # SQLite returns DATE() as text
+    adjust_daily_completions_by_day(session, {
+        date.fromisoformat(day) if isinstance(day, str) else day: -count for day, count in completions
+    })
+    session.commit()
+    return {"message": "List deleted"}, 200
+
+
+# Stats
+
+def get_stats(session):
+    """GET /api/stats"""
+    stats = session.query(UserStats).first()
+    if not stats:
+        stats = get_or_create_stats(session)
+        session.commit()
+
+    # Calculate additional dynamic fields from the maintained aggregates
+    total_ever = stats.task_count
+    completed_ever = stats.completed_task_count
+
+    stats.tasks_completed_week = get_weekly_completed_count(session)
+    rate = (completed_ever / total_ever * 100) if total_ever > 0 else 0
+    stats.completion_rate = f"{round(rate, 1)}%"
+
+    return dump(stats_schema, stats), 200
+
+
+def reset_streak(session):
+    """POST /api/stats/reset-streak"""
+    stats = session.query(UserStats).first()
+    if stats:
+        stats.current_streak = 0
+        queue_event(session, 'stats.updated')
+        session.commit()
+    return {"message": "Streak reset successfully"}, 200
+
+
+# Health
+
+def check_health(session):
+    """GET /api/health"""
+    try:
+        session.execute(text('SELECT 1'))
+        return {"status": "healthy", "database": "connected"}, 200
+    except Exception as e:
+        return {"status": "unhealthy", "error": str(e)}, 500
@@ -0,0 +1,191 @@
+"""
+In-process pub/sub behind GET /api/events (asgi.py).
+
+Write routes queue compact events on their session with queue_event(); they
+are published when that session commits and dropped if it rolls back. An
+event names what changed, not its new state: clients refresh through
+/api/tasks/changes, /api/lists or /api/stats.
+
+    id: 3f9c2a-42
+    event: task.updated
+    data: {"ids": [7, 9]}
+
+The broker keeps the last EVENTS_REPLAY_SIZE events for Last-Event-ID
+resume, and each subscriber gets a bounded queue that drops its oldest
+events when the client reads too slowly. A subscriber that lost events to
+either limit receives a `resync` event. Subscribers are asyncio tasks, so
+idle connections cost a queue each and no thread. Publishing wakes each
+subscribed event loop once, whatever its number of subscribers.
+
+Events only reach subscribers in the process that made the write, so the
+stream is served only when the app runs in one process (asgi.py). Otherwise,
+and under the WSGI app, /api/events answers 501 and clients poll the changes
+feed (CHANGES_FALLBACK) instead.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+CHANGES_FALLBACK = '/api/tasks/changes'
+
+# Task writes and list deletes also move the list counts and the stats
+STATS_EVENTS = {'task.created', 'task.updated', 'task.deleted', 'list.deleted'}
+
+
+class Subscription:
+    def __init__(self, loop, queue_size):
+        self.loop = loop
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self.wake = asyncio.Event()
+
+    def push(self, item):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(item)
+        self.wake.set()
+
+    def drain(self):
+        items = list(self.queue)
+        self.queue.clear()
+        self.wake.clear()
+        return items
+
+
+class EventBroker:
+    """Fans committed events out to subscribers and keeps a replay buffer"""
+
+    def __init__(self, replay_size=1024):
+        self.enabled = False
+        # Event ids restart with the process; the epoch makes older ids detectable
+        self.epoch = os.urandom(3).hex()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._replay = deque(maxlen=replay_size)
+        self._subscribers = {}
+
+    def configure(self, replay_size, enabled=True):
+        with self._lock:
+            self._replay = deque(self._replay, maxlen=replay_size)
+            self.enabled = enabled
+
+    @property
+    def subscriber_count(self):
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def publish(self, events):
+        """Assigns ids to (type, data) pairs and hands them to every subscribed loop"""
+        with self._lock:
+            items = []
+            for event_type, data in events:
+                self._seq += 1
+                items.append((self._seq, f"{self.epoch}-{self._seq}", event_type, data))
+            self._replay.extend(items)
+            loops = list(self._subscribers)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._deliver, loop, items)
+            except RuntimeError:
+                # Loop already closed
+                pass
+
+    def _deliver(self, loop, items):
+        for subscription in self._subscribers.get(loop, ()):
+            for item in items:
+                subscription.push(item)
+
+    def subscribe(self, queue_size, last_event_id=None):
+        """Registers a subscriber on the running loop; returns (subscription, missed_events)"""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(loop, queue_size)
+        missed = False
+        with self._lock:
+            self._subscribers.setdefault(loop, set()).add(subscription)
+            if last_event_id:
+                epoch, _, seq = last_event_id.partition('-')
+                seq = int(seq) if seq.isdigit() else -1
+                oldest = self._replay[0][0] if self._replay else self._seq + 1
+                if epoch != self.epoch or seq < oldest - 1 or seq > self._seq:
+                    missed = True
+                else:
+                    for item in self._replay:
+                        if item[0] > seq:
+                            subscription.push(item)
+        return subscription, missed
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.loop)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.loop]
+
+
+broker = EventBroker()
+
+
+def worker_count():
+    """Server processes running the app: gunicorn's post_fork hook exports it, uvicorn reads it"""
+    return int(os.environ.get('WEB_CONCURRENCY') or 1)
+
+
+def unavailable_body(reason):
+    return {"error": f"Events are not available: {reason}", "fallback": CHANGES_FALLBACK}
+
+
+def queue_event(session, event_type, ids=()):
+    """Queues an event for publishing when session commits"""
+    if not broker.enabled:
+        return
+    pending = session.info.setdefault('pending_events', {})
+    pending.setdefault(event_type, {}).update(dict.fromkeys(ids))
+    if event_type in STATS_EVENTS:
+        pending.setdefault('stats.updated', {})
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _publish_pending(session):
+    # Also fired when a SAVEPOINT is released; only the real commit publishes
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop('pending_events', None)
+    if pending:
+        broker.publish([
+            (event_type, {"ids": list(ids)} if ids else {})
+            for event_type, ids in pending.items()
+        ])
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop('pending_events', None)
+
+
+def format_event(item):
+    _, event_id, event_type, data = item
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def event_stream(subscription, missed, heartbeat):
+    """SSE body for one subscriber: replayed and live events, heartbeats and resync notices"""
+    yield "retry: 3000\n\n"
+    if missed:
+        yield "event: resync\ndata: {}\n\n"
+    while True:
+        try:
+            await asyncio.wait_for(subscription.wake.wait(), heartbeat)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        items = subscription.drain()
+        if subscription.dropped:
+            yield f"event: resync\ndata: {json.dumps({'dropped': subscription.dropped})}\n\n"
+            subscription.dropped = 0
+        yield ''.join(format_event(item) for item in items)
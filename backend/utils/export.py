@@ -0,0 +1,64 @@
+import csv
+import io
+from collections import defaultdict
+from types import SimpleNamespace
+from sqlalchemy import select
+from extensions import db
+from models import Tag, task_tags
+from utils.serializers import dump, dumps
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "id", "title", "description", "completed", "priority", "due_date",
+    "list_id", "is_overdue", "created_at", "updated_at", "tags"
+]
+
+
+def iter_task_batches(statement, batch_size):
+    """
+    Streams task rows through a server-side cursor and yields them in batches
+    with their tags attached. The cursor runs on its own connection because
+    MySQL cannot issue the per-batch tag query on a connection that is still
+    reading an unbuffered result.
+    """
+    with db.engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+        for rows in result.partitions():
+            tags = defaultdict(list)
+            tag_rows = db.session.execute(
+                select(task_tags.c.task_id, Tag.id, Tag.name, Tag.color)
+                .join(Tag, Tag.id == task_tags.c.tag_id)
+                .where(task_tags.c.task_id.in_([row.id for row in rows]))
+            )
+            for tag in tag_rows:
+                tags[tag.task_id].append(tag)
+            yield [SimpleNamespace(**row._mapping, tags=tags[row.id]) for row in rows]
+
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode()
+
+
+def stream_export(statement, fmt, schema, batch_size):
+    """Generator of response chunks for GET /api/tasks/export, one chunk per batch"""
+    if fmt == "csv":
+        # Sent before the query runs so the client gets its first byte at once
+        yield _csv_line(CSV_COLUMNS)
+
+    for batch in iter_task_batches(statement, batch_size):
+        rows = dump(schema, batch)
+        if fmt == "ndjson":
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                row["tags"] = ";".join(tag["name"] for tag in row["tags"])
+                writer.writerow([row[column] for column in CSV_COLUMNS])
+            yield buffer.getvalue().encode()
@@ -0,0 +1,184 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from datetime import datetime
+import structlog
+from marshmallow import ValidationError
+from extensions import db
+from utils.events import queue_event
+from utils.bulk import existing_list_ids, resolve_tag_ids, insert_task_rows, apply_insert_counts
+
+logger = structlog.get_logger()
+
+IMPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Fields accepted from an import record; everything else (ids, timestamps,
+# is_overdue from an export) is dropped before validation
+IMPORT_FIELDS = ("title", "description", "completed", "priority", "due_date", "list_id", "tags")
+
+
+def detect_format(fmt, content_type):
+    if fmt:
+        return fmt if fmt in IMPORT_FORMATS else None
+    for name, mimetype in IMPORT_FORMATS.items():
+        if content_type and content_type.startswith(mimetype):
+            return name
+    return "ndjson"
+
+
+def iter_lines(stream, chunk_size=64 * 1024):
+    """Decodes a byte stream into lines (ending in newline) without reading it all"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            break
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if buffer:
+        yield buffer
+
+
+def read_ndjson(lines):
+    """Yields (line_number, record or None, error) for every non-blank line"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as e:
+            yield number, None, {"_line": [f"Invalid JSON: {e}"]}
+
+
+def read_csv(lines):
+    """Yields (line_number, record, None) per CSV row, mapping the export's columns back"""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        record = {key: value for key, value in row.items() if key and value != ''}
+        if 'tags' in record:
+            record['tags'] = [{"name": name} for name in record['tags'].split(';') if name]
+        if 'completed' in record:
+            record['completed'] = record['completed'].strip().lower() in ('1', 'true', 'yes')
+        yield reader.line_num, record, None
+
+
+def _normalize(record):
+    if not isinstance(record, dict):
+        return record
+    normalized = {key: record[key] for key in IMPORT_FIELDS if key in record}
+    if isinstance(normalized.get('tags'), list):
+        normalized['tags'] = [
+            {key: tag[key] for key in ('name', 'color') if key in tag} if isinstance(tag, dict) else tag
+            for tag in normalized['tags']
+        ]
+    return normalized
+
+
+class TaskImporter:
+    """
+    Validates a stream of task records and inserts them in committed chunks.
+    Memory use is bounded by the chunk size, the number of distinct tags and
+    lists, and max_errors.
+    """
+
+    def __init__(self, schema, chunk_size=1000, max_errors=1000):
+        self.schema = schema
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.started_at = datetime.utcnow()
+        self.tag_ids = {}
+        self.known_lists = set()
+        self.missing_lists = set()
+        self.lines = 0
+        self.imported = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+
+    def run(self, records):
+        pending = []
+        try:
+            for line, record, error in records:
+                self.lines += 1
+                if error is None:
+                    try:
+                        record = self.schema.load(_normalize(record))
+                    except ValidationError as e:
+                        error = e.messages
+                if error is None:
+                    pending.append((line, record))
+                    if len(pending) >= self.chunk_size:
+                        self._commit_chunk(pending)
+                        pending = []
+                else:
+                    self._record_error(line, error)
+            if pending:
+                self._commit_chunk(pending)
+        except Exception:
+            db.session.rollback()
+            raise
+        return self.summary()
+
+    def _commit_chunk(self, pending):
+        unknown = {record['list_id'] for _, record in pending} - self.known_lists - self.missing_lists
+        if unknown:
+            found = existing_list_ids(db.session, unknown)
+            self.known_lists |= found
+            self.missing_lists |= unknown - found
+
+        valid = []
+        for line, record in pending:
+            if record['list_id'] in self.known_lists:
+                valid.append(record)
+            else:
+                self._record_error(line, {"list_id": ["List not found."]})
+
+        new_tags = [tag for record in valid for tag in record.get('tags') or [] if tag['name'] not in self.tag_ids]
+        if new_tags:
+            self.tag_ids.update(resolve_tag_ids(db.session, new_tags))
+
+        if valid:
+            ids = insert_task_rows(db.session, valid, self.tag_ids, self.started_at)
+            # The counters move with the rows, so a failed chunk leaves both untouched
+            apply_insert_counts(
+                db.session,
+                Counter(record['list_id'] for record in valid),
+                sum(1 for record in valid if record.get('completed')),
+                self.started_at
+            )
+            queue_event(db.session, 'task.created', ids)
+            db.session.commit()
+            self.imported += len(ids)
+        self.chunks += 1
+        logger.info("task_import_progress", chunk=self.chunks, lines=self.lines,
+                    imported=self.imported, failed=self.failed)
+
+    def _record_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def summary(self):
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+def import_tasks(stream, fmt, schema, chunk_size, max_errors):
+    """Parses stream incrementally as fmt and imports it; returns the summary"""
+    lines = iter_lines(stream)
+    records = read_csv(lines) if fmt == "csv" else read_ndjson(lines)
+    return TaskImporter(schema, chunk_size=chunk_size, max_errors=max_errors).run(records)
@@ -0,0 +1,239 @@
+"""
+Per-request SQL and timing instrumentation.
+
+Every request gets its statement count in X-Query-Count. A sampled fraction
+(INSTRUMENTATION_SAMPLE_RATE) is also timed: total DB time, the slowest
+statement, serialization time and total time go out as a Server-Timing header
+and a structured log line, and feed the histograms served by /api/metrics.
+Metrics are per process, like the response cache.
+"""
+import random
+import threading
+import time
+import structlog
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = structlog.get_logger()
+
+# Seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+SLOW_STATEMENT_CHARS = 200
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(c), n, s)) for key, (c, n, s) in self._series.items())
+        for label_values, (counts, count, total) in series:
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _format_labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """The metric families recorded for instrumented requests"""
+
+    def __init__(self):
+        labels = ('method', 'endpoint')
+        self.requests = Counter(
+            'taskflow_http_requests_total', 'Requests handled, sampled or not.', labels + ('status',))
+        self.duration = Histogram(
+            'taskflow_http_request_duration_seconds', 'Time to build the response (sampled).',
+            labels, LATENCY_BUCKETS)
+        self.db_time = Histogram(
+            'taskflow_db_time_seconds', 'Time spent executing SQL per request (sampled).',
+            labels, LATENCY_BUCKETS)
+        self.queries = Histogram(
+            'taskflow_db_queries_per_request', 'SQL statements per request (sampled).',
+            labels, QUERY_BUCKETS)
+        self.serialization = Histogram(
+            'taskflow_serialization_seconds', 'Time spent serializing response payloads (sampled).',
+            labels, LATENCY_BUCKETS)
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.duration, self.db_time, self.queries, self.serialization):
+            lines.extend(metric.render())
+        return lines
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+        if g.get('instrumented'):
+            context._instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_instrumentation_start', None)
+    if start is None or not has_request_context():
+        return
+    elapsed = time.perf_counter() - start
+    g.db_time += elapsed
+    if elapsed > g.slowest_query[0]:
+        g.slowest_query = (elapsed, statement)
+
+
+def record_serialization(seconds):
+    """Adds to the current request's serialization time when it is being sampled"""
+    if has_request_context() and g.get('instrumented'):
+        g.serialize_time += seconds
+
+
+def record_request(app, method, endpoint, status, seconds):
+    """Counts a request served outside Flask (the ASGI handlers) in app's metrics"""
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return
+    metrics = app.extensions['request_metrics']
+    metrics.requests.inc((method, endpoint, status))
+    sample_rate = app.config.get('INSTRUMENTATION_SAMPLE_RATE', 1.0)
+    if sample_rate >= 1 or random.random() < sample_rate:
+        metrics.duration.observe((method, endpoint), seconds)
+
+
+def _server_timing(db_time, query_count, serialize_time, total):
+    return (
+        f'db;dur={db_time * 1000:.2f};desc="{query_count} queries", '
+        f'serialize;dur={serialize_time * 1000:.2f}, '
+        f'total;dur={total * 1000:.2f}'
+    )
+
+
+def render_metrics(app):
+    """The Prometheus text exposition for /api/metrics"""
+    lines = app.extensions['request_metrics'].render()
+    cache = app.extensions.get('response_cache')
+    if cache is not None:
+        stats = cache.stats()
+        for name in ('hits', 'misses', 'not_modified', 'evictions', 'expired'):
+            metric = f'taskflow_response_cache_{name}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {stats[name]}']
+        for name in ('entries', 'bytes'):
+            metric = f'taskflow_response_cache_{name}'
+            lines += [f'# TYPE {metric} gauge', f'{metric} {stats[name]}']
+    return '\n'.join(lines) + '\n'
+
+
+def init_instrumentation(app):
+    """Hooks engine events and request callbacks; always reports X-Query-Count"""
+    for name, listener in (
+        ('before_cursor_execute', _before_cursor_execute),
+        ('after_cursor_execute', _after_cursor_execute),
+    ):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+    metrics = app.extensions['request_metrics'] = RequestMetrics()
+    enabled = app.config.get('INSTRUMENTATION_ENABLED', True)
+    sample_rate = app.config.get('INSTRUMENTATION_SAMPLE_RATE', 1.0)
+
+    @app.before_request
+    def start_instrumentation():
+        if enabled and (sample_rate >= 1 or random.random() < sample_rate):
+            g.instrumented = True
+            g.request_start = time.perf_counter()
+            g.db_time = 0.0
+            g.serialize_time = 0.0
+            g.slowest_query = (0.0, None)
+
+    @app.after_request
+    def finish_instrumentation(response):
+        query_count = g.get('query_count', 0)
+        response.headers['X-Query-Count'] = str(query_count)
+        if not enabled:
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        metrics.requests.inc((request.method, endpoint, response.status_code))
+        if not g.get('instrumented'):
+            return response
+
+        # Streamed bodies are produced after this hook, so their time is not included
+        total = time.perf_counter() - g.request_start
+        labels = (request.method, endpoint)
+        metrics.duration.observe(labels, total)
+        metrics.db_time.observe(labels, g.db_time)
+        metrics.queries.observe(labels, query_count)
+        metrics.serialization.observe(labels, g.serialize_time)
+        response.headers['Server-Timing'] = _server_timing(g.db_time, query_count, g.serialize_time, total)
+
+        slowest_time, slowest_statement = g.slowest_query
+        logger.info(
+            "request_timing",
+            method=request.method,
+            path=request.path,
+            endpoint=endpoint,
+            status=response.status_code,
+            duration_ms=round(total * 1000, 2),
+            db_ms=round(g.db_time * 1000, 2),
+            queries=query_count,
+            slowest_query_ms=round(slowest_time * 1000, 2),
+            slowest_query=' '.join(slowest_statement.split())[:SLOW_STATEMENT_CHARS] if slowest_statement else None,
+            serialize_ms=round(g.serialize_time * 1000, 2),
+        )
+        return response
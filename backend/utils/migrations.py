@@ -0,0 +1,89 @@
+"""
+Helpers for the Alembic revisions in migrations/versions.
+
+Databases set up with create_all before the project shipped migrations may
+already have part of what a revision adds: `flask init-db` stamps them at
+the baseline revision (commands.py) and the revisions after it check the
+live schema, adding only what is missing.
+
+On SQLite, batch_alter_table copies a table into a new one. Reflection there
+loses column collations and the table's triggers, so revisions that batch
+tags or tasks restore them (see restore_fts_triggers).
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# Reflected SQLite foreign keys have no name; batch mode names them by this
+# convention so a revision can drop one
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+FTS_TRIGGERS = ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au')
+
+
+def dialect_name():
+    return op.get_bind().dialect.name
+
+
+def has_table(table):
+    return inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table, column):
+    return any(c['name'] == column for c in inspect(op.get_bind()).get_columns(table))
+
+
+def has_index(table, name):
+    return any(ix['name'] == name for ix in inspect(op.get_bind()).get_indexes(table))
+
+
+def has_unique_constraint(table, name):
+    return any(uq['name'] == name for uq in inspect(op.get_bind()).get_unique_constraints(table))
+
+
+def foreign_key(table, column):
+    """The reflected foreign key on table.column, None if it has none"""
+    for fk in inspect(op.get_bind()).get_foreign_keys(table):
+        if fk['constrained_columns'] == [column]:
+            return fk
+    return None
+
+
+def foreign_key_name(table, column, referent):
+    return NAMING_CONVENTION['fk'] % {
+        "table_name": table, "column_0_name": column, "referred_table_name": referent
+    }
+
+
+def create_index(name, table, columns, **kw):
+    if not has_index(table, name):
+        op.create_index(name, table, columns, **kw)
+
+
+def set_foreign_key_ondelete(table, column, referent, ondelete):
+    """
+    Recreates table.column's foreign key to referent.id with ON DELETE
+    ondelete, unless it already has it. Returns whether the table changed.
+    """
+    fk = foreign_key(table, column)
+    if fk is not None and (fk['options'].get('ondelete') or '').upper() == ondelete:
+        return False
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        if fk is not None:
+            batch_op.drop_constraint(fk['name'] or foreign_key_name(table, column, referent), type_='foreignkey')
+        batch_op.create_foreign_key(
+            foreign_key_name(table, column, referent), referent, [column], ['id'], ondelete=ondelete
+        )
+    return True
+
+
+def restore_fts_triggers():
+    """Recreates the tasks_fts triggers after a batch operation rebuilt tasks on SQLite"""
+    from models import SQLITE_FTS_DDL
+
+    if dialect_name() != 'sqlite' or not has_table('tasks_fts'):
+        return
+    for trigger in FTS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    # SQLITE_FTS_DDL[0] creates the table, the rest are the triggers
+    for statement in SQLITE_FTS_DDL[1:]:
+        op.execute(statement)
@@ -0,0 +1,80 @@
+"""
+Chunked purge of old completed tasks for `flask purge-completed`.
+
+Each chunk takes the oldest completed tasks past the cutoff (by
+completed_at, from its index), optionally copies them with their tag names
+into archived_tasks, deletes them with one set-based DELETE (task_tags rows
+go with them through ON DELETE CASCADE) and commits. The list counts,
+stats totals and daily completion rollup are adjusted from grouped counts,
+and each task leaves a tombstone for GET /api/tasks/changes. Short
+transactions keep locks brief; an interrupted run resumes where it stopped.
+"""
+import time
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select, insert, delete
+from extensions import db
+from models import Task, Tag, ArchivedTask, task_tags
+from utils.stats_calculator import adjust_list_counts, adjust_task_totals, adjust_daily_completions_by_day
+from utils.changes import record_deletions
+from utils.events import queue_event
+
+ARCHIVED_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.priority, Task.due_date, Task.list_id,
+    Task.created_at, Task.updated_at, Task.completed_at,
+)
+
+
+def _archive(session, rows, now):
+    ids = [row.id for row in rows]
+    tag_names = {}
+    for task_id, name in session.execute(
+        select(task_tags.c.task_id, Tag.name)
+        .join(Tag, Tag.id == task_tags.c.tag_id)
+        .where(task_tags.c.task_id.in_(ids))
+    ):
+        tag_names.setdefault(task_id, []).append(name)
+    session.execute(insert(ArchivedTask), [
+        {**row._asdict(), "tag_names": sorted(tag_names.get(row.id, [])), "archived_at": now}
+        for row in rows
+    ])
+
+
+def purge_chunk(session, cutoff, chunk_size, archive=False):
+    """Purges up to chunk_size completed tasks finished before cutoff; returns how many"""
+    rows = session.execute(
+        select(*ARCHIVED_COLUMNS)
+        .where(Task.completed == True, Task.completed_at < cutoff)
+        .order_by(Task.completed_at, Task.id)
+        .limit(chunk_size)
+    ).all()
+    if not rows:
+        return 0
+
+    now = datetime.utcnow()
+    ids = [row.id for row in rows]
+    if archive:
+        _archive(session, rows, now)
+    session.execute(delete(Task).where(Task.id.in_(ids)), execution_options={"synchronize_session": False})
+
+    adjust_list_counts(session, {list_id: -count for list_id, count in Counter(row.list_id for row in rows).items()})
+    adjust_task_totals(session, total=-len(rows), completed=-len(rows))
+    adjust_daily_completions_by_day(session, {
+        day: -count for day, count in Counter(row.completed_at.date() for row in rows).items()
+    })
+    record_deletions(session, 'task', ids, now)
+    queue_event(session, 'task.deleted', ids)
+    session.commit()
+    return len(rows)
+
+
+def purge_completed(cutoff, chunk_size=1000, archive=False, pause=0.0):
+    """Runs purge_chunk until nothing is left; yields the size of each chunk"""
+    while True:
+        purged = purge_chunk(db.session, cutoff, chunk_size, archive)
+        if purged:
+            yield purged
+        if purged < chunk_size:
+            return
+        if pause:
+            time.sleep(pause)
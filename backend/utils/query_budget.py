@@ -0,0 +1,250 @@
+"""
+SQL budgets declared next to the routes and enforced by
+tests/test_query_budgets.py.
+
+    @tasks_bp.route('', methods=['GET'])
+    @query_budget(statements=4, indexed=('tasks',), cases=[{}, {"list_id": 1}])
+    @cached_response('tasks')
+    def get_tasks(): ...
+
+A budget caps the statements one request runs and the rows they scan, and
+names tables that every statement must reach through an index. Each case
+holds the url_for values of one request (path variables and query string);
+json, or data with its content_type, is the request body. Both refer to the
+test seed data (lists 1-5, tags bench-tag-N, task ids from 1, template 1).
+The decorator only tags the view, so it costs nothing at request time: it
+goes right under @route, which registers it. Stacked decorators give one
+route several budgets, each with its own cases.
+
+The test records each case's statements and runs EXPLAIN QUERY PLAN (SQLite)
+or EXPLAIN (MySQL) on those that read a table. Rows scanned is an estimate
+added up over the plan steps, like the rows column of MySQL's EXPLAIN: on
+SQLite a SCAN reads the whole table and a SEARCH the average number of rows
+per value of its equality constraints (the whole table for a range alone),
+both computed from the data, so no ANALYZE is needed; the outer loop of a
+statement whose LIMIT needs no sort stops after LIMIT + OFFSET rows.
+"""
+import contextlib
+import re
+from collections import Counter, namedtuple
+from flask import url_for
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+Statement = namedtuple('Statement', 'sql parameters executemany')
+PlanStep = namedtuple('PlanStep', 'table full_scan indexed rows detail')
+
+EXPLAINED_STATEMENTS = re.compile(r'^\s*(SELECT|WITH|UPDATE|DELETE)\b', re.IGNORECASE)
+# SQLite: "SCAN tasks", "SCAN tasks_1 USING COVERING INDEX ix",
+# "SEARCH tasks USING INDEX ix (list_id=? AND created_at<?)"
+SQLITE_STEP = re.compile(r'^(SCAN|SEARCH) (\w+)(?: USING (.+?))?(?: \((.+)\))?$')
+SQLITE_EQUALITY = re.compile(r'^(\w+)=\?$')
+# The LIMIT of the outermost query ends the statement
+OUTER_LIMIT = re.compile(r'\bLIMIT (\?|\d+)(?: OFFSET (\?|\d+))?\s*$', re.IGNORECASE)
+# SQLAlchemy names aliased tables <table>_<n>
+ALIAS = re.compile(r'^(\w+?)_\d+$')
+
+STATEMENT_CHARS = 300
+
+
+class QueryBudget:
+    def __init__(self, statements=None, rows_scanned=None, indexed=(), cases=None, json=None,
+                 data=None, content_type=None):
+        self.statements = statements
+        self.rows_scanned = rows_scanned
+        self.indexed = frozenset(indexed)
+        self.cases = cases or [{}]
+        self.json = json
+        self.data = data
+        self.content_type = content_type
+
+
+def query_budget(statements=None, rows_scanned=None, indexed=(), cases=None, json=None,
+                 data=None, content_type=None):
+    """Declares an SQL budget of the route it decorates"""
+    budget = QueryBudget(statements, rows_scanned, indexed, cases, json, data, content_type)
+
+    def decorator(view):
+        # Decorators apply bottom-up: keep the budgets in source order
+        view.query_budgets = [budget] + getattr(view, 'query_budgets', [])
+        return view
+    return decorator
+
+
+@contextlib.contextmanager
+def recording_statements():
+    """Collects every statement executed on any engine while active"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(Statement(statement, parameters, executemany))
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+
+
+def _table_name(name, tables):
+    if name in tables:
+        return name
+    match = ALIAS.match(name)
+    if match and match.group(1) in tables:
+        return match.group(1)
+    return None
+
+
+def _outer_limit(sql, parameters):
+    """LIMIT + OFFSET of the outermost query, None without one"""
+    match = OUTER_LIMIT.search(sql)
+    if match is None or not isinstance(parameters, (list, tuple)):
+        return None
+    position = sql[:match.start()].count('?')
+    rows = 0
+    for token in match.groups():
+        if token == '?':
+            rows += int(parameters[position])
+            position += 1
+        elif token is not None:
+            rows += int(token)
+    return rows
+
+
+class SqliteRowEstimates:
+    """Table sizes and rows per key, computed once per check"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cache = {}
+
+    def _scalar(self, sql):
+        if sql not in self.cache:
+            self.cache[sql] = self.connection.exec_driver_sql(sql).scalar() or 0
+        return self.cache[sql]
+
+    def rows(self, table, constraints):
+        equal = []
+        for term in (constraints or '').split(' AND '):
+            match = SQLITE_EQUALITY.match(term)
+            if match:
+                equal.append(match.group(1))
+        if 'rowid' in equal:
+            return 1
+        total = self._scalar(f'SELECT COUNT(*) FROM "{table}"')
+        if not equal:
+            return total
+        columns = ', '.join(f'"{column}"' for column in equal)
+        keys = self._scalar(f'SELECT COUNT(*) FROM (SELECT DISTINCT {columns} FROM "{table}")')
+        return -(-total // keys) if keys else 0
+
+
+def _explain_sqlite(connection, statement, parameters, tables, estimates):
+    plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement.sql, parameters).all()
+    outer = [row for row in plan if row[1] == 0]
+    limit = None
+    if not any(row[-1].startswith('USE TEMP B-TREE') for row in outer):
+        limit = _outer_limit(statement.sql, parameters)
+    outer_loop = next((row[0] for row in outer if SQLITE_STEP.match(row[-1])), None)
+
+    steps = []
+    for row in plan:
+        detail = row[-1]
+        match = SQLITE_STEP.match(detail)
+        table = match and _table_name(match.group(2), tables)
+        if table is None:
+            continue
+        full_scan = match.group(1) == 'SCAN' and match.group(3) is None
+        rows = estimates.rows(table, match.group(4) if match.group(1) == 'SEARCH' else None)
+        if limit is not None and row[0] == outer_loop:
+            rows = min(rows, limit)
+        steps.append(PlanStep(table, full_scan, not full_scan, rows, f"{detail} (~{rows} rows)"))
+    return steps
+
+
+def explain(connection, statement, tables, estimates=None):
+    """The plan steps of a statement that touch one of tables"""
+    parameters = statement.parameters[0] if statement.executemany else statement.parameters
+    if connection.dialect.name == 'sqlite':
+        return _explain_sqlite(connection, statement, parameters, tables,
+                               estimates or SqliteRowEstimates(connection))
+    steps = []
+    for row in connection.exec_driver_sql('EXPLAIN ' + statement.sql, parameters).mappings():
+        table = row['table'] and _table_name(row['table'], tables)
+        if table is None:
+            continue
+        detail = f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}"
+        steps.append(PlanStep(table, row['type'] == 'ALL', row['key'] is not None, row['rows'] or 0, detail))
+    return steps
+
+
+def _shorten(sql):
+    sql = ' '.join(sql.split())
+    return sql if len(sql) <= STATEMENT_CHARS else sql[:STATEMENT_CHARS] + '...'
+
+
+def check_statements(budget, statements, connection, tables):
+    """Problems with one request's statements, each as a list of report lines"""
+    problems = []
+    if budget.statements is not None and len(statements) > budget.statements:
+        lines = [f"{len(statements)} statements, budget {budget.statements}:"]
+        for sql, count in Counter(statement.sql for statement in statements).items():
+            lines.append(f"  {count}x {_shorten(sql)}")
+        problems.append(lines)
+
+    estimates = SqliteRowEstimates(connection) if connection.dialect.name == 'sqlite' else None
+    rows_scanned = 0
+    scans = []
+    for statement in statements:
+        if not EXPLAINED_STATEMENTS.match(statement.sql):
+            continue
+        steps = explain(connection, statement, tables, estimates)
+        rows_scanned += sum(step.rows for step in steps)
+        scans.append((statement, steps))
+        unindexed = [step for step in steps if step.table in budget.indexed and not step.indexed]
+        if unindexed:
+            problems.append(
+                [f"{', '.join(sorted({step.table for step in unindexed}))} read without an index:",
+                 f"  {_shorten(statement.sql)}"]
+                + [f"    {step.detail}" for step in unindexed]
+            )
+    if budget.rows_scanned is not None and rows_scanned > budget.rows_scanned:
+        lines = [f"~{rows_scanned} rows scanned, budget {budget.rows_scanned}:"]
+        for statement, steps in scans:
+            if steps:
+                lines.append(f"  {_shorten(statement.sql)}")
+                lines.extend(f"    {step.detail}" for step in steps)
+        problems.append(lines)
+    return problems
+
+
+def budgeted_cases(app):
+    """(endpoint, method, budget, case) for every budgeted request, reads before writes"""
+    found = []
+    for rule in app.url_map.iter_rules():
+        budgets = getattr(app.view_functions[rule.endpoint], 'query_budgets', ())
+        method = sorted(rule.methods - {'HEAD', 'OPTIONS'})[0]
+        found.extend((rule.endpoint, method, budget, case) for budget in budgets for case in budget.cases)
+    return sorted(found, key=lambda item: item[1] != 'GET')
+
+
+def check_case(app, client, endpoint, method, budget, case, tables):
+    """Calls one budgeted request through client; returns (url, problems)"""
+    from extensions import db
+
+    with app.test_request_context():
+        url = url_for(endpoint, **case)
+    body = {"json": budget.json} if budget.json is not None else {
+        "data": budget.data, "content_type": budget.content_type
+    }
+    if method == 'GET':
+        # Measure with the per-process caches (tag ids, compiled serializers) warm
+        client.get(url).get_data()
+    with recording_statements() as statements:
+        response = client.open(url, method=method, **body)
+        # Streamed bodies run their queries while they are read
+        response.get_data()
+    if response.status_code >= 400:
+        return url, [[f"answered {response.status_code}, expected success: {response.get_data(as_text=True)[:200]}"]]
+    with app.app_context(), db.engine.connect() as connection:
+        return url, check_statements(budget, statements, connection, tables)
@@ -0,0 +1,291 @@
+"""
+Host-local rate limit storage for Flask-Limiter, shared by every gunicorn
+worker on the machine through an mmap'd file.
+
+    RATELIMIT_STORAGE_URI = "mmap:///dev/shm/taskflow-ratelimit?slots=16384"
+
+create_app() puts the file of a bare "mmap://" in the app's instance folder
+(with_default_path), so each app has its own. The file is opened with
+O_NOFOLLOW and created readable by its owner only.
+
+The file is a fixed hash table of 64-byte slots, so memory per key is
+constant and the total is bounded no matter how many clients there are.
+Slots are grouped in buckets of BUCKET_SLOTS; a key lives in the bucket its
+hash selects and each operation locks only that bucket, with a thread lock
+inside the process and an fcntl byte-range lock across processes. A new key
+takes a free or expired slot of its bucket; when there is none it evicts the
+least recently used key of the bucket, which starts counting again from zero
+when it comes back. Size the table (?slots=) at several times the number of
+keys live at once (clients x limits) to keep evictions rare. Idle keys are
+swept every sweep_interval seconds.
+
+Fixed-window strategies use incr/get/get_expiry. The moving-window strategy
+is served by a sliding-window counter: the current and previous window
+counts, with the previous one weighted by how much of it still overlaps.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from limits.storage import MovingWindowSupport, Storage
+
+MAGIC = b'TFRL0001'
+HEADER = struct.Struct('<8sII')
+HEADER_SIZE = 64
+# digest, expires_at, window_start, last_access, current, previous
+SLOT = struct.Struct('<16sdddqq8x')
+SLOT_SIZE = SLOT.size
+BUCKET_SLOTS = 8
+BUCKET_SIZE = SLOT_SIZE * BUCKET_SLOTS
+EMPTY = bytes(16)
+ZERO_SLOT = bytes(SLOT_SIZE)
+DEFAULT_FILE = 'ratelimit.mmap'
+
+
+def with_default_path(uri, directory):
+    """uri, with its table file in directory when it names none"""
+    parsed = urlparse(uri)
+    if parsed.scheme != 'mmap' or parsed.path:
+        return uri
+    os.makedirs(directory, exist_ok=True)
+    return f"mmap://{os.path.join(os.path.abspath(directory), DEFAULT_FILE)}" + (f"?{parsed.query}" if parsed.query else '')
+
+
+class MmapStorage(Storage, MovingWindowSupport):
+    """Rate limit counters in a shared, fixed-size mmap hash table"""
+
+    STORAGE_SCHEME = ["mmap"]
+
+    def __init__(self, uri=None, slots=16384, sweep_interval=60, **options):
+        parsed = urlparse(uri or 'mmap://')
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        if not parsed.path:
+            raise ValueError("mmap:// storage needs a file path, e.g. mmap:///var/run/taskflow/ratelimit.mmap")
+        self.path = parsed.path
+        requested = max(BUCKET_SLOTS, int(query.get('slots', slots)))
+        self.sweep_interval = float(query.get('sweep_interval', sweep_interval))
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        self.buckets = self._open_table(-(-requested // BUCKET_SLOTS))
+        self.slots = self.buckets * BUCKET_SLOTS
+        self._mm = mmap.mmap(self._fd, HEADER_SIZE + self.buckets * BUCKET_SIZE)
+        self._locks = [threading.Lock() for _ in range(self.buckets)]
+        self._next_sweep = time.time() + self.sweep_interval
+        # Keys evicted by this process to make room for new ones
+        self.evictions = 0
+        super().__init__(uri, **options)
+
+    def _open_table(self, buckets):
+        """Initialises the file once; later processes adopt its existing size"""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+        try:
+            header = os.pread(self._fd, HEADER.size, 0)
+            if len(header) == HEADER.size:
+                magic, existing, bucket_slots = HEADER.unpack(header)
+                if magic == MAGIC and bucket_slots == BUCKET_SLOTS:
+                    return existing
+            os.ftruncate(self._fd, HEADER_SIZE + buckets * BUCKET_SIZE)
+            os.pwrite(self._fd, HEADER.pack(MAGIC, buckets, BUCKET_SLOTS), 0)
+            return buckets
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    # Bucket locking
+
+    def _bucket(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return digest, int.from_bytes(digest[:8], 'little') % self.buckets
+
+    def _acquire(self, bucket):
+        self._locks[bucket].acquire()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, BUCKET_SIZE, HEADER_SIZE + bucket * BUCKET_SIZE)
+
+    def _release(self, bucket):
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, BUCKET_SIZE, HEADER_SIZE + bucket * BUCKET_SIZE)
+        self._locks[bucket].release()
+
+    def _find(self, bucket, digest, now, create):
+        """
+        Offset of the key's slot in a locked bucket, None when it has none.
+        With create set a new key claims a free or expired slot, or else the
+        least recently used one.
+        """
+        mm = self._mm
+        start = HEADER_SIZE + bucket * BUCKET_SIZE
+        free = None
+        oldest, oldest_access = None, None
+        for offset in range(start, start + BUCKET_SIZE, SLOT_SIZE):
+            slot_digest = mm[offset:offset + 16]
+            if slot_digest == digest:
+                return offset
+            if not create or free is not None:
+                continue
+            if slot_digest == EMPTY:
+                free = offset
+                continue
+            _, expires_at, _, last_access, _, _ = SLOT.unpack_from(mm, offset)
+            if expires_at <= now:
+                free = offset
+            elif oldest is None or last_access < oldest_access:
+                oldest, oldest_access = offset, last_access
+        if not create:
+            return None
+        if free is None:
+            free = oldest
+            self.evictions += 1
+        SLOT.pack_into(mm, free, digest, 0.0, 0.0, now, 0, 0)
+        return free
+
+    def _maybe_sweep(self, now):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        self.sweep(now)
+
+    def sweep(self, now=None):
+        """Frees the slots of keys whose windows have all expired; returns how many"""
+        now = now or time.time()
+        mm = self._mm
+        freed = 0
+        for bucket in range(self.buckets):
+            self._acquire(bucket)
+            try:
+                start = HEADER_SIZE + bucket * BUCKET_SIZE
+                for offset in range(start, start + BUCKET_SIZE, SLOT_SIZE):
+                    if mm[offset:offset + 16] != EMPTY and SLOT.unpack_from(mm, offset)[1] <= now:
+                        mm[offset:offset + SLOT_SIZE] = ZERO_SLOT
+                        freed += 1
+            finally:
+                self._release(bucket)
+        return freed
+
+    # Fixed window
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        self._maybe_sweep(now)
+        digest, bucket = self._bucket(key)
+        self._acquire(bucket)
+        try:
+            offset = self._find(bucket, digest, now, create=True)
+            _, expires_at, window_start, _, current, previous = SLOT.unpack_from(self._mm, offset)
+            if expires_at <= now:
+                current = 0
+                expires_at = now + expiry
+            current += amount
+            if elastic_expiry:
+                expires_at = now + expiry
+            SLOT.pack_into(self._mm, offset, digest, expires_at, window_start, now, current, previous)
+            return current
+        finally:
+            self._release(bucket)
+
+    def get(self, key):
+        now = time.time()
+        digest, bucket = self._bucket(key)
+        self._acquire(bucket)
+        try:
+            offset = self._find(bucket, digest, now, create=False)
+            if offset is None:
+                return 0
+            _, expires_at, _, _, current, _ = SLOT.unpack_from(self._mm, offset)
+            return current if expires_at > now else 0
+        finally:
+            self._release(bucket)
+
+    def get_expiry(self, key):
+        now = time.time()
+        digest, bucket = self._bucket(key)
+        self._acquire(bucket)
+        try:
+            offset = self._find(bucket, digest, now, create=False)
+            expires_at = SLOT.unpack_from(self._mm, offset)[1] if offset is not None else 0.0
+            return int(expires_at if expires_at > now else now)
+        finally:
+            self._release(bucket)
+
+    # Sliding window counter (moving-window strategy)
+
+    @staticmethod
+    def _roll(now, expiry, window_start, current, previous):
+        """Advances the counts to the fixed window containing now"""
+        window = now - now % expiry
+        if window != window_start:
+            previous = current if window - window_start == expiry else 0
+            current = 0
+        return window, current, previous
+
+    @staticmethod
+    def _weighted(now, expiry, window, current, previous):
+        return previous * (1 - (now - window) / expiry) + current
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        self._maybe_sweep(now)
+        digest, bucket = self._bucket(key)
+        self._acquire(bucket)
+        try:
+            offset = self._find(bucket, digest, now, create=True)
+            _, _, window_start, _, current, previous = SLOT.unpack_from(self._mm, offset)
+            window, current, previous = self._roll(now, expiry, window_start, current, previous)
+            allowed = self._weighted(now, expiry, window, current, previous) + amount <= limit
+            if allowed:
+                current += amount
+            # Both windows matter until the end of the next one
+            SLOT.pack_into(self._mm, offset, digest, window + 2 * expiry, window, now, current, previous)
+            return allowed
+        finally:
+            self._release(bucket)
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        digest, bucket = self._bucket(key)
+        self._acquire(bucket)
+        try:
+            offset = self._find(bucket, digest, now, create=False)
+            if offset is None:
+                return int(now), 0
+            _, _, window_start, _, current, previous = SLOT.unpack_from(self._mm, offset)
+        finally:
+            self._release(bucket)
+        window, current, previous = self._roll(now, expiry, window_start, current, previous)
+        return int(window), int(self._weighted(now, expiry, window, current, previous))
+
+    # Maintenance
+
+    def check(self):
+        return not self._mm.closed
+
+    def reset(self):
+        cleared = 0
+        for bucket in range(self.buckets):
+            self._acquire(bucket)
+            try:
+                start = HEADER_SIZE + bucket * BUCKET_SIZE
+                for offset in range(start, start + BUCKET_SIZE, SLOT_SIZE):
+                    if self._mm[offset:offset + 16] != EMPTY:
+                        self._mm[offset:offset + SLOT_SIZE] = ZERO_SLOT
+                        cleared += 1
+            finally:
+                self._release(bucket)
+        return cleared
+
+    def clear(self, key):
+        digest, bucket = self._bucket(key)
+        self._acquire(bucket)
+        try:
+            offset = self._find(bucket, digest, time.time(), create=False)
+            if offset is not None:
+                self._mm[offset:offset + SLOT_SIZE] = ZERO_SLOT
+        finally:
+            self._release(bucket)
@@ -0,0 +1,101 @@
+import re
+from flask import current_app
+from sqlalchemy import or_, text, inspect, Integer, Float
+from sqlalchemy.dialects.mysql import match
+from extensions import db
+from models import Task, MYSQL_FULLTEXT_DDL, SQLITE_FTS_DDL, fts5_available
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(term):
+    return TOKEN_RE.findall(term or '')
+
+
+class LikeSearch:
+    """Substring match with LIKE '%term%'; scans the table, kept as the portable fallback"""
+    name = 'like'
+
+    def apply(self, query, term, rank=False):
+        return query.filter(or_(Task.title.contains(term), Task.description.contains(term)))
+
+
+class MySQLFulltextSearch:
+    """MATCH ... AGAINST in boolean mode over the ix_tasks_fulltext index"""
+    name = 'fulltext'
+
+    def apply(self, query, term, rank=False):
+        tokens = tokenize(term)
+        if not tokens:
+            return LikeSearch().apply(query, term)
+        expr = match(Task.title, Task.description, against=' '.join(f'+{t}*' for t in tokens)).in_boolean_mode()
+        query = query.filter(expr)
+        if rank:
+            query = query.order_by(expr.desc())
+        return query
+
+
+class SQLiteFTS5Search:
+    """FTS5 MATCH against the tasks_fts table, ranked by bm25()"""
+    name = 'fts5'
+
+    def apply(self, query, term, rank=False):
+        tokens = tokenize(term)
+        if not tokens:
+            return LikeSearch().apply(query, term)
+        # Quote every token so user input can never be read as FTS5 syntax
+        fts_query = ' '.join('"{}"*'.format(t.replace('"', '""')) for t in tokens)
+        score = 'bm25(tasks_fts)' if rank else '0'
+        matches = (
+            text(f"SELECT rowid AS id, {score} AS score FROM tasks_fts WHERE tasks_fts MATCH :q")
+            .bindparams(q=fts_query)
+            .columns(id=Integer, score=Float)
+            .subquery('fts')
+        )
+        query = query.join(matches, matches.c.id == Task.id)
+        if rank:
+            # bm25() is lower for better matches
+            query = query.order_by(matches.c.score)
+        return query
+
+
+BACKENDS = {backend.name: backend for backend in (LikeSearch, MySQLFulltextSearch, SQLiteFTS5Search)}
+
+
+def detect_backend(bind):
+    """Name of the best search backend for an engine or connection"""
+    dialect = bind.dialect.name
+    if dialect == 'mysql':
+        return 'fulltext'
+    if dialect == 'sqlite' and inspect(bind).has_table('tasks_fts'):
+        return 'fts5'
+    return 'like'
+
+
+def get_search_backend():
+    """Returns the search backend for the current app (SEARCH_BACKEND config, 'auto' by default)"""
+    backend = current_app.extensions.get('task_search')
+    if backend is None:
+        name = current_app.config.get('SEARCH_BACKEND', 'auto')
+        if name == 'auto':
+            name = detect_backend(db.engine)
+        backend = BACKENDS[name]()
+        current_app.extensions['task_search'] = backend
+    return backend
+
+
+def rebuild_search_index():
+    """Creates the full-text index on an existing database and repopulates it"""
+    engine = db.engine
+    with engine.begin() as conn:
+        if engine.dialect.name == 'mysql':
+            indexes = {ix['name'] for ix in inspect(conn).get_indexes('tasks')}
+            if 'ix_tasks_fulltext' not in indexes:
+                conn.exec_driver_sql(MYSQL_FULLTEXT_DDL)
+        elif engine.dialect.name == 'sqlite' and fts5_available(None, None, conn):
+            if not inspect(conn).has_table('tasks_fts'):
+                for statement in SQLITE_FTS_DDL:
+                    conn.exec_driver_sql(statement)
+            conn.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    current_app.extensions.pop('task_search', None)
+    return get_search_backend().name
@@ -0,0 +1,166 @@
+"""
+Fast-path serialization for the marshmallow schemas in utils/validators.py.
+
+compile_schema() generates, once per schema, a function that builds the
+whole output dict in a single expression, so dumping an object involves no
+per-field dispatch. Method fields with a registered fast equivalent share
+one date.today() per dump call. json_response() encodes with orjson when it
+is installed and produces the same bytes as jsonify(); anything it cannot
+reproduce exactly falls back to jsonify().
+"""
+import json
+import time
+from datetime import date
+from flask import current_app, jsonify
+from marshmallow import fields
+from utils.validators import is_overdue
+from utils.instrumentation import record_serialization
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Method fields that can be computed without calling back into the schema
+FAST_METHODS = {
+    "get_is_overdue": lambda obj, today: is_overdue(obj.due_date, obj.completed, today),
+}
+
+_compiled = {}
+
+
+# Per-type value expressions; {v} is the attribute value, already known not to be None
+SCALAR_EXPRESSIONS = (
+    (fields.Boolean, "bool({v})"),
+    (fields.Integer, "int({v})"),
+    (fields.String, "str({v})"),
+)
+
+
+def _scalar_expression(field):
+    if isinstance(field, fields.Date):
+        if field.format in (None, 'iso', '%Y-%m-%d'):
+            # Same text as strftime('%Y-%m-%d') for four-digit years
+            return "({v}.isoformat() if {v}.year >= 1000 else {v}.strftime('%Y-%m-%d'))"
+        return None
+    if isinstance(field, fields.DateTime):
+        return "{v}.isoformat()" if field.format in (None, 'iso') else None
+    for field_class, expression in SCALAR_EXPRESSIONS:
+        if type(field) is field_class:
+            return expression
+    return None
+
+
+def _field_getter(schema, name, field):
+    """Fallback getter(obj, today) for fields without a scalar expression"""
+    attr = field.attribute or name
+    if isinstance(field, fields.Method):
+        fast = FAST_METHODS.get(field.serialize_method_name)
+        if fast is not None:
+            return fast
+        method = getattr(schema, field.serialize_method_name)
+        return lambda obj, today: method(obj)
+    if isinstance(field, fields.Nested):
+        nested = compile_schema(field.schema)
+        if field.many:
+            return lambda obj, today: _optional_many(nested, getattr(obj, attr), today)
+        return lambda obj, today: _optional(nested, getattr(obj, attr), today)
+    # Anything else goes through marshmallow's own field serialization
+    return lambda obj, today: field.serialize(name, obj)
+
+
+def _optional(nested, value, today):
+    return None if value is None else nested.dump_one(value, today)
+
+
+def _optional_many(nested, values, today):
+    return None if values is None else [nested.dump_one(item, today) for item in values]
+
+
+class CompiledSchema:
+    """Generates one dump_one(obj, today) function building the whole output dict"""
+
+    def __init__(self, schema):
+        namespace = {}
+        items = []
+        for i, (name, field) in enumerate(schema.dump_fields.items()):
+            key = field.data_key or name
+            attr = field.attribute or name
+            expression = _scalar_expression(field)
+            if expression is not None and attr.isidentifier():
+                value = expression.format(v="_v")
+                items.append(f"    {key!r}: None if (_v := obj.{attr}) is None else {value},")
+            else:
+                namespace[f"_get{i}"] = _field_getter(schema, name, field)
+                items.append(f"    {key!r}: _get{i}(obj, today),")
+        source = "def dump_one(obj, today):\n  return {\n" + "\n".join(items) + "\n  }\n"
+        exec(compile(source, f"<compiled {type(schema).__name__}>", "exec"), namespace)
+        self.source = source
+        self.dump_one = namespace["dump_one"]
+
+    def dump(self, obj, many=False):
+        today = date.today()
+        if many:
+            dump_one = self.dump_one
+            return [dump_one(item, today) for item in obj]
+        return self.dump_one(obj, today)
+
+
+def compile_schema(schema):
+    """Returns the cached CompiledSchema for a schema instance's field layout"""
+    key = (type(schema), frozenset(schema.only or ()), frozenset(schema.exclude))
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = _compiled[key] = CompiledSchema(schema)
+    return compiled
+
+
+def _fast_enabled():
+    return current_app.config.get('SERIALIZER', 'fast') == 'fast'
+
+
+def dump(schema, obj):
+    """schema.dump(obj), through the compiled serializer when SERIALIZER is 'fast'"""
+    start = time.perf_counter()
+    if _fast_enabled():
+        data = compile_schema(schema).dump(obj, many=schema.many)
+    else:
+        data = schema.dump(obj)
+    record_serialization(time.perf_counter() - start)
+    return data
+
+
+def dumps(payload):
+    """Compact, key-sorted JSON bytes for streamed output (UTF-8, not ASCII-escaped)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def json_response(payload, status=200):
+    """jsonify(payload), status — encoded with orjson when that gives identical bytes"""
+    start = time.perf_counter()
+    response = _encode(payload)
+    record_serialization(time.perf_counter() - start)
+    return response, status
+
+
+def _encode(payload):
+    provider = current_app.json
+    if (
+        orjson is not None
+        and _fast_enabled()
+        and not current_app.debug
+        and getattr(provider, 'sort_keys', False)
+        and getattr(provider, 'ensure_ascii', False)
+        and getattr(provider, 'compact', None) is not False
+    ):
+        try:
+            body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            body = None
+        # jsonify escapes everything outside printable ASCII as \uXXXX; orjson
+        # writes UTF-8 and a raw DEL, so only printable ASCII output matches
+        if body is not None and body.isascii() and b"\x7f" not in body:
+            return current_app.response_class(body + b"\n", mimetype=provider.mimetype)
+    return jsonify(payload)
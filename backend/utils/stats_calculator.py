@@ -1,20 +1,39 @@
 from datetime import date, timedelta
-from models import UserStats, Task, db
-from sqlalchemy import func
+from models import UserStats, Task, TaskList, DailyCompletion, db
+from sqlalchemy import func, update, delete, insert, case, bindparam
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-def update_streak_logic(session):
-    """Updates streak data when a task is completed"""
+def get_or_create_stats(session):
+    """Returns the user_stats row, creating it with totals counted from tasks if missing"""
     stats = session.query(UserStats).first()
     if not stats:
-        stats = UserStats()
+        # Runs after autoflush, so the counts already include pending task changes
+        total, completed = _count_tasks(session)
+        stats = UserStats(
+            current_streak=0, longest_streak=0, tasks_completed_today=0, tasks_completed_total=0,
+            task_count=total, completed_task_count=completed
+        )
         session.add(stats)
+        session.flush()
+    return stats
+
+def _count_tasks(session):
+    return session.query(
+        func.count(Task.id),
+        func.coalesce(func.sum(case((Task.completed == True, 1), else_=0)), 0)
+    ).one()
+
+def update_streak_logic(session, completed=1):
+    """Updates streak data when tasks are completed; the caller commits"""
+    stats = get_or_create_stats(session)
     
     today = date.today()
     
     # If already completed tasks today, just increment daily total
     if stats.last_completed_date == today:
-        stats.tasks_completed_today += 1
-        stats.tasks_completed_total += 1
+        stats.tasks_completed_today += completed
+        stats.tasks_completed_total += completed
     else:
         # Check if yesterday was the last completion
         yesterday = today - timedelta(days=1)
@@ -28,26 +47,128 @@ def update_streak_logic(session):
         if stats.current_streak > stats.longest_streak:
             stats.longest_streak = stats.current_streak
             
-        stats.tasks_completed_today = 1
-        stats.tasks_completed_total += 1
+        stats.tasks_completed_today = completed
+        stats.tasks_completed_total += completed
         stats.last_completed_date = today
-    
-    session.commit()
 
-def get_weekly_completed_count():
+def get_weekly_completed_count(session=None):
     """Returns number of tasks completed in the last 7 days"""
     seven_days_ago = date.today() - timedelta(days=7)
-    # Since tasks table might not store 'completed_at', we assume updated_at on completed tasks
-    # For a real app, you'd add a 'completed_at' column
-    return db.session.query(func.count(Task.id)).filter(
-        Task.completed == True,
-        Task.updated_at >= seven_days_ago
+    # Read from the per-day rollup instead of scanning tasks
+    return (session or db.session).query(func.coalesce(func.sum(DailyCompletion.count), 0)).filter(
+        DailyCompletion.day >= seven_days_ago
     ).scalar()
 
+def adjust_task_totals(session, total=0, completed=0):
+    """Shifts the materialized task totals on the user_stats row"""
+    updated = session.execute(
+        update(UserStats).values(
+            task_count=UserStats.task_count + total,
+            completed_task_count=UserStats.completed_task_count + completed
+        )
+    ).rowcount
+    if not updated:
+        get_or_create_stats(session)
+
+def adjust_daily_completions(session, day, delta):
+    """Adds delta to the completion rollup for day, creating the row if needed"""
+    adjust_daily_completions_by_day(session, {day: delta})
+
+def adjust_daily_completions_by_day(session, deltas):
+    """Applies {day: delta} to the completion rollup; one upsert statement for all days on MySQL and SQLite"""
+    if not deltas:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect == 'mysql':
+        stmt = mysql_insert(DailyCompletion)
+        stmt = stmt.on_duplicate_key_update(count=DailyCompletion.count + stmt.inserted['count'])
+    elif dialect == 'sqlite':
+        stmt = sqlite_insert(DailyCompletion)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day'],
+            set_={'count': DailyCompletion.count + stmt.excluded['count']}
+        )
+    else:
+        for day, delta in deltas.items():
+            updated = session.execute(
+                update(DailyCompletion)
+                .where(DailyCompletion.day == day)
+                .values(count=DailyCompletion.count + delta)
+            ).rowcount
+            if not updated:
+                session.execute(insert(DailyCompletion).values(day=day, count=delta))
+        return
+    session.execute(stmt, [{"day": day, "count": delta} for day, delta in deltas.items()])
+
+def record_task_changes(session, total=0, completed=0, completed_at=None):
+    """
+    Applies one write's effect on the materialized stats: total and completed
+    task deltas, with completed also counted against completed_at's day in the
+    rollup. Call it once per write so a freshly created stats row, which
+    already counts the flushed changes, is not adjusted twice.
+    """
+    adjust_task_totals(session, total=total, completed=completed)
+    if completed and completed_at is not None:
+        adjust_daily_completions(session, completed_at.date(), completed)
+
+def rebuild_stats_aggregates():
+    """Recomputes the materialized totals and the daily completion rollup from tasks"""
+    # Completed rows written before completed_at existed fall back to updated_at
+    db.session.execute(
+        update(Task)
+        .where(Task.completed == True, Task.completed_at.is_(None))
+        .values(completed_at=Task.updated_at, updated_at=Task.updated_at),
+        execution_options={"synchronize_session": False}
+    )
+    total, completed = _count_tasks(db.session)
+    stats = get_or_create_stats(db.session)
+    stats.task_count = total
+    stats.completed_task_count = completed
+
+    day = func.date(Task.completed_at)
+    db.session.execute(delete(DailyCompletion))
+    db.session.execute(
+        insert(DailyCompletion).from_select(
+            ['day', 'count'],
+            db.session.query(day, func.count(Task.id))
+            .filter(Task.completed == True, Task.completed_at.isnot(None))
+            .group_by(day)
+        )
+    )
+    db.session.commit()
+
+def adjust_list_count(session, list_id, delta):
+    """Shifts a list's task_count by delta in the caller's transaction"""
+    session.execute(
+        update(TaskList)
+        .where(TaskList.id == list_id)
+        .values(task_count=TaskList.task_count + delta)
+    )
+
+def adjust_list_counts(session, deltas):
+    """Applies {list_id: delta} to the lists' task_count; one executemany for all lists"""
+    deltas = [{"list_id": list_id, "delta": delta} for list_id, delta in deltas.items() if delta]
+    if not deltas:
+        return
+    lists = TaskList.__table__
+    session.execute(
+        update(lists)
+        .where(lists.c.id == bindparam('list_id'))
+        .values(task_count=lists.c.task_count + bindparam('delta')),
+        deltas
+    )
+
 def recalculate_list_counts():
-    """Sync task_count for all lists"""
-    from models import TaskList
-    lists = TaskList.query.all()
-    for lst in lists:
-        lst.task_count = Task.query.filter_by(list_id=lst.id).count()
+    """Sync task_count for all lists from a single grouped count"""
+    counts = dict(
+        db.session.query(Task.list_id, func.count(Task.id)).group_by(Task.list_id).all()
+    )
+    corrections = [
+        {"id": list_id, "task_count": counts.get(list_id, 0)}
+        for list_id, task_count in db.session.query(TaskList.id, TaskList.task_count)
+        if task_count != counts.get(list_id, 0)
+    ]
+    if corrections:
+        db.session.execute(update(TaskList), corrections)
     db.session.commit()
+    return len(corrections)
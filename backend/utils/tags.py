@@ -0,0 +1,211 @@
+"""
+Process-wide tag name -> id cache used to resolve tag payloads and the
+?tag=/?tags= filters without a query per name.
+
+Tag names are unique regardless of case, as MySQL's _ci collations and the
+NOCASE column on SQLite compare them, so the cache is keyed by tag_key().
+Tags read from the database are cached right away; tags created in a
+transaction only once it commits. A commit that updates or deletes tags
+clears the cache, and entries expire after TAG_CACHE_TTL seconds so a tag
+deleted through another process is not used for long.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, select, exists, false, func
+from sqlalchemy.orm import Session
+from models import Task, Tag, UserStats, task_tags
+
+# Keep IN lists well below driver parameter limits
+BATCH_SIZE = 1000
+# Page size assumed when choosing a tag filter plan (see tag_filter)
+PLAN_PAGE_ROWS = 50
+
+
+def tag_key(name):
+    """The form tag names are compared in: 'Work' and 'work' are the same tag"""
+    return name.casefold()
+
+
+class TagCache:
+    """LRU of tag_key -> (id, expires_at), plus the filter plan chosen per tag id set"""
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._selective = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def configure(self, max_entries, ttl):
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._entries.clear()
+            self._selective.clear()
+
+    def get_many(self, names):
+        """Returns ({key: id} for the cached tag keys, [keys not cached])"""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for name in names:
+                entry = self._entries.get(name)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(name)
+                    found[name] = entry[0]
+                else:
+                    missing.append(name)
+            self.metrics["hits"] += len(found)
+            self.metrics["misses"] += len(missing)
+        return found, missing
+
+    def put_many(self, tag_ids):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for name, tag_id in tag_ids.items():
+                self._entries[name] = (tag_id, expires_at)
+                self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_selective(self, tag_ids):
+        with self._lock:
+            entry = self._selective.get(tag_ids)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            return entry[0]
+
+    def put_selective(self, tag_ids, selective):
+        with self._lock:
+            self._selective[tag_ids] = (selective, time.monotonic() + self.ttl)
+            self._selective.move_to_end(tag_ids)
+            while len(self._selective) > self.max_entries:
+                self._selective.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._selective.clear()
+            self.metrics["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self.metrics, "entries": len(self._entries)}
+
+
+tag_cache = TagCache()
+
+
+def _pending(session):
+    """Tags created in this session's transaction, for the cache once it commits"""
+    return session.info.setdefault('pending_tag_ids', {})
+
+
+def lookup_tag_ids(session, names):
+    """
+    Maps the names of existing tags, in any case, to their ids, querying
+    only cache misses
+    """
+    keys = {name: tag_key(name) for name in names}
+    pending = session.info.get('pending_tag_ids', {})
+    by_key = {key: pending[key] for key in set(keys.values()) if key in pending}
+    found, missing = tag_cache.get_many([key for key in dict.fromkeys(keys.values()) if key not in by_key])
+    by_key.update(found)
+
+    # The column's collation matches the stored spelling of each name
+    missing = set(missing)
+    lookups = [name for name, key in keys.items() if key in missing]
+    for start in range(0, len(lookups), BATCH_SIZE):
+        batch = lookups[start:start + BATCH_SIZE]
+        # Tags this transaction created are in pending, so these rows are committed ones
+        rows = {tag_key(name): tag_id for name, tag_id in session.query(Tag.name, Tag.id).filter(Tag.name.in_(batch))}
+        by_key.update(rows)
+        tag_cache.put_many(rows)
+    return {name: by_key[key] for name, key in keys.items() if key in by_key}
+
+
+def tag_names(args):
+    """Tag names from ?tag=a&tag=b and ?tags=a,b; a task matches if it has any of them"""
+    names = args.getlist('tag') + [name for value in args.getlist('tags') for name in value.split(',')]
+    return list(dict.fromkeys(name.strip() for name in names if name.strip()))
+
+
+def tag_filter(session, names):
+    """
+    Semi-join on task_tags matching tasks that carry any of the named tags.
+
+    Driving from the (tag_id, task_id) index costs about one lookup per
+    match, walking the task order and probing task_tags' primary key about
+    page * tasks / matches probes, so the first wins below
+    sqrt(page * tasks) matches. A count bounded at that figure picks the
+    plan, and the choice is cached with the tags; a stale one only costs speed.
+    """
+    tag_ids = tuple(sorted(set(lookup_tag_ids(session, names).values())))
+    if not tag_ids:
+        return false()
+    matches = task_tags.c.tag_id.in_(tag_ids)
+    selective = tag_cache.get_selective(tag_ids)
+    if selective is None:
+        total = session.query(UserStats.task_count).scalar() or 0
+        threshold = max(1, int(math.sqrt(PLAN_PAGE_ROWS * total)))
+        probe = select(task_tags.c.task_id).where(matches).limit(threshold).subquery()
+        selective = session.scalar(select(func.count()).select_from(probe)) < threshold
+        tag_cache.put_selective(tag_ids, selective)
+    if selective:
+        return Task.id.in_(select(task_tags.c.task_id).where(matches))
+    return exists().where(task_tags.c.task_id == Task.id, matches)
+
+
+def remember_tag_ids(session, tag_ids):
+    """Records tags created in session's transaction ({name: id}); cached only if it commits"""
+    _pending(session).update((tag_key(name), tag_id) for name, tag_id in tag_ids.items())
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Tag):
+            _pending(session)[tag_key(obj.name)] = obj.id
+    # Linking a tag to a task dirties its tasks collection only, which does not count
+    changed = any(isinstance(obj, Tag) for obj in session.deleted) or any(
+        isinstance(obj, Tag) and session.is_modified(obj, include_collections=False) for obj in session.dirty
+    )
+    if changed:
+        session.info['tags_changed'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and table.name == 'tags':
+            orm_execute_state.session.info['tags_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_on_commit(session):
+    if session.in_nested_transaction():
+        return
+    tag_ids = session.info.pop('pending_tag_ids', None)
+    if session.info.pop('tags_changed', False):
+        tag_cache.clear()
+    elif tag_ids:
+        tag_cache.put_many(tag_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop('pending_tag_ids', None)
+    session.info.pop('tags_changed', None)
+
+
+def init_tag_cache(app):
+    tag_cache.configure(
+        max_entries=app.config.get('TAG_CACHE_MAX_ENTRIES', 10000),
+        ttl=app.config.get('TAG_CACHE_TTL', 300),
+    )
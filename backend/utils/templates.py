@@ -0,0 +1,204 @@
+"""
+Tasks from templates: on demand through POST /api/tasks/templates/.../instantiate,
+and ahead of time for recurring templates through `flask generate-recurrences`.
+
+Instantiation loads every requested template and list in one IN query each
+and inserts the tasks with insert_tasks, like POST /api/tasks/bulk.
+
+A recurring template repeats every recurrence_interval days, weeks or months
+from starts_on (monthly dates keep starts_on's day, clamped to short months)
+until ends_on. The generator walks the templates in id order, batch_size per
+transaction, and inserts each template's occurrences from the day after its
+generated_through watermark up to the horizon as set-based INSERTs that skip
+(template_id, occurrence_date) pairs already present. The watermarks move in
+the same transaction, so a rerun or an interrupted run never creates an
+occurrence twice and resumes where it stopped. Templates whose list was
+deleted advance their watermark without creating tasks.
+"""
+import calendar
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import Task, TaskTemplate
+from utils.bulk import chunked, existing_list_ids, insert_tasks
+from utils.stats_calculator import adjust_list_counts, record_task_changes
+
+TEMPLATE_COLUMNS = (
+    TaskTemplate.id, TaskTemplate.title, TaskTemplate.description, TaskTemplate.priority,
+    TaskTemplate.due_offset_days, TaskTemplate.list_id, TaskTemplate.recurrence,
+    TaskTemplate.recurrence_interval, TaskTemplate.starts_on, TaskTemplate.ends_on,
+    TaskTemplate.generated_through,
+)
+
+
+def template_record(template, list_id, due_date, occurrence_date=None):
+    """The task record a template produces, in insert_task_rows' format"""
+    return {
+        "title": template.title,
+        "description": template.description,
+        "priority": template.priority or 'medium',
+        "due_date": due_date,
+        "list_id": list_id,
+        "template_id": template.id,
+        "occurrence_date": occurrence_date,
+    }
+
+
+def instantiate_templates(session, requests, today=None):
+    """
+    Creates one task per {template_id, list_id?, due_date?} request, by
+    default in the template's list and due today + due_offset_days.
+    Returns ({index: task id}, {index: errors}).
+    """
+    today = today or date.today()
+    templates = {}
+    for batch in chunked(sorted({r['template_id'] for r in requests})):
+        templates.update((t.id, t) for t in session.query(TaskTemplate).filter(TaskTemplate.id.in_(batch)))
+
+    errors = {}
+    records = {}
+    for i, request in enumerate(requests):
+        template = templates.get(request['template_id'])
+        if template is None:
+            errors[i] = {"template_id": ["Template not found."]}
+            continue
+        list_id = request.get('list_id') or template.list_id
+        if list_id is None:
+            errors[i] = {"list_id": ["Template has no list, list_id is required."]}
+            continue
+        due_date = request.get('due_date') or today + timedelta(days=template.due_offset_days or 0)
+        records[i] = template_record(template, list_id, due_date)
+
+    known_lists = existing_list_ids(session, [record['list_id'] for record in records.values()])
+    for i in [i for i, record in records.items() if record['list_id'] not in known_lists]:
+        errors[i] = {"list_id": ["List not found."]}
+        del records[i]
+
+    if not records:
+        return {}, errors
+    ids = insert_tasks(session, list(records.values()), {})
+    return dict(zip(records, ids)), errors
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence_dates(recurrence, interval, anchor, start, end):
+    """Dates of the rule anchored at anchor that fall within [start, end]"""
+    interval = max(interval or 1, 1)
+    if recurrence == 'monthly':
+        months = (start.year - anchor.year) * 12 + start.month - anchor.month
+        n = max(months // interval, 0)
+        while True:
+            day = _add_months(anchor, n * interval)
+            if day > end:
+                return
+            if day >= start:
+                yield day
+            n += 1
+
+    step = interval * (7 if recurrence == 'weekly' else 1)
+    n = max(-(-(start - anchor).days // step), 0)
+    day = anchor + timedelta(days=n * step)
+    while day <= end:
+        yield day
+        day += timedelta(days=step)
+
+
+def _insert_skipping_occurrences(session):
+    """
+    INSERT that skips rows whose (template_id, occurrence_date) exists and
+    still raises every other error: MySQL's INSERT IGNORE would also hide
+    foreign key failures and truncated values
+    """
+    if session.connection().dialect.name == 'sqlite':
+        return sqlite_insert(Task.__table__).on_conflict_do_nothing(
+            index_elements=['template_id', 'occurrence_date']
+        )
+    statement = mysql_insert(Task.__table__)
+    return statement.on_duplicate_key_update(id=statement.table.c.id)
+
+
+def _occurrence_counts(session, template_ids, since):
+    """Tasks per list of the templates' occurrences from since on"""
+    return Counter(dict(session.execute(
+        select(Task.list_id, func.count())
+        .where(Task.template_id.in_(template_ids), Task.occurrence_date >= since)
+        .group_by(Task.list_id)
+    ).all()))
+
+
+def generate_batch(session, templates, through, today):
+    """Inserts the occurrences of template rows up to through and moves their watermarks; returns how many were created"""
+    now = datetime.utcnow()
+    rows = {}
+    watermarks = []
+    for template in templates:
+        start = template.generated_through + timedelta(days=1) if template.generated_through else today
+        anchor = template.starts_on or start
+        start = max(start, anchor)
+        end = min(through, template.ends_on) if template.ends_on else through
+        if template.list_id is not None:
+            offset = timedelta(days=template.due_offset_days or 0)
+            rows.setdefault(template.list_id, []).extend(
+                dict(template_record(template, template.list_id, day + offset, day),
+                     completed=False, created_at=now, updated_at=now)
+                for day in occurrence_dates(template.recurrence, template.recurrence_interval, anchor, start, end)
+            )
+        watermarks.append({"id": template.id, "starts_on": anchor, "generated_through": through})
+
+    list_counts = Counter()
+    statement = _insert_skipping_occurrences(session)
+    # MySQL reports a skipped duplicate as an affected row (SQLAlchemy connects
+    # with CLIENT_FOUND_ROWS), so there the rows this transaction added are counted
+    dates = [row['occurrence_date'] for list_rows in rows.values() for row in list_rows]
+    count_rows = bool(dates) and session.connection().dialect.name != 'sqlite'
+    if count_rows:
+        template_ids = [template.id for template in templates]
+        before = _occurrence_counts(session, template_ids, min(dates))
+    for list_id, list_rows in rows.items():
+        for batch in chunked(list_rows):
+            list_counts[list_id] += session.execute(statement, batch).rowcount
+    if count_rows:
+        list_counts = _occurrence_counts(session, template_ids, min(dates)) - before
+    adjust_list_counts(session, list_counts)
+    created = sum(list_counts.values())
+    if created:
+        record_task_changes(session, total=created)
+    # ORM bulk UPDATE by primary key: one executemany for the whole batch
+    session.execute(update(TaskTemplate), watermarks)
+    return created
+
+
+def generate_recurrences(session, through, batch_size=100, today=None):
+    """
+    Generates every recurring template's occurrences up to through, one
+    transaction per batch_size templates; yields (templates, tasks created)
+    per batch
+    """
+    today = today or date.today()
+    last_id = 0
+    while True:
+        templates = session.execute(
+            select(*TEMPLATE_COLUMNS)
+            .where(
+                TaskTemplate.recurrence.isnot(None),
+                TaskTemplate.id > last_id,
+                or_(TaskTemplate.generated_through.is_(None), TaskTemplate.generated_through < through)
+            )
+            .order_by(TaskTemplate.id)
+            .limit(batch_size)
+        ).all()
+        if not templates:
+            return
+        created = generate_batch(session, templates, through, today)
+        session.commit()
+        yield len(templates), created
+        if len(templates) < batch_size:
+            return
+        last_id = templates[-1].id
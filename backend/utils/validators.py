@@ -1,5 +1,8 @@
 from marshmallow import Schema, fields, validate
 
+def is_overdue(due_date, completed, today):
+    return bool(due_date and not completed and due_date < today)
+
 class TagSchema(Schema):
     id = fields.Int(dump_only=True)
     name = fields.Str(required=True)
@@ -24,12 +27,31 @@ class TaskSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
     tags = fields.Nested(TagSchema, many=True)
+    template_id = fields.Int(dump_only=True)
+    occurrence_date = fields.Date(dump_only=True, format='%Y-%m-%d')
 
     def get_is_overdue(self, obj):
         from datetime import date
-        if obj.due_date and not obj.completed:
-            return obj.due_date < date.today()
-        return False
+        return is_overdue(obj.due_date, obj.completed, date.today())
+
+class TemplateSchema(Schema):
+    id = fields.Int(dump_only=True)
+    title = fields.Str(required=True, validate=validate.Length(min=1))
+    description = fields.Str(allow_none=True)
+    priority = fields.Str(validate=validate.OneOf(['low', 'medium', 'high']))
+    due_offset_days = fields.Int(validate=validate.Range(min=0))
+    list_id = fields.Int(allow_none=True)
+    recurrence = fields.Str(allow_none=True, validate=validate.OneOf(['daily', 'weekly', 'monthly']))
+    recurrence_interval = fields.Int(validate=validate.Range(min=1, max=365))
+    starts_on = fields.Date(allow_none=True, format='%Y-%m-%d')
+    ends_on = fields.Date(allow_none=True, format='%Y-%m-%d')
+    generated_through = fields.Date(dump_only=True, format='%Y-%m-%d')
+
+class InstantiateSchema(Schema):
+    template_id = fields.Int(required=True)
+    # Default to the template's list and today + due_offset_days
+    list_id = fields.Int(allow_none=True)
+    due_date = fields.Date(allow_none=True, format='%Y-%m-%d')
 
 class StatsSchema(Schema):
     id = fields.Int(dump_only=True)
@@ -30,6 +30,26 @@ export const taskAPI = {
     return handleResponse(response);
   },
 
+  // Tasks changed and tasks/lists deleted since a token from the previous call
+  // (omit it for a full sync). Apply `deleted` before `data`; a 410 means resync.
+  async getTaskChanges(since?: string, limit = 500) {
+    const params = new URLSearchParams({ limit: limit.toString() });
+    if (since) params.append('since', since);
+
+    const response = await fetch(`${API_BASE_URL}/tasks/changes?${params}`);
+    return handleResponse(response);
+  },
+
+  // Open tasks that are overdue, due today or due in the next `days` days,
+  // oldest due date first; the first page also carries the count of each view
+  async getDueTasks(view: 'overdue' | 'today' | 'upcoming', days = 7, cursor?: string, limit = 20) {
+    const params = new URLSearchParams({ view, days: days.toString(), limit: limit.toString() });
+    if (cursor) params.append('cursor', cursor);
+
+    const response = await fetch(`${API_BASE_URL}/tasks/due?${params}`);
+    return handleResponse(response);
+  },
+
   async createTask(data: {
     title: string;
     description?: string;
@@ -84,6 +104,45 @@ export const taskAPI = {
     const response = await fetch(`${API_BASE_URL}/tasks/templates`);
     return handleResponse(response);
   },
+
+  // Recurring templates (recurrence set) get their tasks from the server's
+  // `flask generate-recurrences` job, up to its horizon
+  async createTemplate(data: {
+    title: string;
+    description?: string;
+    priority?: string;
+    due_offset_days?: number;
+    list_id?: number;
+    recurrence?: 'daily' | 'weekly' | 'monthly' | null;
+    recurrence_interval?: number;
+    starts_on?: string;
+    ends_on?: string;
+  }) {
+    const response = await fetch(`${API_BASE_URL}/tasks/templates`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(data),
+    });
+    return handleResponse(response);
+  },
+
+  async instantiateTemplate(id: number, data: { list_id?: number; due_date?: string } = {}) {
+    const response = await fetch(`${API_BASE_URL}/tasks/templates/${id}/instantiate`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(data),
+    });
+    return handleResponse(response);
+  },
+
+  async instantiateTemplates(templates: { template_id: number; list_id?: number; due_date?: string }[]) {
+    const response = await fetch(`${API_BASE_URL}/tasks/templates/instantiate`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ templates }),
+    });
+    return handleResponse(response);
+  },
 };
 
 // List API
@@ -134,6 +193,25 @@ export const statsAPI = {
   },
 };
 
+// Batch API: runs operations such as { method: 'PUT', path: '/api/tasks/1', body }
+// in one request and one transaction
+export interface BatchOperation {
+  method: 'GET' | 'POST' | 'PUT' | 'DELETE';
+  path: string;
+  body?: unknown;
+}
+
+export const batchAPI = {
+  async run(operations: BatchOperation[], atomic = true) {
+    const response = await fetch(`${API_BASE_URL}/batch`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ operations, atomic }),
+    });
+    return handleResponse(response);
+  },
+};
+
 // Health API
 export const healthAPI = {
   async checkHealth() {